@@ -0,0 +1,395 @@
+"""benchmarks of radar_generator, pulses/s and peak memory saved as json.
+
+    python benchmarks/bench.py -o results.json
+    python benchmarks/bench.py -o new.json --compare results.json
+
+every case is timed `--repeat` times and the best run is kept, peak
+memory is measured in a separate run under `tracemalloc`, which numpy
+reports its buffers to. `--compare` exits with 1 if a case got slower or
+used more memory than the baseline by more than `--tolerance`.
+"""
+import argparse
+import json
+import platform
+import subprocess
+import sys
+import tempfile
+import time
+import tracemalloc
+from collections import deque
+from dataclasses import replace
+from itertools import islice
+from pathlib import Path
+from typing import Any, Callable, TypeAlias
+
+import numpy as np
+from loguru import logger
+
+from radar_generator import RadarGenerator, parameter, sink, stats
+from radar_generator.parameter import Arithmetic, Hop, Sine
+from radar_generator.radar import PDWBatch, Radar
+from radar_generator.radar.doa import DOA
+from radar_generator.radar.kinematics import Geometry, Track
+from radar_generator.radar.loss import GilbertElliott, LossModel, ScanBlanking, WindowMask
+from radar_generator.radar.pa import PA
+from radar_generator.radar.pri import PRI
+from radar_generator.radar.pw import PW
+from radar_generator.radar.receiver import POLICIES, Receiver
+from radar_generator.radar.rf import RF
+from radar_generator.radar.scan import CircularScan
+
+# a case prepares its input and returns the measured work, which returns
+# the number of pulses (or values) it produced
+Case: TypeAlias = Callable[[int], Callable[[], int]]
+CASES: dict[str, Case] = {}
+
+PARAMETER_MODES: dict[str, dict[str, Any]] = {
+    "fixed": dict(value=10.),
+    "fixed_std": dict(value=10., std=0.1),
+    "uneven": dict(value=[10., 30., 20.]),
+    "group": dict(value=[10., 30., 20.], group_size=5),
+    "group_std": dict(value=[10., 30., 20.], std=0.1, group_size=5),
+    "random": dict(value=[1000., 2000., 1500., 500.], random=True),
+    "random_group": dict(value=[1000., 2000., 1500., 500.], group_size=5, random=True),
+    "jitter": dict(value=10., jitter_rate=0.1),
+    "sine": dict(value=Sine(1000., 10., 100)),
+    "hop": dict(value=Hop(Arithmetic(1000., 0.01, 50000), 50000)),
+    "hop_random": dict(value=Hop(Arithmetic(1000., 0.01, 50000), 50000), random=True),
+}
+RADAR_NUMS = (1, 10, 100, 1000, 10000)
+
+
+def case(name: str) -> Callable[[Case], Case]:
+    def register(f: Case) -> Case:
+        CASES[name] = f
+        return f
+    #enddef
+    return register
+#enddef
+
+
+def make_radar(i: int, loss_rate: float | None = None) -> Radar:
+    return Radar(
+        i,
+        i * 0.37,
+        PRI(10. + i % 10, std=0.5) if i % 2 else PRI(10. + i % 10, jitter_rate=0.05),
+        DOA(i % 360, std=1.),
+        RF([1000. + i % 100, 1100., 1200.], group_size=3, random=True),
+        PW([1., 2.], std=0.1, group_size=2),
+        PA(0.),
+        loss_rate
+    )
+#enddef
+
+
+def make_generator(radar_num: int) -> RadarGenerator:
+    g = RadarGenerator(0)
+    for i in range(radar_num):
+        g.add(make_radar(i, 0.1))
+    #endfor
+    return g
+#enddef
+
+
+def drain(it: Any, n: int) -> int:
+    deque(islice(it, n), maxlen=0)
+    return n
+#enddef
+
+
+for mode, kwargs in PARAMETER_MODES.items():
+    @case(f"parameter/{mode}/init")
+    def _(n: int, kwargs=kwargs) -> Callable[[], int]:
+        return lambda: drain(parameter.init(**kwargs, rng=np.random.default_rng(0)), n)
+    #enddef
+
+    @case(f"parameter/{mode}/block")
+    def _(n: int, kwargs=kwargs) -> Callable[[], int]:
+        def run() -> int:
+            p = parameter.init_block(**kwargs, rng=np.random.default_rng(0))
+            for _ in range(n // 4096):
+                p.take(4096)
+            #endfor
+            p.take(n % 4096)
+            return n
+        #enddef
+        return run
+    #enddef
+#endfor
+
+
+for loss_rate in (None, 0.1):
+    suffix = "loss" if loss_rate else "no_loss"
+
+    @case(f"radar/{suffix}/pulses")
+    def _(n: int, loss_rate=loss_rate) -> Callable[[], int]:
+        return lambda: drain(make_radar(1, loss_rate).pulses(0), n)
+    #enddef
+
+    @case(f"radar/{suffix}/blocks")
+    def _(n: int, loss_rate=loss_rate) -> Callable[[], int]:
+        def run() -> int:
+            count = 0
+            for batch in make_radar(1, loss_rate).iter_blocks(seed=0):
+                count += len(batch)
+                if count >= n:
+                    return count
+                #endif
+            #endfor
+            return count
+        #enddef
+        return run
+    #enddef
+#endfor
+
+
+LOSS_MODELS: dict[str, LossModel] = {
+    "burst": GilbertElliott(0.02, 0.25),
+    "scan": ScanBlanking(1000., 100.),
+    "window": WindowMask(tuple((t, t + 50.) for t in range(0, 10**6, 500))),
+}
+
+for name, model in LOSS_MODELS.items():
+    @case(f"radar/{name}/blocks")
+    def _(n: int, model=model) -> Callable[[], int]:
+        def run() -> int:
+            # about `n` pulses at a pri of 11
+            radar = replace(make_radar(1), _losses=(model,))
+            return sum(len(b) for b in radar.iter_blocks(seed=0, end_toa=n * 11.))
+        #enddef
+        return run
+    #enddef
+#endfor
+
+
+GEOMETRY = Geometry(
+    Track.waypoints([0., 10**6, 2 * 10**6], [[0., 10**5], [10**5, 10**5], [10**5, 0.]]),
+    Track.constant([0., 0.], [0.01, 0.])
+)
+TOA_PARAMETERS: dict[str, dict[str, Any]] = {
+    "pa_scan": {"_pa": PA(0., CircularScan(1000.))},
+    "track": {
+        "_doa": DOA(0., std=1., geometry=GEOMETRY),
+        "_pa": PA(0., geometry=GEOMETRY, reference=10**5),
+    },
+}
+
+for name, changes in TOA_PARAMETERS.items():
+    @case(f"radar/{name}/blocks")
+    def _(n: int, changes=changes) -> Callable[[], int]:
+        def run() -> int:
+            radar = replace(make_radar(1), **changes)
+            return sum(len(b) for b in radar.iter_blocks(seed=0, end_toa=n * 11.))
+        #enddef
+        return run
+    #enddef
+#endfor
+
+
+for radar_num in RADAR_NUMS:
+    @case(f"generator/{radar_num}/stream")
+    def _(n: int, radar_num=radar_num) -> Callable[[], int]:
+        g = make_generator(radar_num)
+        # keep the buffered blocks of many radars in memory bounds
+        block_size = min(4096, max(64, n // radar_num))
+        return lambda: len(g.stream(block_size).take(n))
+    #enddef
+
+    @case(f"generator/{radar_num}/heap")
+    def _(n: int, radar_num=radar_num) -> Callable[[], int]:
+        g = make_generator(radar_num)
+        return lambda: drain(iter(g), n)
+    #enddef
+
+    @case(f"generator/{radar_num}/blocks")
+    def _(n: int, radar_num=radar_num) -> Callable[[], int]:
+        g = make_generator(radar_num)
+        g.scheduler = "blocks"
+        return lambda: len(g.stream().take(n))
+    #enddef
+
+    @case(f"generator/{radar_num}/blocks_pulses")
+    def _(n: int, radar_num=radar_num) -> Callable[[], int]:
+        g = make_generator(radar_num)
+        g.scheduler = "blocks"
+        return lambda: drain(iter(g), n)
+    #enddef
+#endfor
+
+
+for suffix in sink.SINKS:
+    @case(f"sink/{suffix.lstrip('.')}")
+    def _(n: int, suffix=suffix) -> Callable[[], int]:
+        batch = make_generator(100).take(n)
+        chunk_size = 65536
+
+        def run() -> int:
+            with tempfile.TemporaryDirectory() as tmp:
+                with sink.open_sink(Path(tmp) / f"out{suffix}") as s:
+                    for start in range(0, len(batch), chunk_size):
+                        s.write(batch[start:start+chunk_size])
+                    #endfor
+                #endwith
+            #endwith
+            return len(batch)
+        #enddef
+        return run
+    #enddef
+#endfor
+
+
+for policy in POLICIES:
+    @case(f"receiver/{policy}")
+    def _(n: int, policy=policy) -> Callable[[], int]:
+        batch = make_generator(100).take(n)
+        chunks = [batch[start:start+65536] for start in range(0, len(batch), 65536)]
+
+        def run() -> int:
+            deque(Receiver(policy, 0.5)(chunks), maxlen=0)
+            return len(batch)
+        #enddef
+        return run
+    #enddef
+#endfor
+
+
+@case("stats/summary")
+def _(n: int) -> Callable[[], int]:
+    batch = make_generator(100).take(n)
+    chunks = [batch[start:start+65536] for start in range(0, len(batch), 65536)]
+
+    def run() -> int:
+        summary = stats.Summary()
+        for chunk in chunks:
+            summary.update(chunk)
+        #endfor
+        return len(batch)
+    #enddef
+    return run
+#enddef
+
+
+def measure(name: str, n: int, repeat: int) -> dict[str, Any]:
+    try:
+        run = CASES[name](n)
+        seconds = []
+        for _ in range(repeat):
+            start = time.perf_counter()
+            pulses = run()
+            seconds.append(time.perf_counter() - start)
+        #endfor
+    except ImportError as e:
+        return {"skipped": str(e)}
+    #endtry
+    tracemalloc.start()
+    try:
+        run()
+        _, peak = tracemalloc.get_traced_memory()
+    finally:
+        tracemalloc.stop()
+    #endtry
+    best = min(seconds)
+    return {
+        "pulses": pulses,
+        "seconds": best,
+        "pulses_per_s": pulses / best,
+        "peak_bytes": peak,
+    }
+#enddef
+
+
+def metadata() -> dict[str, Any]:
+    try:
+        commit = subprocess.run(
+            ["git", "rev-parse", "HEAD"],
+            capture_output=True,
+            text=True,
+            cwd=Path(__file__).parent,
+        ).stdout.strip() or None
+    except OSError:
+        commit = None
+    #endtry
+    return {
+        "time": time.strftime("%Y-%m-%dT%H:%M:%S%z"),
+        "commit": commit,
+        "python": platform.python_version(),
+        "numpy": np.__version__,
+        "platform": platform.platform(),
+        "processor": platform.processor() or platform.machine(),
+    }
+#enddef
+
+
+def compare(results: dict, baseline: dict, tolerance: float) -> list[str]:
+    """cases slower or bigger than the baseline by more than `tolerance`."""
+
+    regressions = []
+    for name, new in results.items():
+        old = baseline.get(name)
+        if old is None or "skipped" in old or "skipped" in new:
+            continue
+        #endif
+        speed = new["pulses_per_s"] / old["pulses_per_s"]
+        memory = new["peak_bytes"] / max(old["peak_bytes"], 1)
+        flags = []
+        if speed < 1 - tolerance:
+            flags.append("slower")
+        #endif
+        if memory > 1 + tolerance:
+            flags.append("more memory")
+        #endif
+        print(f"{name:40} speed x{speed:6.2f}  memory x{memory:6.2f}  {', '.join(flags)}")
+        if flags:
+            regressions.append(name)
+        #endif
+    #endfor
+    return regressions
+#enddef
+
+
+def main(argv: list[str] | None = None) -> int:
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("-o", "--output", help="json file to save the results to")
+    parser.add_argument("-n", "--pulses", type=int, default=200_000, help="pulses per case")
+    parser.add_argument("-r", "--repeat", type=int, default=3, help="timed runs per case")
+    parser.add_argument("-k", "--filter", default="", help="only cases whose name contains it")
+    parser.add_argument("--compare", help="baseline json to compare with")
+    parser.add_argument("--tolerance", type=float, default=0.1, help="allowed relative regression")
+    args = parser.parse_args(argv)
+
+    logger.remove()
+    results = {}
+    for name in CASES:
+        if args.filter not in name:
+            continue
+        #endif
+        result = results[name] = measure(name, args.pulses, args.repeat)
+        if "skipped" in result:
+            print(f"{name:40} skipped: {result['skipped']}")
+        else:
+            print(
+                f"{name:40} {result['pulses_per_s']:14,.0f} pulses/s"
+                f" {result['peak_bytes'] / 2**20:10.1f} MiB"
+            )
+        #endif
+    #endfor
+
+    if args.output:
+        Path(args.output).write_text(json.dumps(
+            {"meta": metadata(), "pulses": args.pulses, "results": results},
+            indent=2
+        ))
+    #endif
+    if args.compare:
+        baseline = json.loads(Path(args.compare).read_text())
+        if compare(results, baseline["results"], args.tolerance):
+            return 1
+        #endif
+    #endif
+    return 0
+#enddef
+
+
+if __name__ == "__main__":
+    sys.exit(main())
+#endif
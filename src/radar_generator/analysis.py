@@ -0,0 +1,261 @@
+from dataclasses import dataclass
+from pathlib import Path
+from typing import Iterable, Iterator
+
+import numpy as np
+
+from .radar import PDWBatch
+from .utils import import_pyarrow
+
+
+@dataclass(eq=False)
+class Histograms:
+    """ difference histograms of a toa sequence, bins of `resolution`
+    from 0 to `max_interval`.
+
+    `sdif[k]` counts the differences between every pulse and the pulse
+    `k + 1` after it, `pairs` the differences between every pair and
+    `pri_transform` their complex pri transform sums.
+    """
+
+    resolution: float
+    sdif: np.ndarray
+    pairs: np.ndarray
+    pri_transform: np.ndarray
+    pulses: int = 0
+
+    @property
+    def edges(self) -> np.ndarray:
+        return np.arange(self.pairs.size + 1) * self.resolution
+    #enddef
+
+    @property
+    def cdif(self) -> np.ndarray:
+        """cumulated difference histograms, `cdif[k]` of the levels up to `k + 1`."""
+
+        return np.cumsum(self.sdif, axis=0)
+    #enddef
+#endclass
+
+
+class Analyzer:
+    """ cdif/sdif and pri transform of a sorted toa stream, chunk by chunk.
+
+    every lag is one vectorized difference of the toa array with itself
+    shifted, lags go on until no pair is closer than `max_interval`. only
+    the toa within `max_interval` of the end of a chunk are kept for the
+    next one, so memory does not grow with the stream.
+    """
+
+    max_interval: float
+    resolution: float
+    levels: int
+    _tail: np.ndarray
+    _histograms: Histograms
+
+    def __init__(self, max_interval: float, resolution: float, levels: int = 4) -> None:
+        if max_interval <= 0 or resolution <= 0:
+            raise ValueError("`max_interval` and `resolution` need to be positive")
+        #endif
+        if levels < 1:
+            raise ValueError("`levels` is less than 1")
+        #endif
+        self.max_interval = max_interval
+        self.resolution = resolution
+        self.levels = levels
+        self.reset()
+    #enddef
+
+    @property
+    def bins(self) -> int:
+        return int(np.ceil(self.max_interval / self.resolution))
+    #enddef
+
+    def reset(self) -> None:
+        self._tail = np.zeros(0)
+        self._histograms = Histograms(
+            self.resolution,
+            np.zeros((self.levels, self.bins), dtype=np.int64),
+            np.zeros(self.bins, dtype=np.int64),
+            np.zeros(self.bins, dtype=np.complex128),
+        )
+    #enddef
+
+    def update(self, toa: np.ndarray) -> None:
+        """add the next toa, sorted and after the ones added before."""
+
+        if not toa.size:
+            return
+        #endif
+        held = self._tail.size
+        toa = np.concatenate((self._tail, toa))
+        histograms = self._histograms
+        histograms.pulses += toa.size - held
+        bins = self.bins
+        lag = 1
+        while lag < toa.size:
+            # pairs `(i - lag, i)` with the later pulse not seen before
+            later = toa[max(held, lag):]
+            d = later - toa[max(held, lag) - lag:toa.size - lag]
+            near = d < self.max_interval
+            if not near.any():
+                break
+            #endif
+            d, later = d[near], later[near]
+            index = (d / self.resolution).astype(np.intp)
+            counts = np.bincount(index, minlength=bins)[:bins]
+            if lag <= self.levels:
+                histograms.sdif[lag - 1] += counts
+            #endif
+            histograms.pairs += counts
+            # each pair adds exp(2 pi i t / d) to the bin of d, coincident
+            # pulses have no phase
+            distinct = d > 0
+            index, phase = index[distinct], 2 * np.pi * (later[distinct] / d[distinct])
+            histograms.pri_transform += (
+                np.bincount(index, np.cos(phase), minlength=bins)[:bins]
+                + 1j * np.bincount(index, np.sin(phase), minlength=bins)[:bins]
+            )
+            lag += 1
+        #endwhile
+        self._tail = toa[np.searchsorted(toa, toa[-1] - self.max_interval, "right"):].copy()
+    #enddef
+
+    def result(self) -> Histograms:
+        """histograms of the toa added since the last `reset`."""
+
+        h = self._histograms
+        return Histograms(h.resolution, h.sdif.copy(), h.pairs.copy(), h.pri_transform.copy(), h.pulses)
+    #enddef
+#endclass
+
+
+def _toa(chunk: PDWBatch | np.ndarray) -> np.ndarray:
+    return chunk.toa if isinstance(chunk, PDWBatch) else np.asarray(chunk, dtype=np.float64)
+#enddef
+
+
+def analyze(
+    chunks: Iterable[PDWBatch | np.ndarray],
+    max_interval: float,
+    resolution: float,
+    levels: int = 4,
+) -> Histograms:
+    """histograms of a whole stream of chunks or toa arrays."""
+
+    analyzer = Analyzer(max_interval, resolution, levels)
+    for chunk in chunks:
+        analyzer.update(_toa(chunk))
+    #endfor
+    return analyzer.result()
+#enddef
+
+
+def analyze_windows(
+    chunks: Iterable[PDWBatch | np.ndarray],
+    window: float,
+    max_interval: float,
+    resolution: float,
+    levels: int = 4,
+    step: float | None = None,
+    start: float | None = None,
+) -> Iterator[tuple[float, Histograms]]:
+    """histograms of the toa windows `[start + i * step, ... + window)`.
+
+    only the toa of the current window are buffered, so any stream length
+    runs in the memory of one window.
+
+    @param step: the window length by default, shorter steps overlap
+    @param start: the first toa by default
+    """
+
+    step = step or window
+    if window <= 0 or step <= 0:
+        raise ValueError("`window` and `step` need to be positive")
+    #endif
+    analyzer = Analyzer(max_interval, resolution, levels)
+    buffer = np.zeros(0)
+
+    def run(toa: np.ndarray) -> Histograms:
+        analyzer.reset()
+        analyzer.update(toa)
+        return analyzer.result()
+    #enddef
+
+    for chunk in chunks:
+        toa = _toa(chunk)
+        if not toa.size:
+            continue
+        #endif
+        if start is None:
+            start = float(toa[0])
+        #endif
+        # with `step` longer than `window` the toa between windows are in
+        # none of them, and the buffer may run empty until the next chunk
+        buffer = np.concatenate((buffer, toa))
+        buffer = buffer[np.searchsorted(buffer, start, "left"):]
+        while buffer.size and buffer[-1] >= start + window:
+            end = np.searchsorted(buffer, start + window, "left")
+            yield start, run(buffer[:end])
+            start += step
+            buffer = buffer[np.searchsorted(buffer, start, "left"):]
+        #endwhile
+    #endfor
+    while buffer.size and start is not None:
+        yield start, run(buffer[:np.searchsorted(buffer, start + window, "left")])
+        start += step
+        buffer = buffer[np.searchsorted(buffer, start, "left"):]
+    #endwhile
+#enddef
+
+
+def read_toa(path: str | Path, chunk_size: int = 1 << 20) -> Iterator[np.ndarray]:
+    """toa column of a generated output in chunks.
+
+    `.npy` directories and files are memory-mapped, `.csv` is read with
+    pandas, `.parquet` and `.arrow` ipc streams with pyarrow, one chunk
+    at a time.
+    """
+
+    path = Path(path)
+    suffix = path.suffix.lower()
+    if suffix == ".npy":
+        toa = np.load(path / "toa.npy" if path.is_dir() else path, mmap_mode="r")
+        for start in range(0, toa.size, chunk_size):
+            yield np.asarray(toa[start:start+chunk_size], dtype=np.float64)
+        #endfor
+    elif suffix == ".csv":
+        import pandas as pd
+        with pd.read_csv(
+            path,
+            usecols=["TOA"],
+            chunksize=chunk_size,
+            float_precision="round_trip"
+        ) as reader:
+            for frame in reader:
+                yield frame["TOA"].to_numpy(dtype=np.float64)
+            #endfor
+        #endwith
+    elif suffix == ".parquet":
+        import_pyarrow()
+        import pyarrow.parquet as pq
+        for batch in pq.ParquetFile(path).iter_batches(chunk_size, columns=["toa"]):
+            yield batch.column(0).to_numpy()
+        #endfor
+    elif suffix in (".arrow", ".arrows"):
+        import_pyarrow()
+        import pyarrow.ipc
+        with pyarrow.ipc.open_stream(pyarrow.memory_map(str(path))) as reader:
+            for batch in reader:
+                toa = batch.column("toa").to_numpy()
+                for start in range(0, toa.size, chunk_size):
+                    yield toa[start:start+chunk_size]
+                #endfor
+            #endfor
+        #endwith
+    else:
+        raise ValueError(
+            f"unsupported output `{path}`, expected `.npy`, `.csv`, `.parquet` or `.arrow`"
+        )
+    #endif
+#enddef
@@ -0,0 +1,178 @@
+import argparse
+import sys
+from typing import Sequence
+
+from loguru import logger
+
+from . import pipeline, scenario, sink, stats
+from .radar import SCHEDULERS
+from .radar.receiver import POLICIES
+
+
+def _precision(text: str) -> dict[str, int]:
+    """parse `toa=3,rf=2` into a column to decimals map."""
+
+    return {name: int(digits) for name, digits in _column_items(text)}
+#enddef
+
+
+def _column_items(text: str) -> list[tuple[str, str]]:
+    items = []
+    for item in text.split(","):
+        name, _, value = item.partition("=")
+        items.append((name.strip(), value))
+    #endfor
+    return items
+#enddef
+
+
+def _column_floats(text: str) -> dict[str, float]:
+    """parse `toa=0.1,rf=2` into a column to value map."""
+
+    return {name: float(value) for name, value in _column_items(text)}
+#enddef
+
+
+def _parser() -> argparse.ArgumentParser:
+    parser = argparse.ArgumentParser(
+        prog="radar_generator",
+        description="generate radar pulses from a toml scenario without the ui",
+    )
+    parser.add_argument("config", help="toml config saved by the ui, `{radar = [...]}`")
+    parser.add_argument(
+        "-o", "--output",
+        default="-",
+        help=f"output file, format by extension ({', '.join(sink.SINKS)}), `-` for csv on stdout",
+    )
+    limit = parser.add_mutually_exclusive_group(required=True)
+    limit.add_argument("-n", "--pulse-num", type=int, help="number of pulses to generate")
+    limit.add_argument("-t", "--end-toa", type=float, help="generate pulses arriving before this toa")
+    parser.add_argument("--seed", type=int, help="overrides the seed of the config")
+    parser.add_argument(
+        "--no-cache",
+        action="store_true",
+        help="do not read or write the compiled config cache next to the config",
+    )
+    parser.add_argument(
+        "-j", "--workers",
+        type=int,
+        default=1,
+        help="worker processes, see --split",
+    )
+    parser.add_argument(
+        "--split",
+        choices=("radar", "time"),
+        default="radar",
+        help="how workers share the work, by radar, or by time window (needs --end-toa)",
+    )
+    parser.add_argument(
+        "--scheduler",
+        choices=tuple(SCHEDULERS),
+        default="merge",
+        help="how radar blocks are merged, `blocks` is faster with thousands of radars",
+    )
+    parser.add_argument(
+        "--receiver",
+        choices=POLICIES,
+        help="what the receiver does with overlapping pulses, no receiver by default",
+    )
+    parser.add_argument(
+        "--dead-time",
+        type=float,
+        default=0.,
+        help="receiver dead time after every pulse, with --receiver",
+    )
+    parser.add_argument(
+        "--quantize",
+        type=_column_floats,
+        help="round columns to multiples of a step after the receiver, e.g. `toa=0.025,rf=1`",
+    )
+    parser.add_argument(
+        "--noise",
+        type=_column_floats,
+        help="gaussian measurement noise std per column, added last, e.g. `doa=0.5,pa=1`",
+    )
+    parser.add_argument(
+        "--stats",
+        action="store_true",
+        help="save per-radar statistics of the output next to it, as `<output>.stats.json`",
+    )
+    parser.add_argument(
+        "--block-size",
+        type=int,
+        help="pulses generated per radar block, by default fewer the more radars there are",
+    )
+    parser.add_argument(
+        "--precision",
+        type=_precision,
+        help="csv decimals per column, e.g. `toa=3,rf=2`, others keep full precision",
+    )
+    parser.add_argument("-v", "--verbose", action="store_true", help="debug logging")
+    return parser
+#enddef
+
+
+def main(argv: Sequence[str] | None = None) -> int:
+    args = _parser().parse_args(argv)
+    logger.remove()
+    logger.add(sys.stderr, level="DEBUG" if args.verbose else "INFO")
+
+    if args.split == "time" and args.end_toa is None:
+        logger.error("`--split time` needs `--end-toa`")
+        return 1
+    #endif
+    if args.stats and args.output == "-":
+        logger.error("`--stats` needs an output file")
+        return 1
+    #endif
+    options = {}
+    if args.precision:
+        options["precision"] = args.precision
+    #endif
+    try:
+        g = scenario.load(args.config, not args.no_cache).generator(args.seed)
+        g.scheduler = args.scheduler
+        stages: list[pipeline.Stage] = []
+        if args.receiver:
+            stages.append(pipeline.Overlap(args.receiver, args.dead_time))
+        #endif
+        if args.quantize:
+            stages.append(pipeline.Quantize(args.quantize))
+        #endif
+        if args.noise:
+            stages.append(pipeline.Noise(args.noise, g.seed))
+        #endif
+        summary = stats.Summary() if args.stats else None
+        if summary is not None:
+            stages.append(summary)
+        #endif
+        output = sink.open_sink(args.output, **options)
+    except (OSError, ValueError) as e:
+        logger.error(e)
+        return 1
+    #endtry
+    logger.info(f"seed {g.seed}")
+
+    chunks = pipeline.source(
+        g,
+        args.pulse_num,
+        args.end_toa,
+        args.workers,
+        args.block_size,
+        args.split
+    )
+    timings = pipeline.Pipeline(chunks, stages, [output]).run()
+    logger.debug("timings\n" + pipeline.format_report(timings))
+    logger.info(f"{timings[-1].pulses_in} pulses written to `{args.output}`")
+    for stage in stages:
+        if isinstance(stage, pipeline.Overlap):
+            logger.info(f"{stage.collided} of them collided in the receiver ({args.receiver})")
+        #endif
+    #endfor
+    if summary is not None:
+        summary.count_lost(g, args.end_toa)
+        summary.save(stats.sidecar_path(args.output))
+        logger.info(f"statistics saved to `{stats.sidecar_path(args.output)}`")
+    #endif
+    return 0
+#enddef
@@ -1,99 +1,619 @@
-import random
-from itertools import cycle
+import math
+from abc import abstractmethod
+from dataclasses import dataclass
+from functools import cached_property
 from typing import Generator, TypeAlias, overload
+
+import numpy as np
 Parameter: TypeAlias = Generator[float, None, None]
 
 
+class Pattern:
+    """ finite sequence of values computed on demand.
+
+    stands for a `list[float]` value of `init`, without holding the
+    values, `at` and `prefix` are vectorized over indices.
+    """
+
+    @abstractmethod
+    def __len__(self) -> int:
+        pass
+    #enddef
+
+    @abstractmethod
+    def at(self, indices: np.ndarray) -> np.ndarray:
+        """values at `indices` in `[0, len)`."""
+    #enddef
+
+    @abstractmethod
+    def prefix(self, m: np.ndarray) -> np.ndarray:
+        """sums of the first `m` values, `m` in `[0, len]`."""
+    #enddef
+
+    @abstractmethod
+    def bounds(self) -> tuple[float, float]:
+        """smallest and largest value."""
+    #enddef
+
+    @abstractmethod
+    def _guess(self, x: float) -> int:
+        pass
+    #enddef
+
+    def search(self, x: float) -> int:
+        """largest `m` with `prefix(m) <= x`, for positive values."""
+
+        m = min(max(self._guess(x), 0), len(self))
+        while m < len(self) and self.prefix(m + 1) <= x:
+            m += 1
+        #endwhile
+        while m > 0 and self.prefix(m) > x:
+            m -= 1
+        #endwhile
+        return m
+    #enddef
+#endclass
+
+
+@dataclass(eq=False, order=False, frozen=True)
+class Arithmetic(Pattern):
+    """ `size` values `start, start + step, ...`, a slip sweep."""
+
+    start: float
+    step: float
+    size: int
+
+    @classmethod
+    def range(cls, start: float, end: float, step: float) -> "Arithmetic":
+        """values from `start` towards `end`, `end` excluded."""
+
+        if step == 0 or not math.isfinite(step):
+            raise ValueError(f"invalid step `{step}`")
+        #endif
+        def before_end(i: int) -> bool:
+            value = start + i * step
+            return value < end if step > 0 else value > end
+        #enddef
+        size = max(math.ceil((end - start) / step), 0)
+        while size > 0 and not before_end(size - 1):
+            size -= 1
+        #endwhile
+        while before_end(size):
+            size += 1
+        #endwhile
+        return cls(start, step, size)
+    #enddef
+
+    def __len__(self) -> int:
+        return self.size
+    #enddef
+
+    def at(self, indices: np.ndarray) -> np.ndarray:
+        return self.start + indices * self.step
+    #enddef
+
+    def prefix(self, m: np.ndarray) -> np.ndarray:
+        return m * self.start + (m * (m - 1) // 2) * self.step
+    #enddef
+
+    def bounds(self) -> tuple[float, float]:
+        last = self.start + (self.size - 1) * self.step
+        return min(self.start, last), max(self.start, last)
+    #enddef
+
+    def _guess(self, x: float) -> int:
+        # root of `step/2 m^2 + (start - step/2) m = x`
+        b = self.start - self.step / 2
+        discriminant = b * b + 2 * self.step * x
+        if discriminant < 0:
+            return self.size
+        #endif
+        denominator = b + math.sqrt(discriminant)
+        return int(2 * x / denominator) if denominator > 0 else self.size
+    #enddef
+#endclass
+
+
+@dataclass(eq=False, order=False, frozen=True)
+class Repeat(Pattern):
+    """ every value of `values` repeated `times` times, a group pattern."""
+
+    values: Pattern | tuple[float, ...]
+    times: int
+
+    @cached_property
+    def _inner(self) -> Pattern:
+        return as_pattern(self.values)
+    #enddef
+
+    def __len__(self) -> int:
+        return len(self.values) * self.times
+    #enddef
+
+    def at(self, indices: np.ndarray) -> np.ndarray:
+        return self._inner.at(indices // self.times)
+    #enddef
+
+    def prefix(self, m: np.ndarray) -> np.ndarray:
+        inner = self._inner
+        groups, offsets = np.divmod(m, self.times)
+        last = np.minimum(groups, len(inner) - 1)
+        return self.times * inner.prefix(groups) + offsets * inner.at(last)
+    #enddef
+
+    def bounds(self) -> tuple[float, float]:
+        return self._inner.bounds()
+    #enddef
+
+    def _guess(self, x: float) -> int:
+        inner = self._inner
+        group = min(inner.search(x / self.times), len(inner) - 1)
+        rest = x - self.times * inner.prefix(group)
+        return group * self.times + int(rest // inner.at(group))
+    #enddef
+#endclass
+
+
+class _Values(Pattern):
+    """ explicit values."""
+
+    _values: np.ndarray
+    _sums: np.ndarray
+
+    def __init__(self, values: list[float] | tuple[float, ...]) -> None:
+        self._values = np.asarray(values, dtype=np.float64)
+        self._sums = np.concatenate(([0.], np.cumsum(self._values)))
+    #enddef
+
+    def __len__(self) -> int:
+        return self._values.size
+    #enddef
+
+    def at(self, indices: np.ndarray) -> np.ndarray:
+        return self._values[indices]
+    #enddef
+
+    def prefix(self, m: np.ndarray) -> np.ndarray:
+        return self._sums[m]
+    #enddef
+
+    def bounds(self) -> tuple[float, float]:
+        return float(self._values.min()), float(self._values.max())
+    #enddef
+
+    def _guess(self, x: float) -> int:
+        return int(np.searchsorted(self._sums, x, "right")) - 1
+    #enddef
+#endclass
+
+
+class _Tabulated(Pattern):
+    """ pattern computed once as a table of one period.
+
+    looking values up costs the same for any length, the table is
+    recomputed after unpickling instead of stored.
+    """
+
+    @abstractmethod
+    def _compute(self) -> np.ndarray:
+        pass
+    #enddef
+
+    @cached_property
+    def _table(self) -> _Values:
+        return _Values(self._compute())
+    #enddef
+
+    def __getstate__(self) -> dict:
+        state = self.__dict__.copy()
+        state.pop("_table", None)
+        return state
+    #enddef
+
+    def __len__(self) -> int:
+        return len(self._table)
+    #enddef
+
+    def at(self, indices: np.ndarray) -> np.ndarray:
+        return self._table.at(indices)
+    #enddef
+
+    def prefix(self, m: np.ndarray) -> np.ndarray:
+        return self._table.prefix(m)
+    #enddef
+
+    def bounds(self) -> tuple[float, float]:
+        return self._table.bounds()
+    #enddef
+
+    def _guess(self, x: float) -> int:
+        return self._table._guess(x)
+    #enddef
+#endclass
+
+
+@dataclass(eq=False, order=False, frozen=True)
+class Sine(_Tabulated):
+    """ `size` values of one period of `center + amplitude * sin`, a
+    sinusoidal slip.
+    """
+
+    center: float
+    amplitude: float
+    size: int
+
+    def _compute(self) -> np.ndarray:
+        phase = 2 * np.pi * np.arange(self.size) / self.size
+        return self.center + self.amplitude * np.sin(phase)
+    #enddef
+#endclass
+
+
+@dataclass(eq=False, order=False, frozen=True)
+class Hop(_Tabulated):
+    """ `size` values drawn from `channels` with `seed`, a hopping table.
+
+    the table is fixed by `seed` alone, so every run of a scenario hops
+    the same way.
+    """
+
+    channels: Pattern | tuple[float, ...]
+    size: int
+    seed: int = 0
+
+    def _compute(self) -> np.ndarray:
+        channels = as_pattern(self.channels)
+        rng = np.random.default_rng(self.seed)
+        return channels.at(rng.integers(len(channels), size=self.size))
+    #enddef
+#endclass
+
+
+def as_pattern(value: Pattern | list[float] | tuple[float, ...]) -> Pattern:
+    return value if isinstance(value, Pattern) else _Values(value)
+#enddef
+
+
 @overload
-def init(value: float, *, std: float | None = None) -> Parameter: ...
+def init(value: float, *, std: float | None = None, rng: np.random.Generator | None = None) -> Parameter: ...
 @overload
-def init(value: list[float], *, std: float | None = None) -> Parameter: ...
+def init(value: list[float], *, std: float | None = None, rng: np.random.Generator | None = None) -> Parameter: ...
 @overload
-def init(value: list[float], *, std: float | None = None, group_size: int) -> Parameter: ...
+def init(value: list[float], *, std: float | None = None, group_size: int, rng: np.random.Generator | None = None) -> Parameter: ...
 @overload
-def init(value: float, *, jitter_rate: float) -> Parameter: ...
+def init(value: Pattern, *, std: float | None = None, group_size: int | None = None, random: bool = False, rng: np.random.Generator | None = None) -> Parameter: ...
 @overload
-def init(value: list[float], *, std: float | None = None, group_size: int | None = None, random: bool = True) -> Parameter: ...
+def init(value: float, *, jitter_rate: float, rng: np.random.Generator | None = None) -> Parameter: ...
+@overload
+def init(value: list[float], *, std: float | None = None, group_size: int | None = None, random: bool = True, rng: np.random.Generator | None = None) -> Parameter: ...
 def init(
-    value: float | list[float],
+    value: float | list[float] | Pattern,
     *,
     std: float | None = None,
     group_size: int | None = None,
     jitter_rate: float | None = None,
-    random: bool = False
+    random: bool = False,
+    rng: np.random.Generator | None = None,
 ) -> Parameter:
     """initialize a parameter generator.
 
-    @param value: base value to generator
+    @param value: base value to generator, a list or a lazy `Pattern`
     @param std: std of value
     @param group_size: specific for grouped change parameter
     @param jitter_rate: jitter rate for jitter change parameter
     @param random: if random choose value or not
+    @param rng: random generator to draw from
     @return: a parameter generator
     """
 
+    return _iter_block(init_block(
+        value,
+        std=std,
+        group_size=group_size,
+        jitter_rate=jitter_rate,
+        random=random,
+        rng=rng
+    ))
+#enddef
+
+
+def _iter_block(block: "BlockParameter", size: int = 1024) -> Parameter:
+    # values are drawn in blocks, so the generator yields exactly what
+    # `take` would for the same random generator
+    while True:
+        yield from block.take(size).tolist()
+    #endwhile
+#enddef
+
+
+def init_block(
+    value: float | list[float] | Pattern,
+    *,
+    std: float | None = None,
+    group_size: int | None = None,
+    jitter_rate: float | None = None,
+    random: bool = False,
+    rng: np.random.Generator | None = None,
+) -> "BlockParameter":
+    """initialize a block parameter, block version of `init`.
+
+    @param value: base value to generator, a list or a lazy `Pattern`
+    @param std: std of value
+    @param group_size: specific for grouped change parameter
+    @param jitter_rate: jitter rate for jitter change parameter
+    @param random: if random choose value or not
+    @param rng: random generator to draw from
+    @return: a block parameter, call `take(n)` to get next `n` values
+    """
+
+    rng = rng or np.random.default_rng()
     if isinstance(value, (float, int)):
         if jitter_rate is None:
-            return _init_fixed_value(value, std)
+            return _FixedBlock(value, std, rng)
         #endif
-        return _init_jitter_value(value, jitter_rate)
-    elif isinstance(value, list):
+        return _JitterBlock(value, jitter_rate, rng)
+    elif isinstance(value, (list, tuple, Pattern)):
         if random:
-            return _init_random_value(value, group_size, std)
-        #endif
-        if group_size is not None:
-            value = [v for v in value for _ in range(group_size)]
+            return _RandomBlock(value, group_size, std, rng)
         #endif
-        return _init_list_value(value, std)
+        return _ListBlock(value, group_size, std, rng)
     else:
-        raise ValueError(f"`float` or `list[float]` is needed, but `{type(value)}` got")
+        raise ValueError(f"`float`, `list[float]` or `Pattern` is needed, but `{type(value)}` got")
     #endif
 #enddef
 
 
-def _init_fixed_value(value: float, std: float | None) -> Parameter:
-    while True:
-        yield (
-            value if std is None
-            else random.gauss(value, std)
-        )
-    #endwhile
-#enddef
+class RandomStream:
+    """ uniform random numbers addressed by position.
 
+    the bit generator is advanced to `index * draws` instead of stepped,
+    so values at any position are drawn in O(1) and the same position
+    always gives the same numbers. needs a bit generator with `advance`,
+    like the default `PCG64`. the stream draws from a private copy of the
+    given bit generator, which is left untouched, so values only depend
+    on its state and the position.
+    """
 
-def _init_list_value(value: list[float], std: float | None) -> Parameter:
-    it = cycle(value)
-    while True:
-        v = next(it)
-        if std is not None:
-            v = random.gauss(v, std)
-        #endif
-        yield v
-    #endwhile
-#enddef
+    _bit_generator: np.random.BitGenerator
+    _generator: np.random.Generator
+    _base: dict
+    _position: int
 
+    def __init__(self, bit_generator: np.random.BitGenerator) -> None:
+        self._bit_generator = type(bit_generator)()
+        self._bit_generator.state = bit_generator.state
+        self._generator = np.random.Generator(self._bit_generator)
+        self._base = bit_generator.state
+        self._position = 0
+    #enddef
 
-def _init_jitter_value(value: float, jitter_rate: float) -> Parameter:
-    bound = value * jitter_rate
-    while True:
-        yield value + random.uniform(-bound, bound)
-    #endwhile
-#enddef
+    def uniform(self, index: int, n: int, draws: int = 1) -> np.ndarray:
+        """uniform numbers in [0, 1) of positions [index, index+n).
 
+        @param draws: numbers per position
+        @return: array of shape `(n, draws)`, or `(n,)` for one draw
+        """
 
-def _init_random_value(
-    value: list[float],
-    group_size: int | None,
-    std: float | None,
-) -> Parameter:
-    group_size = group_size or 1
-    while True:
-        v = random.choice(value)
-        for _ in range(group_size):
-            if std is not None:
-                v = random.gauss(v, std)
+        position = int(index) * draws
+        if position != self._position:
+            if not hasattr(self._bit_generator, "advance"):
+                raise ValueError(
+                    f"`{type(self._bit_generator).__name__}` can not be advanced"
+                )
             #endif
-            yield v
-        #endfor
-    #endwhile
-#enddef
+            self._bit_generator.state = self._base
+            self._bit_generator.advance(position)
+        #endif
+        values = self._generator.random(n * draws)
+        self._position = position + n * draws
+        return values if draws == 1 else values.reshape(n, draws)
+    #enddef
+
+    def normal(self, index: int, n: int) -> np.ndarray:
+        """standard normal numbers of positions [index, index+n).
+
+        box-muller of two uniform numbers per position, unlike the
+        ziggurat of `Generator.normal` it draws a fixed count per value.
+        """
+
+        u = self.uniform(index, n, 2)
+        return np.sqrt(-2. * np.log1p(-u[:, 0])) * np.cos(2. * np.pi * u[:, 1])
+    #enddef
+#endclass
+
+
+class BlockParameter:
+    """ parameter producing values block by block.
+
+    `index` is the position of the next value, the same position the
+    per-pulse generator would be at after `index` calls of `next`. random
+    numbers are addressed by position, so `seek` moves to any index at
+    no cost and the values from there are the same as if stepped.
+    """
+
+    _index: int
+    _std: float | None
+    # values and noise are drawn from two independent streams
+    _values_stream: RandomStream
+    _noise_stream: RandomStream
+
+    def __init__(self, std: float | None, rng: np.random.Generator) -> None:
+        self._index = 0
+        self._std = std
+        self._values_stream = RandomStream(rng.bit_generator)
+        self._noise_stream = RandomStream(rng.bit_generator.jumped())
+    #enddef
+
+    @property
+    def index(self) -> int:
+        return self._index
+    #enddef
+
+    @property
+    def periodic(self) -> bool:
+        """values repeat with a fixed period and no randomness."""
+
+        return False
+    #enddef
+
+    def seek(self, index: int) -> None:
+        """move to value `index`."""
+
+        self._index = index
+    #enddef
+
+    def take(self, n: int) -> np.ndarray:
+        """take next `n` values as a float64 array."""
+
+        values = self._take(self._index, n)
+        if self._std is not None:
+            values = values + self._std * self._noise_stream.normal(self._index, n)
+        #endif
+        self._index += n
+        return values
+    #enddef
+
+    @abstractmethod
+    def _take(self, index: int, n: int) -> np.ndarray:
+        """base values of [index, index+n) without std."""
+    #enddef
+#endclass
+
+
+class _FixedBlock(BlockParameter):
+    """ fixed value."""
+
+    _value: float
+
+    def __init__(self, value: float, std: float | None, rng: np.random.Generator) -> None:
+        super().__init__(std, rng)
+        self._value = value
+    #enddef
+
+    @property
+    def periodic(self) -> bool:
+        return self._std is None
+    #enddef
+
+    def cumulative(self, n: np.ndarray) -> np.ndarray:
+        """sum of the first `n` values, only for periodic parameters."""
+
+        return n * self._value
+    #enddef
+
+    def inverse(self, x: float) -> int:
+        """about the count of values summing up to `x`, inverse of `cumulative`."""
+
+        return max(int(x // self._value), 0)
+    #enddef
+
+    def _take(self, index: int, n: int) -> np.ndarray:
+        return np.full(n, self._value, dtype=np.float64)
+    #enddef
+#endclass
+
+
+class _ListBlock(BlockParameter):
+    """ cycle over values, each repeated `group_size` times."""
+
+    _pattern: Pattern
+    _size: int
+    _period: float
+
+    def __init__(
+        self,
+        value: list[float] | Pattern,
+        group_size: int | None,
+        std: float | None,
+        rng: np.random.Generator,
+    ) -> None:
+        super().__init__(std, rng)
+        pattern = as_pattern(value)
+        if group_size is not None and group_size > 1:
+            pattern = Repeat(pattern, group_size)
+        #endif
+        self._pattern = pattern
+        self._size = len(pattern)
+        self._period = float(pattern.prefix(self._size))
+    #enddef
+
+    @property
+    def periodic(self) -> bool:
+        return self._std is None
+    #enddef
+
+    def cumulative(self, n: np.ndarray) -> np.ndarray:
+        """sum of the first `n` values, only for periodic parameters.
+
+        whole periods plus the prefix sum inside the period, so any `n`
+        costs the same.
+        """
+
+        periods, rest = np.divmod(n, self._size)
+        return periods * self._period + self._pattern.prefix(rest)
+    #enddef
+
+    def inverse(self, x: float) -> int:
+        """about the count of values summing up to `x`, inverse of `cumulative`."""
+
+        if x <= 0:
+            return 0
+        #endif
+        periods = int(x // self._period)
+        return periods * self._size + self._pattern.search(x - periods * self._period)
+    #enddef
+
+    def _take(self, index: int, n: int) -> np.ndarray:
+        return self._pattern.at(np.arange(index, index + n) % self._size)
+    #enddef
+#endclass
+
+
+class _JitterBlock(BlockParameter):
+    """ value uniformly jittered by `value * jitter_rate`."""
+
+    _value: float
+    _bound: float
+
+    def __init__(self, value: float, jitter_rate: float, rng: np.random.Generator) -> None:
+        super().__init__(None, rng)
+        self._value = value
+        self._bound = value * jitter_rate
+    #enddef
+
+    def _take(self, index: int, n: int) -> np.ndarray:
+        u = self._values_stream.uniform(index, n)
+        return (self._value - self._bound) + (2 * self._bound) * u
+    #enddef
+#endclass
+
+
+class _RandomBlock(BlockParameter):
+    """ randomly choose a value for every group of `group_size`."""
+
+    _values: Pattern
+    _group_size: int
+
+    def __init__(
+        self,
+        value: list[float] | Pattern,
+        group_size: int | None,
+        std: float | None,
+        rng: np.random.Generator,
+    ) -> None:
+        super().__init__(std, rng)
+        self._values = as_pattern(value)
+        self._group_size = group_size or 1
+    #enddef
+
+    def _take(self, index: int, n: int) -> np.ndarray:
+        if n <= 0:
+            return np.empty(0, dtype=np.float64)
+        #endif
+        groups = np.arange(index, index + n) // self._group_size
+        # one draw per group, addressed by the group index
+        u = self._values_stream.uniform(groups[0], groups[-1] - groups[0] + 1)
+        choices = self._values.at((u * len(self._values)).astype(np.intp))
+        return choices[groups - groups[0]]
+    #enddef
+#endclass
@@ -0,0 +1,260 @@
+import time
+from contextlib import ExitStack
+from dataclasses import dataclass, replace
+from typing import Iterable, Iterator, Sequence
+
+import numpy as np
+
+from .radar import Generator, PDWBatch, Split
+from .radar.receiver import Policy, Receiver
+from .sink import Sink
+
+
+def source(
+    generator: Generator,
+    pulse_num: int | None = None,
+    end_toa: float | None = None,
+    workers: int = 1,
+    block_size: int | None = None,
+    split: Split = "radar",
+) -> Iterator[PDWBatch]:
+    """merged chunks of the first `pulse_num` pulses or of the pulses
+    before `end_toa`, generated by a pool of `workers` processes if more
+    than one.
+    """
+
+    if workers > 1:
+        yield from generator.iter_generate(pulse_num, end_toa, workers, block_size, split)
+        return
+    #endif
+    # radars stop at the end toa, the stream ends with the last of them
+    stream = generator.stream(block_size, end_toa)
+    if pulse_num is not None:
+        yield from stream.iter_take(pulse_num)
+    elif end_toa is not None:
+        yield from stream
+    #endif
+#enddef
+
+
+class Stage:
+    """ step between source and sinks, a sorted chunk in and out.
+
+    a stage may hold pulses back across chunks, `flush` returns them at
+    the end of the stream.
+    """
+
+    @property
+    def name(self) -> str:
+        return type(self).__name__.lower()
+    #enddef
+
+    def process(self, chunk: PDWBatch) -> PDWBatch:
+        return chunk
+    #enddef
+
+    def flush(self) -> PDWBatch:
+        return PDWBatch.empty()
+    #enddef
+#endclass
+
+
+def _columns(values: dict[str, float]) -> dict[str, float]:
+    unknown = set(values) - {"toa", "doa", "rf", "pw", "pa"}
+    if unknown:
+        raise ValueError(f"no float column named {', '.join(sorted(unknown))}")
+    #endif
+    return values
+#enddef
+
+
+class Noise(Stage):
+    """ gaussian measurement noise with `std` per column."""
+
+    def __init__(self, std: dict[str, float], seed: int | None = None) -> None:
+        self._std = _columns(std)
+        self._rng = np.random.default_rng(seed)
+    #enddef
+
+    def process(self, chunk: PDWBatch) -> PDWBatch:
+        chunk = replace(chunk, **{
+            name: getattr(chunk, name) + std * self._rng.standard_normal(len(chunk))
+            for name, std in self._std.items()
+        })
+        if "toa" in self._std:
+            # noisy toa may swap neighbours, resorted within the chunk only,
+            # so stages needing a sorted stream go before
+            chunk = chunk[np.argsort(chunk.toa, kind="stable")]
+        #endif
+        return chunk
+    #enddef
+#endclass
+
+
+class Quantize(Stage):
+    """ columns rounded to multiples of `step`, e.g. a toa clock or rf
+    channel resolution.
+    """
+
+    def __init__(self, step: dict[str, float]) -> None:
+        self._step = _columns(step)
+        if any(step <= 0 for step in self._step.values()):
+            raise ValueError("quantization step is not positive")
+        #endif
+    #enddef
+
+    def process(self, chunk: PDWBatch) -> PDWBatch:
+        return replace(chunk, **{
+            name: np.round(getattr(chunk, name) / step) * step
+            for name, step in self._step.items()
+        })
+    #enddef
+#endclass
+
+
+class Loss(Stage):
+    """ independent loss of received pulses with `rate`."""
+
+    def __init__(self, rate: float, seed: int | None = None) -> None:
+        if not 0 <= rate < 1:
+            raise ValueError("`rate` is out of [0, 1)")
+        #endif
+        self._rate = rate
+        self._rng = np.random.default_rng(seed)
+    #enddef
+
+    def process(self, chunk: PDWBatch) -> PDWBatch:
+        return chunk[self._rng.random(len(chunk)) >= self._rate]
+    #enddef
+#endclass
+
+
+class Overlap(Stage):
+    """ `Receiver` as a stage, counting the collided pulses it reports."""
+
+    receiver: Receiver
+    collided: int
+
+    def __init__(self, policy: Policy = "drop", dead_time: float = 0.) -> None:
+        self.receiver = Receiver(policy, dead_time)
+        self.collided = 0
+    #enddef
+
+    def process(self, chunk: PDWBatch) -> PDWBatch:
+        return self._count(*self.receiver.process(chunk))
+    #enddef
+
+    def flush(self) -> PDWBatch:
+        return self._count(*self.receiver.flush())
+    #enddef
+
+    def _count(self, chunk: PDWBatch, collided: np.ndarray) -> PDWBatch:
+        self.collided += int(np.count_nonzero(collided))
+        return chunk
+    #enddef
+#endclass
+
+
+@dataclass(eq=False)
+class Timing:
+    """ time spent in one step of a pipeline, and its pulses in and out."""
+
+    name: str
+    seconds: float = 0.
+    pulses_in: int = 0
+    pulses_out: int = 0
+
+    def add(self, seconds: float, pulses_in: int, pulses_out: int) -> None:
+        self.seconds += seconds
+        self.pulses_in += pulses_in
+        self.pulses_out += pulses_out
+    #enddef
+#endclass
+
+
+def format_report(timings: Sequence[Timing]) -> str:
+    """timings as a table, one line per step."""
+
+    total = sum(t.seconds for t in timings) or 1.
+    return "\n".join(
+        f"{t.name:<24} {t.seconds:9.3f} s {100 * t.seconds / total:5.1f} % "
+        f"{t.pulses_in:>12,} -> {t.pulses_out:<12,}"
+        for t in timings
+    )
+#enddef
+
+
+class Pipeline:
+    """ chunks of a source through ordered stages into every sink.
+
+    every step is timed, `run` returns the timings of the source, each
+    stage and each sink, in that order.
+    """
+
+    source: Iterable[PDWBatch]
+    stages: list[Stage]
+    sinks: list[Sink]
+
+    def __init__(
+        self,
+        source: Iterable[PDWBatch],
+        stages: Sequence[Stage] = (),
+        sinks: Sequence[Sink] = (),
+    ) -> None:
+        self.source = source
+        self.stages = list(stages)
+        self.sinks = list(sinks)
+    #enddef
+
+    def run(self) -> list[Timing]:
+        """run to the end of the source, the sinks are closed after."""
+
+        timings = [Timing("source")]
+        timings += [Timing(stage.name) for stage in self.stages]
+        timings += [Timing(f"sink {s.path}") for s in self.sinks]
+        with ExitStack() as stack:
+            for s in self.sinks:
+                stack.enter_context(s)
+            #endfor
+            chunks = iter(self.source)
+            while True:
+                start = time.perf_counter()
+                chunk = next(chunks, None)
+                if chunk is None:
+                    break
+                #endif
+                timings[0].add(time.perf_counter() - start, 0, len(chunk))
+                self._push(chunk, 0, timings)
+            #endwhile
+            for i, stage in enumerate(self.stages):
+                start = time.perf_counter()
+                chunk = stage.flush()
+                timings[1 + i].add(time.perf_counter() - start, 0, len(chunk))
+                self._push(chunk, i + 1, timings)
+            #endfor
+        #endwith
+        return timings
+    #enddef
+
+    def _push(self, chunk: PDWBatch, first: int, timings: list[Timing]) -> None:
+        """pass a chunk through the stages from `first` on, into the sinks."""
+
+        for i, stage in enumerate(self.stages[first:], first):
+            if not len(chunk):
+                return
+            #endif
+            start = time.perf_counter()
+            size = len(chunk)
+            chunk = stage.process(chunk)
+            timings[1 + i].add(time.perf_counter() - start, size, len(chunk))
+        #endfor
+        if not len(chunk):
+            return
+        #endif
+        for i, s in enumerate(self.sinks):
+            start = time.perf_counter()
+            s.write(chunk)
+            timings[1 + len(self.stages) + i].add(time.perf_counter() - start, len(chunk), 0)
+        #endfor
+    #enddef
+#endclass
@@ -1,30 +1,244 @@
 import heapq
-from typing import Iterator
+import secrets
+from typing import Iterator, Literal, TypeAlias
 
-from .types import PDW, Radar
+import numpy as np
+
+from . import parallel
+from .merge import ChunkStream, MergeStream
+from .schedule import BlockSchedule
+from .types import PDW, PDWBatch, Radar
+
+Split: TypeAlias = Literal["radar", "time"]
+Scheduler: TypeAlias = Literal["merge", "blocks"]
+SCHEDULERS: dict[str, type[ChunkStream]] = {
+    "merge": MergeStream,
+    "blocks": BlockSchedule,
+}
 
 
 class Generator:
     """ radar Generator."""
 
     _radars: list[Radar]
+    seed: int
+    # `merge` tops up every radar each round, `blocks` schedules radar
+    # blocks by the toa they reach, see `BlockSchedule`
+    scheduler: Scheduler
 
-    def __init__(self) -> None:
+    def __init__(self, seed: int | None = None, scheduler: Scheduler = "merge") -> None:
         self._radars = []
+        self.seed = secrets.randbits(63) if seed is None else seed
+        self.scheduler = scheduler
+    #enddef
+
+    def _seeds(self) -> list[np.random.SeedSequence]:
+        """one seed per radar, spawned from the generator seed."""
+
+        return np.random.SeedSequence(self.seed).spawn(len(self._radars))
     #enddef
 
     def __iter__(self) -> Iterator[PDW]:
-        iters = [iter(radar) for radar in self._radars]
-        qq = [next(radar) for radar in iters]
+        return self.pulses()
+    #enddef
+
+    def pulses(self, end_toa: float | None = None) -> Iterator[PDW]:
+        """iterate merged pulses one by one, through a heap of pulses, or
+        from the chunks of `stream` with the `blocks` scheduler.
+
+        @param end_toa: stop before it, radars leave the merge as soon as
+            they reach it
+        """
+
+        if self.scheduler == "blocks":
+            return (pdw for chunk in self.stream(end_toa=end_toa) for pdw in chunk)
+        #endif
+        # every radar buffers a block of pulses, about a million in all
+        block_size = min(max((1 << 20) // max(len(self._radars), 1), 16), 1024)
+        iters = [
+            self._iter_marked(radar.iter_reached(block_size, seed, end_toa=end_toa))
+            for radar, seed in zip(self._radars, self._seeds())
+        ]
+        return self._iter_heap(iters)
+    #enddef
+
+    @staticmethod
+    def _iter_marked(
+        blocks: Iterator[tuple[PDWBatch, float]],
+    ) -> Iterator[tuple[float, PDW | None]]:
+        """`(toa, pdw)` of every pulse, and a `(toa, None)` mark for every
+        block that lost all its pulses, so the heap moves past the radar.
+        """
+
+        for batch, reached in blocks:
+            if not len(batch):
+                yield reached, None
+            #endif
+            for pdw in batch:
+                yield pdw.toa, pdw
+            #endfor
+        #endfor
+    #enddef
+
+    def _iter_heap(self, iters: list[Iterator[tuple[float, PDW | None]]]) -> Iterator[PDW]:
+        # `(toa, radar index, pdw)` entries compare as floats and ints, the
+        # unique index keeps the pdw itself out of comparisons
+        qq = [
+            (item[0], i, item[1])
+            for i, item in enumerate(next(radar, None) for radar in iters)
+            if item is not None
+        ]
         heapq.heapify(qq)
-        while True:
-            pdw = heapq.heappop(qq)
-            yield pdw
-            next_pdw = next(iters[pdw.radar_id])
-            heapq.heappush(qq, next_pdw)
+        heapreplace = heapq.heapreplace
+        while qq:
+            _, i, pdw = qq[0]
+            if pdw is not None:
+                yield pdw
+            #endif
+            item = next(iters[i], None)
+            if item is None:
+                heapq.heappop(qq)
+            else:
+                heapreplace(qq, (item[0], i, item[1]))
+            #endif
         #endwhile
     #enddef
 
+    def stream(self, block_size: int | None = None, end_toa: float | None = None) -> ChunkStream:
+        """merged pulse stream of the `scheduler`, radars generate
+        `block_size` pulses at a time, by default fewer the more radars
+        there are, see `merge.default_block_size`.
+
+        @param end_toa: the stream ends before it, radars stop at it
+        """
+
+        if self.scheduler not in SCHEDULERS:
+            raise ValueError(f"unknown scheduler `{self.scheduler}`")
+        #endif
+        return SCHEDULERS[self.scheduler](self._radars, self._seeds(), block_size, end_toa=end_toa)
+    #enddef
+
+    def iter_blocks(self, block_size: int | None = None) -> Iterator[PDWBatch]:
+        """iterate merged pulses as columnar chunks."""
+
+        return self.stream(block_size)
+    #enddef
+
+    def take(self, n: int) -> PDWBatch:
+        """first `n` merged pulses."""
+
+        return self.stream().take(n)
+    #enddef
+
+    def until(self, toa: float) -> PDWBatch:
+        """merged pulses arriving before `toa`.
+
+        if every radar is periodic the exact count is known in advance and
+        the pulses are written into arrays of the final size, otherwise
+        every radar stops at `toa` and leaves the merge.
+        """
+
+        if not all(radar.periodic for radar in self._radars):
+            return PDWBatch.concat(self.stream(end_toa=toa))
+        #endif
+        seeds = self._seeds()
+        counts = [radar.count(toa, seed) for radar, seed in zip(self._radars, seeds)]
+        merged = PDWBatch.empty(sum(counts))
+        position = 0
+        for radar, seed in zip(self._radars, seeds):
+            for block in radar.iter_blocks(65536, seed, end_toa=toa):
+                for column, values in zip(merged._columns(), block._columns()):
+                    column[position:position+len(block)] = values
+                #endfor
+                position += len(block)
+            #endfor
+        #endfor
+        return merged[np.argsort(merged.toa, kind="stable")]
+    #enddef
+
+    def window(self, start: float, end: float) -> PDWBatch:
+        """merged pulses arriving in `[start, end)`, computed without
+        generating the pulses before `start`, every radar must be periodic.
+        """
+
+        merged = PDWBatch.concat(
+            radar.window(start, end, seed)
+            for radar, seed in zip(self._radars, self._seeds())
+        )
+        return merged[np.argsort(merged.toa, kind="stable")]
+    #enddef
+
+    def iter_generate(
+        self,
+        pulse_num: int | None = None,
+        end_toa: float | None = None,
+        workers: int | None = None,
+        block_size: int | None = None,
+        split: Split = "radar",
+    ) -> Iterator[PDWBatch]:
+        """generate with a process pool, merged chunks in toa order.
+
+        the chunks are the same as `take(pulse_num)` or `until(end_toa)`
+        for any number of workers.
+
+        @param split: `radar` shards radars across workers, `time` splits
+            `[0, end_toa)` into windows generated in parallel, which also
+            spreads a few very dense radars and keeps only a few windows in
+            memory, needs `end_toa`
+        """
+
+        if split == "time":
+            if end_toa is None or pulse_num is not None:
+                raise ValueError("`time` split needs `end_toa` and no `pulse_num`")
+            #endif
+            return parallel.iter_windows(
+                self._radars,
+                self._seeds(),
+                end_toa,
+                workers,
+                block_size
+            )
+        #endif
+        if split != "radar":
+            raise ValueError(f"unknown split `{split}`")
+        #endif
+        return parallel.iter_generate(
+            self._radars,
+            self._seeds(),
+            pulse_num,
+            end_toa,
+            workers,
+            block_size
+        )
+    #enddef
+
+    def generate(
+        self,
+        pulse_num: int | None = None,
+        end_toa: float | None = None,
+        workers: int | None = None,
+        block_size: int | None = None,
+        split: Split = "radar",
+    ) -> PDWBatch:
+        """generate with a process pool, see `iter_generate`."""
+
+        return PDWBatch.concat(self.iter_generate(pulse_num, end_toa, workers, block_size, split))
+    #enddef
+
+    @property
+    def radars(self) -> tuple[Radar, ...]:
+        return tuple(self._radars)
+    #enddef
+
+    def emitted(self, toa: float) -> list[int]:
+        """pulses every radar emits before `toa`, lost pulses included."""
+
+        return [
+            radar.locate([toa], seed)[0][0]
+            for radar, seed in zip(self._radars, self._seeds())
+        ]
+    #enddef
+
     def add(self, radar: Radar) -> None:
         self._radars.append(radar)
     #enddef
@@ -1,12 +1,36 @@
 from dataclasses import dataclass
+from enum import IntEnum
 
+import numpy as np
+
+from .kinematics import Geometry
 from .types import RadarParameter
 
 
-@dataclass(eq=False, order=False)
+class DOAMode(IntEnum):
+    """ doc."""
+
+    Fixed = 0
+    Track = 1
+#endclass
+
+
+@dataclass(eq=False, order=False, frozen=True)
 class DOA(RadarParameter):
-    """ DOA parameter."""
+    """ DOA parameter, `value` is an offset to the bearing of the emitter
+    if `geometry` is given.
+    """
 
     value: float
     std: float | None = None
+    geometry: Geometry | None = None
+
+    _toa_fields = ("geometry",)
+
+    def at_toa(self, values: np.ndarray, toa: np.ndarray) -> np.ndarray:
+        if self.geometry is None:
+            return values
+        #endif
+        return np.mod(values + self.geometry.bearing(toa), 360.)
+    #enddef
 #endclass
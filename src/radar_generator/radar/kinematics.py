@@ -0,0 +1,93 @@
+from dataclasses import dataclass
+from typing import Sequence
+
+import numpy as np
+
+
+@dataclass(eq=False, order=False, frozen=True)
+class Track:
+    """ piecewise constant-velocity motion on a plane.
+
+    segment `i` starts at `times[i]` from `positions[i]` with
+    `velocities[i]`, the last one never ends and toa before the first
+    segment keep its start position. a block of toa is located in the
+    segments with one `searchsorted`.
+    """
+
+    times: np.ndarray
+    # (n, 2) arrays of x and y
+    positions: np.ndarray
+    velocities: np.ndarray
+
+    @classmethod
+    def constant(
+        cls,
+        position: Sequence[float],
+        velocity: Sequence[float] = (0., 0.),
+        time: float = 0.,
+    ) -> "Track":
+        """track at `position` at `time`, moving with `velocity`."""
+
+        return cls(
+            np.array([time], dtype=np.float64),
+            np.array([position], dtype=np.float64),
+            np.array([velocity], dtype=np.float64)
+        )
+    #enddef
+
+    @classmethod
+    def waypoints(cls, times: Sequence[float], points: Sequence[Sequence[float]]) -> "Track":
+        """track passing `points` at increasing `times`, staying at the
+        last point.
+        """
+
+        times = np.asarray(times, dtype=np.float64)
+        points = np.asarray(points, dtype=np.float64).reshape(-1, 2)
+        if times.size == 0 or times.size != len(points):
+            raise ValueError("a waypoint is needed at every time")
+        #endif
+        if np.any(np.diff(times) <= 0):
+            raise ValueError("waypoint times are not increasing")
+        #endif
+        velocities = np.zeros_like(points)
+        velocities[:-1] = np.diff(points, axis=0) / np.diff(times)[:, None]
+        return cls(times, points, velocities)
+    #enddef
+
+    def position(self, toa: np.ndarray) -> np.ndarray:
+        """(n, 2) positions at every toa."""
+
+        segment = np.maximum(np.searchsorted(self.times, toa, "right") - 1, 0)
+        elapsed = np.maximum(toa - self.times[segment], 0.)
+        return self.positions[segment] + self.velocities[segment] * elapsed[:, None]
+    #enddef
+#endclass
+
+
+@dataclass(eq=False, order=False, frozen=True)
+class Geometry:
+    """ emitter and receiver tracks."""
+
+    emitter: Track
+    receiver: Track
+
+    def _offset(self, toa: np.ndarray) -> np.ndarray:
+        return self.emitter.position(toa) - self.receiver.position(toa)
+    #enddef
+
+    def bearing(self, toa: np.ndarray) -> np.ndarray:
+        """bearing of the emitter seen from the receiver, degrees clockwise
+        from the y axis in [0, 360).
+        """
+
+        offset = self._offset(toa)
+        return np.mod(np.degrees(np.arctan2(offset[:, 0], offset[:, 1])), 360.)
+    #enddef
+
+    def distance(self, toa: np.ndarray) -> np.ndarray:
+        """distance between emitter and receiver at every toa."""
+
+        offset = self._offset(toa)
+        return np.hypot(offset[:, 0], offset[:, 1])
+    #enddef
+#endclass
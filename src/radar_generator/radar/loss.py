@@ -0,0 +1,193 @@
+from abc import abstractmethod
+from dataclasses import dataclass
+from typing import Callable, TypeAlias
+
+import numpy as np
+
+from ..parameter import RandomStream
+
+# `mask(toa, index)` of the pulses `[index, index + toa.size)`, true for
+# the pulses kept
+Mask: TypeAlias = Callable[[np.ndarray, int], np.ndarray]
+
+
+@dataclass(eq=False, order=False, frozen=True)
+class LossModel:
+    """ pulse loss model, builds the drop mask of a whole block at once."""
+
+    @abstractmethod
+    def masker(self, stream: RandomStream) -> Mask:
+        """mask function drawing from `stream`, addressed by pulse index."""
+    #enddef
+#endclass
+
+
+@dataclass(eq=False, order=False, frozen=True)
+class Independent(LossModel):
+    """ every pulse is lost with probability `rate`."""
+
+    rate: float
+
+    def masker(self, stream: RandomStream) -> Mask:
+        return lambda toa, index: stream.uniform(index, toa.size) >= self.rate
+    #enddef
+#endclass
+
+
+@dataclass(eq=False, order=False, frozen=True)
+class GilbertElliott(LossModel):
+    """ two-state burst loss.
+
+    a markov chain moves from the good to the bad state with probability
+    `p_bad` and back with `p_good` at every pulse, a pulse is lost with
+    `loss_good` or `loss_bad` depending on the state. the chain starts in
+    the good state.
+    """
+
+    p_bad: float
+    p_good: float
+    loss_good: float = 0.
+    loss_bad: float = 1.
+
+    def masker(self, stream: RandomStream) -> Mask:
+        return _GilbertElliottMask(self, stream)
+    #enddef
+#endclass
+
+
+class _GilbertElliottMask:
+    """ vectorized gilbert-elliott chain.
+
+    one uniform number per pulse drives the transition: below one bound
+    the next state is bad, above another it is good, whatever the state
+    was, and in between the state is kept, or flipped when
+    `p_bad + p_good > 1`. the bounds give the right transition
+    probabilities from both states, and the state of every pulse is the
+    last forced state with the parity of the flips since, which cumulative
+    array operations find for a whole block. the state is carried to the
+    next block, and found by looking back from any other index.
+    """
+
+    _model: GilbertElliott
+    _stream: RandomStream
+    _to_bad: float
+    _to_good: float
+    _next_index: int
+    _state: bool
+
+    def __init__(self, model: GilbertElliott, stream: RandomStream) -> None:
+        self._model = model
+        self._stream = stream
+        if model.p_bad + model.p_good <= 1:
+            self._to_bad, self._to_good = model.p_bad, 1 - model.p_good
+        else:
+            self._to_bad, self._to_good = 1 - model.p_good, model.p_bad
+        #endif
+        self._next_index = 0
+        self._state = False
+    #enddef
+
+    def _states(
+        self,
+        u: np.ndarray,
+        before: bool,
+    ) -> tuple[np.ndarray, np.ndarray, np.ndarray]:
+        """states after every transition in `u`, and where they were forced."""
+
+        to_bad = u < self._to_bad
+        forced = to_bad | (u >= self._to_good)
+        flips = np.cumsum(~forced)
+        if self._model.p_bad + self._model.p_good <= 1:
+            flips[:] = 0
+        #endif
+        last = np.maximum.accumulate(np.where(forced, np.arange(u.size), -1))
+        has_forced = last >= 0
+        last = np.maximum(last, 0)
+        base = np.where(has_forced, to_bad[last], before)
+        parity = (flips - np.where(has_forced, flips[last], 0)) & 1
+        return base ^ parity.astype(bool), forced, flips
+    #enddef
+
+    def _state_before(self, index: int) -> bool:
+        """state before pulse `index`, looking back to the last forced one."""
+
+        size = 64
+        end = index
+        flips = 0
+        while end > 0:
+            start = max(end - size, 0)
+            u = self._stream.uniform(start, end - start, 2)[:, 0]
+            states, forced, cumulative = self._states(u, False)
+            if forced.any():
+                last = int(np.flatnonzero(forced)[-1])
+                return bool(states[last]) ^ bool((flips + cumulative[-1] - cumulative[last]) & 1)
+            #endif
+            flips += int(cumulative[-1])
+            end = start
+            size *= 2
+        #endwhile
+        return bool(flips & 1)
+    #enddef
+
+    def __call__(self, toa: np.ndarray, index: int) -> np.ndarray:
+        if index != self._next_index:
+            self._state = self._state_before(index)
+        #endif
+        n = toa.size
+        if not n:
+            return np.ones(0, dtype=bool)
+        #endif
+        u = self._stream.uniform(index, n, 2)
+        states, _, _ = self._states(u[:, 0], self._state)
+        self._state = bool(states[-1])
+        self._next_index = index + n
+        loss = np.where(states, self._model.loss_bad, self._model.loss_good)
+        return u[:, 1] >= loss
+    #enddef
+#endclass
+
+
+@dataclass(eq=False, order=False, frozen=True)
+class ScanBlanking(LossModel):
+    """ pulses arriving in the first `width` of every `period` after
+    `phase` are lost, e.g. while the receiver scans away.
+    """
+
+    period: float
+    width: float
+    phase: float = 0.
+
+    def masker(self, stream: RandomStream) -> Mask:
+        return lambda toa, index: np.mod(toa - self.phase, self.period) >= self.width
+    #enddef
+#endclass
+
+
+@dataclass(eq=False, order=False, frozen=True)
+class WindowMask(LossModel):
+    """ pulses arriving in any of the `[start, end)` windows are lost."""
+
+    windows: tuple[tuple[float, float], ...]
+
+    def masker(self, stream: RandomStream) -> Mask:
+        # merged, sorted bounds, a toa after an odd number of them is inside
+        bounds: list[float] = []
+        for start, end in sorted(self.windows):
+            if bounds and start <= bounds[-1]:
+                bounds[-1] = max(bounds[-1], end)
+            elif start < end:
+                bounds.extend((start, end))
+            #endif
+        #endfor
+        edges = np.asarray(bounds, dtype=np.float64)
+        return lambda toa, index: np.searchsorted(edges, toa, "right") % 2 == 0
+    #enddef
+#endclass
+
+
+MODELS: dict[str, type[LossModel]] = {
+    "independent": Independent,
+    "burst": GilbertElliott,
+    "scan": ScanBlanking,
+    "window": WindowMask,
+}
@@ -0,0 +1,227 @@
+from abc import abstractmethod
+from typing import Iterator, Sequence
+
+import numpy as np
+
+from .types import PDWBatch, Radar
+
+
+def default_block_size(radar_num: int) -> int:
+    """pulses per radar block, so that one block of every radar is about
+    `1 << 18` pulses in all, between 16 and 4096 per radar.
+    """
+
+    return min(max((1 << 18) // max(radar_num, 1), 16), 4096)
+#enddef
+
+
+class ChunkStream:
+    """ merged pulses in toa order, chunk by chunk, with `take` and
+    `until` cutting the chunks at any pulse.
+    """
+
+    # pulses cut off the last chunk, returned first
+    _pending: PDWBatch
+
+    def __init__(self) -> None:
+        self._pending = PDWBatch.empty()
+    #enddef
+
+    @abstractmethod
+    def _next_chunk(self) -> PDWBatch | None:
+        """next non-empty merged chunk, `None` once the stream ended."""
+    #enddef
+
+    def __iter__(self) -> Iterator[PDWBatch]:
+        return self
+    #enddef
+
+    def __next__(self) -> PDWBatch:
+        if len(self._pending):
+            chunk, self._pending = self._pending, PDWBatch.empty()
+            return chunk
+        #endif
+        chunk = self._next_chunk()
+        if chunk is None:
+            raise StopIteration
+        #endif
+        return chunk
+    #enddef
+
+    def iter_take(self, n: int) -> Iterator[PDWBatch]:
+        """iterate chunks of the next `n` pulses."""
+
+        while n > 0:
+            chunk = next(self, None)
+            if chunk is None:
+                return
+            #endif
+            if len(chunk) > n:
+                chunk, self._pending = chunk[:n], chunk[n:]
+            #endif
+            n -= len(chunk)
+            yield chunk
+        #endwhile
+    #enddef
+
+    def iter_until(self, toa: float) -> Iterator[PDWBatch]:
+        """iterate chunks of the next pulses arriving before `toa`."""
+
+        while (chunk := next(self, None)) is not None:
+            if chunk.toa[-1] >= toa:
+                cut = np.searchsorted(chunk.toa, toa, "left")
+                chunk, self._pending = chunk[:cut], chunk[cut:]
+                if len(chunk):
+                    yield chunk
+                #endif
+                return
+            #endif
+            yield chunk
+        #endwhile
+    #enddef
+
+    def take(self, n: int) -> PDWBatch:
+        """next `n` pulses."""
+
+        return PDWBatch.concat(self.iter_take(n))
+    #enddef
+
+    def until(self, toa: float) -> PDWBatch:
+        """next pulses arriving before `toa`."""
+
+        return PDWBatch.concat(self.iter_until(toa))
+    #enddef
+#endclass
+
+
+class MergeStream(ChunkStream):
+    """ block-wise k-way merge of radar pulse blocks.
+
+    every round tops up the buffer of each radar until the radar has
+    emitted past the round horizon, lost pulses included, so no radar can
+    still produce a pulse before it and a radar losing every pulse still
+    moves on. then all buffered pulses up to the horizon are merged with
+    one stable sort and the rest are carried to the next round. the
+    horizon advances so that a round merges about `chunk_size` pulses.
+
+    with `end_toa`, every radar stops at it and leaves the merge once its
+    pulses are merged, the stream ends after the last of them.
+    """
+
+    # `None` for radars that have no more blocks
+    _iters: list[Iterator[tuple[PDWBatch, float]] | None]
+    _buffers: list[PDWBatch]
+    # toa of the last pulse emitted by each radar, lost or not
+    _reached: list[float]
+    _chunk_size: int
+    _horizon: float
+    _step: float
+
+    def __init__(
+        self,
+        radars: Sequence[Radar],
+        seeds: Sequence[np.random.SeedSequence | None] | None = None,
+        block_size: int | None = None,
+        chunk_size: int = 65536,
+        end_toa: float | None = None,
+    ) -> None:
+        super().__init__()
+        seeds = seeds or [None] * len(radars)
+        block_size = block_size or default_block_size(len(radars))
+        self._iters = [
+            radar.iter_reached(block_size, seed, end_toa=end_toa)
+            for radar, seed in zip(radars, seeds)
+        ]
+        self._reached = [-np.inf] * len(self._iters)
+        self._buffers = [
+            self._next_block(i) or PDWBatch.empty()
+            for i in range(len(self._iters))
+        ]
+        self._chunk_size = max(chunk_size, 64 * len(self._iters))
+        self._drop_finished()
+        self._horizon = min(
+            (r for r, it in zip(self._reached, self._iters) if it is not None),
+            default=np.inf
+        )
+        # estimate the step from the merged pulse rate of the first blocks
+        rate = sum(
+            len(b) / (b.toa[-1] - b.toa[0])
+            for b in self._buffers
+            if len(b) and b.toa[-1] > b.toa[0]
+        )
+        self._step = self._chunk_size / rate if rate > 0 else 1.
+    #enddef
+
+    def _next_block(self, i: int) -> PDWBatch | None:
+        """next block of radar `i`, maybe empty, `None` once it is finished."""
+
+        it = self._iters[i]
+        item = next(it, None) if it is not None else None
+        if item is None:
+            self._iters[i] = None
+            return None
+        #endif
+        block, self._reached[i] = item
+        return block
+    #enddef
+
+    def _drop_finished(self) -> None:
+        """remove radars without blocks and buffered pulses."""
+
+        kept = [
+            (it, buffer, reached)
+            for it, buffer, reached in zip(self._iters, self._buffers, self._reached)
+            if it is not None or len(buffer)
+        ]
+        self._iters = [it for it, _, _ in kept]
+        self._buffers = [buffer for _, buffer, _ in kept]
+        self._reached = [reached for _, _, reached in kept]
+    #enddef
+
+    def _merge(self) -> PDWBatch:
+        """merge all buffered pulses up to the horizon."""
+
+        if all(it is None for it in self._iters):
+            # nothing can arrive anymore, flush the buffers
+            self._horizon = np.inf
+        #endif
+        horizon = self._horizon
+        parts = []
+        for i, buffer in enumerate(self._buffers):
+            if self._iters[i] is not None and self._reached[i] <= horizon:
+                blocks = [buffer]
+                while self._reached[i] <= horizon:
+                    block = self._next_block(i)
+                    if block is None:
+                        break
+                    #endif
+                    blocks.append(block)
+                #endwhile
+                buffer = PDWBatch.concat(blocks)
+            #endif
+            cut = np.searchsorted(buffer.toa, horizon, "right")
+            parts.append(buffer[:cut])
+            self._buffers[i] = buffer[cut:]
+        #endfor
+        self._drop_finished()
+        merged = PDWBatch.concat(parts)
+
+        # aim the next round at `chunk_size` pulses
+        scale = self._chunk_size / max(len(merged), 1)
+        self._step *= min(max(scale, 0.25), 4.)
+        self._horizon = horizon + self._step
+        return merged[np.argsort(merged.toa, kind="stable")]
+    #enddef
+
+    def _next_chunk(self) -> PDWBatch | None:
+        if not self._iters:
+            return None
+        #endif
+        while not len(chunk := self._merge()):
+            if not self._iters:
+                return None
+            #endif
+        #endwhile
+        return chunk
+    #enddef
+#endclass
@@ -1,11 +1,46 @@
 from dataclasses import dataclass
+from enum import IntEnum
 
+import numpy as np
+
+from .kinematics import Geometry
+from .scan import Scan
 from .types import RadarParameter
 
 
-@dataclass(eq=False, order=False)
+class PAMode(IntEnum):
+    """ doc."""
+
+    Fixed = 0
+    Circular = 1
+    Sector = 2
+    Raster = 3
+    Conical = 4
+#endclass
+
+
+@dataclass(eq=False, order=False, frozen=True)
 class PA(RadarParameter):
-    """ PA parameter."""
+    """ PA parameter, `value` is the peak of the beam if `scan` is given,
+    and the pa at range `reference` if `geometry` is given too.
+    """
 
     value: float = -1
+    scan: Scan | None = None
+    geometry: Geometry | None = None
+    reference: float | None = None
+
+    _toa_fields = ("scan", "geometry", "reference")
+
+    def at_toa(self, values: np.ndarray, toa: np.ndarray) -> np.ndarray:
+        if self.scan is not None:
+            values = values + self.scan.gain(toa)
+        #endif
+        if self.geometry is not None and self.reference is not None:
+            # one-way spreading loss
+            distance = np.maximum(self.geometry.distance(toa), np.finfo(np.float64).tiny)
+            values = values + 20 * np.log10(self.reference / distance)
+        #endif
+        return values
+    #enddef
 #endclass
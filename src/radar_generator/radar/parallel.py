@@ -0,0 +1,346 @@
+import multiprocessing
+import os
+import queue
+from collections import deque
+from concurrent.futures import Future, ProcessPoolExecutor
+from typing import Any, Callable, Iterable, Iterator, Sequence
+
+import numpy as np
+
+from .merge import MergeStream, default_block_size
+from .types import PDWBatch, Radar
+
+# merged chunks a shard worker generates ahead of the parent merge
+_QUEUED_CHUNKS = 2
+
+
+def _pool(workers: int) -> ProcessPoolExecutor:
+    # spawned workers, forking from a threaded parent, as the ui worker
+    # thread, may deadlock
+    return ProcessPoolExecutor(workers, multiprocessing.get_context("spawn"))
+#enddef
+
+
+def _imap(
+    pool: ProcessPoolExecutor,
+    fn: Callable[..., Any],
+    tasks: Iterable[tuple],
+    ahead: int,
+) -> Iterator[Any]:
+    """results of `fn` over `tasks` in order, with at most `ahead` tasks
+    submitted and not consumed yet.
+    """
+
+    pending: deque[Future] = deque()
+    for task in tasks:
+        pending.append(pool.submit(fn, *task))
+        if len(pending) >= ahead:
+            yield pending.popleft().result()
+        #endif
+    #endfor
+    while pending:
+        yield pending.popleft().result()
+    #endwhile
+#enddef
+
+
+def _merge_streams(streams: list[Iterator[PDWBatch]]) -> Iterator[PDWBatch]:
+    """sorted chunk streams merged chunk by chunk, equal toa in stream order.
+
+    every round merges the buffered pulses before the earliest last
+    buffered toa of the streams still running, so no running stream can
+    still have an earlier or equal pulse, then refills the streams that
+    buffered nothing past it.
+    """
+
+    buffers = [PDWBatch.empty() for _ in streams]
+    running = [True] * len(streams)
+    horizon = -np.inf
+    while True:
+        for i, stream in enumerate(streams):
+            while running[i] and (not len(buffers[i]) or buffers[i].toa[-1] <= horizon):
+                chunk = next(stream, None)
+                if chunk is None:
+                    running[i] = False
+                else:
+                    buffers[i] = PDWBatch.concat([buffers[i], chunk])
+                #endif
+            #endwhile
+        #endfor
+        horizon = min(
+            (buffer.toa[-1] for buffer, r in zip(buffers, running) if r),
+            default=np.inf
+        )
+        parts = []
+        for i, buffer in enumerate(buffers):
+            cut = int(np.searchsorted(buffer.toa, horizon, "left"))
+            parts.append(buffer[:cut])
+            buffers[i] = buffer[cut:]
+        #endfor
+        merged = PDWBatch.concat(parts)
+        if len(merged):
+            yield merged[np.argsort(merged.toa, kind="stable")]
+        elif horizon == np.inf:
+            return
+        #endif
+    #endwhile
+#enddef
+
+
+def _stream_shard(
+    chunks: Any,
+    radars: Sequence[Radar],
+    seeds: Sequence[np.random.SeedSequence],
+    pulse_num: int | None,
+    end_toa: float | None,
+    block_size: int | None,
+    chunk_size: int,
+) -> None:
+    """put the merged chunks of a shard into the `chunks` queue, then
+    `None`, or the error raised.
+    """
+
+    try:
+        for chunk in _iter_shard(radars, seeds, pulse_num, end_toa, block_size, chunk_size):
+            chunks.put(chunk)
+        #endfor
+        chunks.put(None)
+    except Exception as e:
+        chunks.put(e)
+    #endtry
+#enddef
+
+
+def _iter_queue(chunks: Any, process: multiprocessing.process.BaseProcess) -> Iterator[PDWBatch]:
+    """chunks put by `_stream_shard` in `process`."""
+
+    while True:
+        try:
+            chunk = chunks.get(timeout=1.)
+        except queue.Empty:
+            if process.is_alive():
+                continue
+            #endif
+            # it may have exited right after its last put
+            try:
+                chunk = chunks.get(timeout=1.)
+            except queue.Empty:
+                raise RuntimeError(f"shard worker exited with code {process.exitcode}") from None
+            #endtry
+        #endtry
+        if chunk is None:
+            return
+        #endif
+        if isinstance(chunk, Exception):
+            raise chunk
+        #endif
+        yield chunk
+    #endwhile
+#enddef
+
+
+def iter_generate(
+    radars: Sequence[Radar],
+    seeds: Sequence[np.random.SeedSequence],
+    pulse_num: int | None = None,
+    end_toa: float | None = None,
+    workers: int | None = None,
+    block_size: int | None = None,
+    chunk_size: int = 65536,
+) -> Iterator[PDWBatch]:
+    """generate merged pulses with worker processes, chunk by chunk.
+
+    radars are split into contiguous shards, one worker process per shard
+    merges its stream and sends the chunks through a queue of at most
+    `_QUEUED_CHUNKS`, the parent merges the shard streams as the chunks
+    arrive. a worker blocks once its queue is full, so every shard only
+    generates the pulses the merge consumed and a few chunks ahead, and
+    memory stays at a few chunks per worker. with `pulse_num`, the workers
+    are stopped once it is reached. shards keep the radar order and the
+    merge is stable, so the output only depends on `seeds`, not on the
+    number of workers.
+
+    @param radars: radars to generate
+    @param seeds: one seed per radar
+    @param pulse_num: generate the first `pulse_num` pulses
+    @param end_toa: generate pulses arriving before `end_toa`
+    @param workers: number of worker processes, all cpus by default
+    @param block_size: pulses generated per radar block, by default
+        `default_block_size` of the shard
+    @param chunk_size: pulses per chunk of a shard
+    """
+
+    if (pulse_num is None) == (end_toa is None):
+        raise ValueError("exactly one of `pulse_num` and `end_toa` is needed")
+    #endif
+    workers = min(workers or os.cpu_count() or 1, len(radars))
+    bounds = np.linspace(0, len(radars), workers + 1).astype(int)
+    shards = [
+        (radars[a:b], seeds[a:b], pulse_num, end_toa, block_size, chunk_size)
+        for a, b in zip(bounds[:-1], bounds[1:])
+    ]
+    processes = []
+    try:
+        if workers <= 1:
+            streams = [_iter_shard(*shard) for shard in shards]
+        else:
+            # spawned for the same reason as `_pool`
+            context = multiprocessing.get_context("spawn")
+            streams = []
+            for shard in shards:
+                chunks = context.Queue(_QUEUED_CHUNKS)
+                process = context.Process(target=_stream_shard, args=(chunks, *shard), daemon=True)
+                process.start()
+                processes.append(process)
+                streams.append(_iter_queue(chunks, process))
+            #endfor
+        #endif
+        left = pulse_num if pulse_num is not None else np.inf
+        for chunk in _merge_streams(streams):
+            if len(chunk) >= left:
+                yield chunk[:left]
+                return
+            #endif
+            left -= len(chunk)
+            yield chunk
+        #endfor
+    finally:
+        for process in processes:
+            process.terminate()
+            process.join()
+        #endfor
+    #endtry
+#enddef
+
+
+def generate(
+    radars: Sequence[Radar],
+    seeds: Sequence[np.random.SeedSequence],
+    pulse_num: int | None = None,
+    end_toa: float | None = None,
+    workers: int | None = None,
+    block_size: int | None = None,
+) -> PDWBatch:
+    """merged pulses of `iter_generate` in one batch."""
+
+    return PDWBatch.concat(iter_generate(radars, seeds, pulse_num, end_toa, workers, block_size))
+#enddef
+
+
+def iter_windows(
+    radars: Sequence[Radar],
+    seeds: Sequence[np.random.SeedSequence],
+    end_toa: float,
+    workers: int | None = None,
+    block_size: int | None = None,
+    windows: int | None = None,
+) -> Iterator[PDWBatch]:
+    """generate merged pulses before `end_toa`, split in time windows.
+
+    unlike radar shards, windows also spread a few very dense radars over
+    the workers. every window resumes each radar at its state at the
+    window start, found by `Radar.locate`, in closed form for periodic
+    radars and by a pri prepass otherwise, which runs in the pool one
+    radar per task. windows are yielded in order, with at most two per
+    worker generated ahead, so the output is the same as `until(end_toa)`
+    for any number of workers and windows, and only a few windows are in
+    memory at a time.
+
+    @param windows: number of time windows, 4 per worker by default
+    """
+
+    workers = workers or os.cpu_count() or 1
+    windows = windows or 4 * workers
+    start = min((radar._start for radar in radars), default=end_toa)
+    bounds = np.linspace(start, end_toa, windows + 1)[1:].tolist()
+    if workers <= 1:
+        states = list(map(_locate, radars, seeds, [bounds[:-1]] * len(radars)))
+        for window_states, end in _windows(states, bounds):
+            yield _generate_window(radars, seeds, window_states, end, block_size)
+        #endfor
+        return
+    #endif
+    pool = _pool(workers)
+    try:
+        states = list(pool.map(_locate, radars, seeds, [bounds[:-1]] * len(radars)))
+        yield from _imap(
+            pool,
+            _generate_window,
+            (
+                (radars, seeds, window_states, end, block_size)
+                for window_states, end in _windows(states, bounds)
+            ),
+            2 * workers
+        )
+    finally:
+        pool.shutdown(cancel_futures=True)
+    #endtry
+#enddef
+
+
+def generate_windows(
+    radars: Sequence[Radar],
+    seeds: Sequence[np.random.SeedSequence],
+    end_toa: float,
+    workers: int | None = None,
+    block_size: int | None = None,
+    windows: int | None = None,
+) -> PDWBatch:
+    """merged pulses of `iter_windows` in one batch."""
+
+    return PDWBatch.concat(iter_windows(radars, seeds, end_toa, workers, block_size, windows))
+#enddef
+
+
+def _locate(
+    radar: Radar,
+    seed: np.random.SeedSequence,
+    toas: Sequence[float],
+) -> list[tuple[int, float | None]]:
+    # the first window starts from the first pulse
+    return [(0, None), *radar.locate(toas, seed)]
+#enddef
+
+
+def _windows(
+    states: list[list[tuple[int, float | None]]],
+    bounds: list[float],
+) -> list[tuple[list[tuple[int, float | None]], float]]:
+    """per window, the state of every radar at its start and its end."""
+
+    return [
+        ([radar_states[i] for radar_states in states], end)
+        for i, end in enumerate(bounds)
+    ]
+#enddef
+
+
+def _generate_window(
+    radars: Sequence[Radar],
+    seeds: Sequence[np.random.SeedSequence],
+    states: Sequence[tuple[int, float | None]],
+    end_toa: float,
+    block_size: int | None,
+) -> PDWBatch:
+    # one radar is generated at a time
+    block_size = block_size or default_block_size(1)
+    merged = PDWBatch.concat(
+        block
+        for radar, seed, (index, offset) in zip(radars, seeds, states)
+        for block in radar.iter_blocks(block_size, seed, index, offset, end_toa)
+    )
+    return merged[np.argsort(merged.toa, kind="stable")]
+#enddef
+
+
+def _iter_shard(
+    radars: Sequence[Radar],
+    seeds: Sequence[np.random.SeedSequence],
+    pulse_num: int | None,
+    end_toa: float | None,
+    block_size: int | None,
+    chunk_size: int,
+) -> Iterator[PDWBatch]:
+    stream = MergeStream(radars, seeds, block_size, chunk_size, end_toa)
+    return stream.iter_take(pulse_num) if pulse_num is not None else stream
+#enddef
@@ -1,20 +1,33 @@
 from dataclasses import dataclass
+from enum import IntEnum
 from loguru import logger
 
+from ..parameter import Pattern
 from .types import RadarParameter
 
 
-@dataclass(eq=False, order=False)
+class PRIMode(IntEnum):
+    """ pri mode."""
+
+    Fixed = 0
+    Uneven = 1
+    Slip = 2
+    Group = 3
+    Jitter = 4
+#endclass
+
+
+@dataclass(eq=False, order=False, frozen=True)
 class PRI(RadarParameter):
     """ PRI parameter."""
 
-    value: float | list[float]
+    value: float | list[float] | Pattern
     std: float | None = None
     jitter_rate: float | None = None
     group_size: int | None = None
 
     def _field_check(self) -> None:
-        if isinstance(self.value, list):
+        if isinstance(self.value, (list, tuple, Pattern)):
             if self.jitter_rate is not None:
                 logger.warning("`list` value got, `jitter_rate` will be ignored")
             #endif
@@ -1,13 +1,24 @@
 from dataclasses import dataclass
+from enum import IntEnum
 
+from ..parameter import Pattern
 from .types import RadarParameter
 
 
-@dataclass(eq=False, order=False)
+class PWMode(IntEnum):
+    """ doc."""
+
+    Fixed = 0
+    Uneven = 1
+    Group = 2
+#endclass
+
+
+@dataclass(eq=False, order=False, frozen=True)
 class PW(RadarParameter):
     """ PW parameter."""
 
-    value: float | list[float]
+    value: float | list[float] | Pattern
     std: float | None
     group_size: int | None = None
 #endclass
@@ -0,0 +1,137 @@
+from typing import Iterable, Iterator, Literal, TypeAlias
+
+import numpy as np
+
+from .types import PDWBatch
+
+Policy: TypeAlias = Literal["drop", "merge", "flag"]
+POLICIES: tuple[Policy, ...] = ("drop", "merge", "flag")
+
+
+class Receiver:
+    """ overlap and dead-time processing of a merged pulse stream.
+
+    the receiver is busy from the toa of a pulse until `toa + pw +
+    dead_time`. a pulse arriving while it is busy collides with the
+    pulses before it, and a run of pulses each arriving before the
+    running max of the busy ends is one collision group. `drop` keeps the
+    first pulse of every group, `merge` reports one pulse per group from
+    its first toa to its last end, with the other values of its strongest
+    pulse, and `flag` keeps every pulse.
+
+    groups are found with one prefix max over each sorted chunk. the last
+    group of a chunk may go on in the next one, so it is held back until
+    the next chunk or `flush`.
+    """
+
+    policy: Policy
+    dead_time: float
+    # pulses of the last group and the end of its busy time
+    _held: list[PDWBatch]
+    _busy: float
+
+    def __init__(self, policy: Policy = "drop", dead_time: float = 0.) -> None:
+        if policy not in POLICIES:
+            raise ValueError(f"unknown policy `{policy}`, expected one of {', '.join(POLICIES)}")
+        #endif
+        if dead_time < 0:
+            raise ValueError("`dead_time` is negative")
+        #endif
+        self.policy = policy
+        self.dead_time = dead_time
+        self._held = []
+        self._busy = -np.inf
+    #enddef
+
+    def process(self, chunk: PDWBatch) -> tuple[PDWBatch, np.ndarray]:
+        """process the next sorted chunk.
+
+        @return: the reported pulses and which of them collided
+        """
+
+        if not len(chunk):
+            return chunk, np.zeros(0, dtype=np.bool_)
+        #endif
+        busy = np.maximum.accumulate(chunk.toa + chunk.pw + self.dead_time)
+        np.maximum(busy, self._busy, out=busy)
+        starts = np.empty(len(chunk), dtype=np.bool_)
+        starts[0] = chunk.toa[0] >= self._busy
+        np.greater_equal(chunk.toa[1:], busy[:-1], out=starts[1:])
+        first = np.flatnonzero(starts)
+        self._busy = float(busy[-1])
+        if not first.size:
+            # the held group goes on through the whole chunk
+            self._held.append(chunk)
+            return PDWBatch.empty(), np.zeros(0, dtype=np.bool_)
+        #endif
+
+        held = sum(map(len, self._held))
+        done = PDWBatch.concat([*self._held, chunk[:first[-1]]])
+        self._held = [chunk[first[-1]:]]
+        if held:
+            first = np.concatenate(([0], held + first[:-1]))
+        else:
+            first = first[:-1]
+        #endif
+        return self._report(done, first)
+    #enddef
+
+    def flush(self) -> tuple[PDWBatch, np.ndarray]:
+        """report the held back group, at the end of the stream."""
+
+        held = PDWBatch.concat(self._held)
+        self._held = []
+        self._busy = -np.inf
+        return self._report(held, np.zeros(min(len(held), 1), dtype=np.intp))
+    #enddef
+
+    def _report(self, chunk: PDWBatch, first: np.ndarray) -> tuple[PDWBatch, np.ndarray]:
+        """apply the policy to whole groups starting at `first`."""
+
+        if not len(chunk):
+            return chunk, np.zeros(0, dtype=np.bool_)
+        #endif
+        sizes = np.diff(first, append=len(chunk))
+        collided = sizes > 1
+        if self.policy == "flag":
+            return chunk, np.repeat(collided, sizes)
+        #endif
+        if self.policy == "drop":
+            return chunk[first], collided
+        #endif
+
+        # the first pulse reaching the peak pa of each group
+        group = np.repeat(np.arange(first.size), sizes)
+        strongest = np.flatnonzero(chunk.pa == np.maximum.reduceat(chunk.pa, first)[group])
+        leading = np.empty(strongest.size, dtype=np.bool_)
+        leading[0] = True
+        np.not_equal(group[strongest[1:]], group[strongest[:-1]], out=leading[1:])
+        merged = chunk[strongest[leading]]
+        merged.toa = chunk.toa[first]
+        merged.pw = np.maximum.reduceat(chunk.toa + chunk.pw, first) - merged.toa
+        return merged, collided
+    #enddef
+
+    def iter_flagged(self, chunks: Iterable[PDWBatch]) -> Iterator[tuple[PDWBatch, np.ndarray]]:
+        """process every chunk, with the collided mask of the reported pulses."""
+
+        for chunk in chunks:
+            reported, collided = self.process(chunk)
+            if len(reported):
+                yield reported, collided
+            #endif
+        #endfor
+        reported, collided = self.flush()
+        if len(reported):
+            yield reported, collided
+        #endif
+    #enddef
+
+    def __call__(self, chunks: Iterable[PDWBatch]) -> Iterator[PDWBatch]:
+        """reported pulses of every chunk, as a stream stage."""
+
+        for reported, _ in self.iter_flagged(chunks):
+            yield reported
+        #endfor
+    #enddef
+#endclass
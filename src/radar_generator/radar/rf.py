@@ -1,17 +1,32 @@
 from dataclasses import dataclass
+from enum import IntEnum
 from loguru import logger
 
+from ..parameter import Pattern
 from .types import RadarParameter
 
 
-@dataclass(eq=False, order=False)
+class RFMode(IntEnum):
+    """ doc."""
+
+    Fixed = 0
+    GroupAgile = 1
+    Sine = 2
+    Sawtooth = 3
+    RandomSlip = 4
+    Hopping = 5
+#endclass
+
+
+@dataclass(eq=False, order=False, frozen=True)
 class RF(RadarParameter):
     """ RF parameter."""
 
-    value: float | list[float]
+    value: float | list[float] | Pattern
     std: float | None = None
     group_size: int | None = None
     random: bool = False
+    jitter_rate: float | None = None
 
     def _field_check(self) -> None:
         if isinstance(self.value, (int, float)) and self.random:
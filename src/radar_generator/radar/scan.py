@@ -0,0 +1,134 @@
+from abc import abstractmethod
+from dataclasses import dataclass
+from functools import lru_cache
+from typing import ClassVar
+
+import numpy as np
+
+
+@dataclass(eq=False, order=False, frozen=True)
+class Scan:
+    """ antenna scan of an emitter, gain towards the receiver over time.
+
+    the beam pattern is a sinc with `beamwidth` degrees at -3 dB, floored
+    at `sidelobe` dB, kept as a table of `RESOLUTION` degree steps. every
+    scan gives the angle between beam and receiver at each toa, and the
+    gain is looked up in the table for a whole block at once.
+    """
+
+    period: float
+    beamwidth: float = 3.
+    # toa at which the scan period starts
+    phase: float = 0.
+    sidelobe: float = -40.
+
+    RESOLUTION: ClassVar[float] = 0.01
+
+    def gain(self, toa: np.ndarray) -> np.ndarray:
+        """gain in dB relative to the beam peak at every toa."""
+
+        table = _beam_table(self.beamwidth, self.sidelobe, self.RESOLUTION)
+        index = np.rint(self._angle(toa) / self.RESOLUTION).astype(np.intp)
+        return table[np.minimum(index, table.size - 1)]
+    #enddef
+
+    def _position(self, toa: np.ndarray) -> np.ndarray:
+        """position in the scan period, in [0, 1)."""
+
+        return np.mod((toa - self.phase) / self.period, 1.)
+    #enddef
+
+    @abstractmethod
+    def _angle(self, toa: np.ndarray) -> np.ndarray:
+        """angle between beam and receiver in degrees, in [0, 180]."""
+    #enddef
+#endclass
+
+
+@lru_cache(maxsize=64)
+def _beam_table(beamwidth: float, sidelobe: float, resolution: float) -> np.ndarray:
+    """gain in dB from 0 to 180 degrees off the beam, shared by equal scans
+    and not pickled with them.
+    """
+
+    angle = np.arange(0., 180. + resolution, resolution)
+    # |sinc|^2 is at half power where x = 1.39156
+    x = 1.39156 * angle / (beamwidth / 2)
+    with np.errstate(divide="ignore"):
+        gain = 20 * np.log10(np.abs(np.sinc(x / np.pi)))
+    #endwith
+    table = np.maximum(gain, sidelobe)
+    table.flags.writeable = False
+    return table
+#enddef
+
+
+def _wrap(angle: np.ndarray) -> np.ndarray:
+    """angle in [-180, 180)."""
+
+    return np.mod(angle + 180., 360.) - 180.
+#enddef
+
+
+@dataclass(eq=False, order=False, frozen=True)
+class CircularScan(Scan):
+    """ full turn every period, pointing at the receiver at `phase`."""
+
+    def _angle(self, toa: np.ndarray) -> np.ndarray:
+        return np.abs(_wrap(360. * self._position(toa)))
+    #enddef
+#endclass
+
+
+@dataclass(eq=False, order=False, frozen=True)
+class SectorScan(Scan):
+    """ back and forth over a sector of `width` degrees, `center` degrees
+    off the receiver, one period is there and back.
+    """
+
+    width: float = 90.
+    center: float = 0.
+
+    def _angle(self, toa: np.ndarray) -> np.ndarray:
+        triangle = 1. - np.abs(2. * self._position(toa) - 1.)
+        return np.abs(_wrap(self.center - self.width / 2 + self.width * triangle))
+    #enddef
+#endclass
+
+
+@dataclass(eq=False, order=False, frozen=True)
+class RasterScan(Scan):
+    """ `lines` sweeps of `width` degrees, stepping `line_step` degrees of
+    elevation after each, the receiver in the middle of the raster.
+    """
+
+    width: float = 90.
+    lines: int = 4
+    line_step: float = 3.
+
+    def _angle(self, toa: np.ndarray) -> np.ndarray:
+        line, sweep = np.divmod(self._position(toa) * self.lines, 1.)
+        azimuth = self.width * (sweep - 0.5)
+        elevation = (line - (self.lines - 1) / 2) * self.line_step
+        return np.minimum(np.hypot(azimuth, elevation), 180.)
+    #enddef
+#endclass
+
+
+@dataclass(eq=False, order=False, frozen=True)
+class ConicalScan(Scan):
+    """ beam turning around the boresight `squint` degrees off it, the
+    receiver `offset` degrees off the boresight.
+    """
+
+    squint: float = 1.5
+    offset: float = 0.
+
+    def _angle(self, toa: np.ndarray) -> np.ndarray:
+        phi = 2 * np.pi * self._position(toa)
+        return np.minimum(
+            np.hypot(self.squint * np.cos(phi) - self.offset, self.squint * np.sin(phi)),
+            180.
+        )
+    #enddef
+#endclass
@@ -0,0 +1,121 @@
+import heapq
+from typing import Iterator, Sequence
+
+import numpy as np
+
+from .merge import ChunkStream, default_block_size
+from .types import PDWBatch, Radar
+
+
+class BlockSchedule(ChunkStream):
+    """ merge of radar pulse blocks scheduled by the toa each radar reached.
+
+    a heap keyed by the toa every radar has emitted up to, lost pulses
+    included, picks the radar furthest behind and generates its next
+    block, so scheduling costs one heap operation per block instead of one
+    per pulse, and only radars the merge falls behind on are touched.
+    radars that have not started are keyed by their start toa and are only
+    set up once the merge reaches it. no radar can still produce a pulse
+    before the smallest key, every `chunk_size` generated pulses the ones
+    before it are merged with one stable sort by toa and radar position,
+    the same order as `MergeStream`.
+
+    with `end_toa`, every radar stops at it and leaves the heap, the
+    stream ends after the last of them.
+    """
+
+    _radars: Sequence[Radar]
+    _seeds: Sequence[np.random.SeedSequence | None]
+    _block_size: int
+    _chunk_size: int
+    _end_toa: float | None
+    # `None` until a radar starts and once it is finished
+    _iters: list[Iterator[tuple[PDWBatch, float]] | None]
+    # `(reached toa, radar position)` of the radars still generating
+    _heap: list[tuple[float, int]]
+    # generated pulses not merged yet, and the radar position of each
+    _carry: PDWBatch
+    _carry_positions: np.ndarray
+
+    def __init__(
+        self,
+        radars: Sequence[Radar],
+        seeds: Sequence[np.random.SeedSequence | None] | None = None,
+        block_size: int | None = None,
+        chunk_size: int = 65536,
+        end_toa: float | None = None,
+    ) -> None:
+        super().__init__()
+        self._radars = radars
+        self._seeds = seeds or [None] * len(radars)
+        self._block_size = block_size or default_block_size(len(radars))
+        self._chunk_size = chunk_size
+        self._end_toa = end_toa
+        self._iters = [None] * len(radars)
+        self._heap = [(radar._start, i) for i, radar in enumerate(radars)]
+        heapq.heapify(self._heap)
+        self._carry = PDWBatch.empty()
+        self._carry_positions = np.empty(0, dtype=np.int64)
+    #enddef
+
+    def _generate(self) -> tuple[list[PDWBatch], list[np.ndarray]]:
+        """next blocks of the radars furthest behind, about `chunk_size`
+        pulses in all.
+        """
+
+        heap = self._heap
+        blocks = []
+        positions = []
+        generated = 0
+        while heap and generated < self._chunk_size:
+            i = heap[0][1]
+            it = self._iters[i]
+            if it is None:
+                it = self._iters[i] = self._radars[i].iter_reached(
+                    self._block_size,
+                    self._seeds[i],
+                    end_toa=self._end_toa
+                )
+            #endif
+            item = next(it, None)
+            if item is None:
+                heapq.heappop(heap)
+                self._iters[i] = None
+                continue
+            #endif
+            block, reached = item
+            heapq.heapreplace(heap, (reached, i))
+            if len(block):
+                blocks.append(block)
+                positions.append(np.full(len(block), i, dtype=np.int64))
+                generated += len(block)
+            #endif
+        #endwhile
+        return blocks, positions
+    #enddef
+
+    def _next_chunk(self) -> PDWBatch | None:
+        while self._heap or len(self._carry):
+            blocks, positions = self._generate()
+            horizon = self._heap[0][0] if self._heap else np.inf
+            merged = PDWBatch.concat([self._carry, *blocks])
+            merged_positions = np.concatenate([self._carry_positions, *positions])
+            # the carry and every block are sorted runs, which the stable
+            # sort merges fast, equal toa of two radars must keep the radar
+            # order though, which only the slower lexsort gives
+            order = np.argsort(merged.toa, kind="stable")
+            toa = merged.toa[order]
+            if np.any(toa[1:] == toa[:-1]):
+                order = np.lexsort((merged_positions, merged.toa))
+                toa = merged.toa[order]
+            #endif
+            cut = int(np.searchsorted(toa, horizon, "left"))
+            self._carry = merged[order[cut:]]
+            self._carry_positions = merged_positions[order[cut:]]
+            if cut:
+                return merged[order[:cut]]
+            #endif
+        #endwhile
+        return None
+    #enddef
+#endclass
@@ -1,28 +1,195 @@
 from abc import abstractmethod
-import random
-from dataclasses import dataclass, field, asdict
-from typing import Iterator
+from dataclasses import dataclass, fields
+from functools import cached_property
+from itertools import islice
+from typing import TYPE_CHECKING, ClassVar, Iterable, Iterator, Sequence, TypeAlias
 
-from loguru import logger
+import numpy as np
 
 from .. import parameter
-from ..parameter import Parameter
+from ..parameter import BlockParameter, Parameter, RandomStream
+from .loss import Independent, LossModel, Mask
 
+if TYPE_CHECKING:
+    import pandas as pd
+#endif
+Seed: TypeAlias = int | np.random.SeedSequence | None
 
-@dataclass(eq=True, order=True)
+
+@dataclass(eq=True, order=False, slots=True)
 class PDW:
-    """ Pulse Describe Word."""
+    """ Pulse Describe Word, ordered by toa only."""
 
-    toa: float = field(compare=True)
+    toa: float
     doa: float
     rf: float
     pw: float
     pa: float
     radar_id: int
+
+    # all four by toa, `total_ordering` would mix in the field-wise `__eq__`
+    def __lt__(self, other: "PDW") -> bool:
+        return self.toa < other.toa
+    #enddef
+
+    def __le__(self, other: "PDW") -> bool:
+        return self.toa <= other.toa
+    #enddef
+
+    def __gt__(self, other: "PDW") -> bool:
+        return self.toa > other.toa
+    #enddef
+
+    def __ge__(self, other: "PDW") -> bool:
+        return self.toa >= other.toa
+    #enddef
 #endclass
 
 
 @dataclass(eq=False, order=False)
+class PDWBatch:
+    """ columnar batch of PDW, one contiguous array per field."""
+
+    toa: np.ndarray
+    doa: np.ndarray
+    rf: np.ndarray
+    pw: np.ndarray
+    pa: np.ndarray
+    radar_id: np.ndarray
+
+    dtypes: ClassVar[dict[str, type]] = {
+        "toa": np.float64,
+        "doa": np.float64,
+        "rf": np.float64,
+        "pw": np.float64,
+        "pa": np.float64,
+        "radar_id": np.int32,
+    }
+
+    def __post_init__(self) -> None:
+        for name, dtype in self.dtypes.items():
+            setattr(
+                self,
+                name,
+                np.ascontiguousarray(getattr(self, name), dtype=dtype)
+            )
+        #endfor
+    #enddef
+
+    def __len__(self) -> int:
+        return self.toa.size
+    #enddef
+
+    def __getitem__(self, key: slice | np.ndarray) -> "PDWBatch":
+        return self._wrap([column[key] for column in self._columns()])
+    #enddef
+
+    def _columns(self) -> list[np.ndarray]:
+        return [self.toa, self.doa, self.rf, self.pw, self.pa, self.radar_id]
+    #enddef
+
+    @classmethod
+    def _wrap(cls, columns: list[np.ndarray]) -> "PDWBatch":
+        """build from columns already in the right dtypes, skip the checks."""
+
+        batch = cls.__new__(cls)
+        (
+            batch.toa,
+            batch.doa,
+            batch.rf,
+            batch.pw,
+            batch.pa,
+            batch.radar_id
+        ) = columns
+        return batch
+    #enddef
+
+    def __iter__(self) -> Iterator[PDW]:
+        return map(PDW, *(column.tolist() for column in self._columns()))
+    #enddef
+
+    @classmethod
+    def empty(cls, size: int = 0) -> "PDWBatch":
+        return cls(**{
+            name: np.empty(size, dtype=dtype)
+            for name, dtype in cls.dtypes.items()
+        })
+    #enddef
+
+    @classmethod
+    def from_pdws(cls, pdws: Iterable[PDW]) -> "PDWBatch":
+        pdws = list(pdws)
+        return cls(**{
+            f.name: np.fromiter(
+                (getattr(pdw, f.name) for pdw in pdws),
+                dtype=cls.dtypes[f.name],
+                count=len(pdws)
+            )
+            for f in fields(PDW)
+        })
+    #enddef
+
+    @classmethod
+    def concat(cls, batches: Iterable["PDWBatch"]) -> "PDWBatch":
+        batches = [batch for batch in batches if len(batch)]
+        if not batches:
+            return cls.empty()
+        #endif
+        if len(batches) == 1:
+            return batches[0]
+        #endif
+        return cls._wrap([
+            np.concatenate(columns)
+            for columns in zip(*(batch._columns() for batch in batches))
+        ])
+    #enddef
+
+    def to_numpy(self) -> dict[str, np.ndarray]:
+        """columns as a dict, the arrays are views, not copies."""
+
+        return {name: getattr(self, name) for name in self.dtypes}
+    #enddef
+
+    def to_pandas(self) -> "pd.DataFrame":
+        """columns as a DataFrame sharing memory with this batch."""
+
+        import pandas as pd
+        return pd.DataFrame(self.to_numpy(), copy=False)
+    #enddef
+#endclass
+
+
+def batched(pdws: Iterable[PDW], size: int) -> Iterator[PDWBatch]:
+    """collect a PDW iterator into batches of `size` pulses."""
+
+    it = iter(pdws)
+    while batch := list(islice(it, size)):
+        yield PDWBatch.from_pdws(batch)
+    #endwhile
+#enddef
+
+
+def spawn_rngs(seed: Seed, n: int) -> list[np.random.Generator]:
+    """`n` independent random generators spawned from `seed`.
+
+    children are addressed by spawn key instead of `SeedSequence.spawn`,
+    which counts the children already spawned, so the same seed always
+    gives the same generators.
+    """
+
+    if not isinstance(seed, np.random.SeedSequence):
+        seed = np.random.SeedSequence(seed)
+    #endif
+    return [
+        np.random.default_rng(
+            np.random.SeedSequence(seed.entropy, spawn_key=(*seed.spawn_key, i))
+        )
+        for i in range(n)
+    ]
+#enddef
+
+
+@dataclass(eq=False, order=False, frozen=True)
 class RadarParameter:
     """ parameter of radar."""
 
@@ -35,8 +202,30 @@ class RadarParameter:
         pass
     #enddef
 
-    def get(self) -> Parameter:
-        return parameter.init(**asdict(self))
+    # fields applied on the toa by `at_toa`, not passed to `parameter.init`
+    _toa_fields: ClassVar[tuple[str, ...]] = ()
+
+    def _kwargs(self) -> dict:
+        # not `asdict`, which would turn a `Pattern` value into a dict
+        return {
+            f.name: getattr(self, f.name)
+            for f in fields(self)
+            if f.name not in self._toa_fields
+        }
+    #enddef
+
+    def at_toa(self, values: np.ndarray, toa: np.ndarray) -> np.ndarray:
+        """values of a block modulated by its toa, unchanged by default."""
+
+        return values
+    #enddef
+
+    def get(self, rng: np.random.Generator | None = None) -> Parameter:
+        return parameter.init(**self._kwargs(), rng=rng)
+    #enddef
+
+    def get_block(self, rng: np.random.Generator | None = None) -> BlockParameter:
+        return parameter.init_block(**self._kwargs(), rng=rng)
     #enddef
 #endclass
 
@@ -53,25 +242,280 @@ class Radar:
     _pw: RadarParameter
     _pa: RadarParameter
     _loss_rate: float | None = None
+    # more loss models, all of them must keep a pulse
+    _losses: tuple[LossModel, ...] = ()
 
     def __iter__(self) -> Iterator[PDW]:
-        start = self._start
-        for (pri, doa, rf, pw, pa) in zip(
-            self._pri.get(),
-            self._doa.get(),
-            self._rf.get(),
-            self._pw.get(),
-            self._pa.get()
-        ):
-            start += pri
-            if (
-                self._loss_rate is not None
-                and random.random() < self._loss_rate
-            ):
-                logger.debug(f"pulse at `{start}` lossed")
-                continue
-            #endif
-            yield PDW(start, doa, rf, pw, pa, self.id)
+        return self.pulses()
+    #enddef
+
+    @cached_property
+    def _timeline(self) -> BlockParameter:
+        # pri without random numbers, only for closed form toa
+        return self._pri.get_block(np.random.default_rng(0))
+    #enddef
+
+    @property
+    def periodic(self) -> bool:
+        """toa is a closed form of the pulse index, no `std` or jitter on pri."""
+
+        return self._timeline.periodic
+    #enddef
+
+    def _parameters(
+        self,
+        seed: Seed,
+    ) -> tuple[BlockParameter, list[BlockParameter], list[Mask]]:
+        pri_rng, doa_rng, rf_rng, pw_rng, pa_rng, loss_rng = spawn_rngs(seed, 6)
+        return (
+            self._pri.get_block(pri_rng),
+            [
+                self._doa.get_block(doa_rng),
+                self._rf.get_block(rf_rng),
+                self._pw.get_block(pw_rng),
+                self._pa.get_block(pa_rng),
+            ],
+            self._masks(loss_rng.bit_generator)
+        )
+    #enddef
+
+    def _masks(self, bit_generator: np.random.BitGenerator) -> list[Mask]:
+        # every model draws from its own jump of the loss stream
+        models = [
+            *([Independent(self._loss_rate)] if self._loss_rate is not None else []),
+            *self._losses
+        ]
+        return [
+            model.masker(RandomStream(bit_generator if i == 0 else bit_generator.jumped(i)))
+            for i, model in enumerate(models)
+        ]
+    #enddef
+
+    def _toa(self, index: int, n: int) -> np.ndarray:
+        # pulse `i` arrives after the first `i + 1` pri
+        return self._start + self._timeline.cumulative(np.arange(index + 1, index + n + 1))
+    #enddef
+
+    def _batch(
+        self,
+        toa: np.ndarray,
+        index: int,
+        parameters: list[BlockParameter],
+        masks: list[Mask],
+    ) -> PDWBatch:
+        """pulses `[index, index + toa.size)` with lost pulses masked out."""
+
+        n = toa.size
+        columns = []
+        for p, radar_parameter in zip(parameters, (self._doa, self._rf, self._pw, self._pa)):
+            p.seek(index)
+            columns.append(radar_parameter.at_toa(p.take(n), toa))
+        #endfor
+        batch = PDWBatch(toa, *columns, np.full(n, self.id, dtype=np.int32))
+        if masks:
+            batch = batch[self._kept(toa, index, masks)]
+        #endif
+        return batch
+    #enddef
+
+    @staticmethod
+    def _kept(toa: np.ndarray, index: int, masks: list[Mask]) -> np.ndarray:
+        kept = masks[0](toa, index)
+        for mask in masks[1:]:
+            kept &= mask(toa, index)
+        #endfor
+        return kept
+    #enddef
+
+    def pulses(
+        self,
+        seed: Seed = None,
+        end_toa: float | None = None,
+        block_size: int = 1024,
+    ) -> Iterator[PDW]:
+        """iterate pulses one by one, same pulses as `iter_blocks` with the same seed.
+
+        @param block_size: pulses generated and buffered at a time
+        """
+
+        for batch in self.iter_blocks(block_size, seed, end_toa=end_toa):
+            yield from batch
+        #endfor
+    #enddef
+
+    def iter_blocks(
+        self,
+        block_size: int = 4096,
+        seed: Seed = None,
+        index: int = 0,
+        offset: float | None = None,
+        end_toa: float | None = None,
+    ) -> Iterator[PDWBatch]:
+        """iterate pulses as columnar batches.
+
+        every batch covers `block_size` emitted pulses, lost pulses are
+        masked out so a batch may be shorter. the same `seed` gives the
+        same pulses.
+
+        @param index: start at pulse `index` instead of the first one
+        @param offset: toa of the pulse before `index`, as given by
+            `locate`, needed to resume a radar that is not periodic
+        @param end_toa: stop before the first pulse arriving at or after
+            it, periodic radars know the last block in advance
+        """
+
+        for batch, _ in self.iter_reached(block_size, seed, index, offset, end_toa):
+            yield batch
         #endfor
     #enddef
+
+    def iter_reached(
+        self,
+        block_size: int = 4096,
+        seed: Seed = None,
+        index: int = 0,
+        offset: float | None = None,
+        end_toa: float | None = None,
+    ) -> Iterator[tuple[PDWBatch, float]]:
+        """`iter_blocks` paired with the toa of the last pulse emitted in
+        every block, lost pulses included, so a merge still moves past a
+        radar whose pulses are all lost.
+        """
+
+        pri, parameters, masks = self._parameters(seed)
+        if self.periodic:
+            end = self.seek(end_toa) if end_toa is not None else None
+            while end is None or index < end:
+                n = block_size if end is None else min(block_size, end - index)
+                toa = self._toa(index, n)
+                yield self._batch(toa, index, parameters, masks), float(toa[-1])
+                index += n
+            #endwhile
+            return
+        #endif
+        if index and offset is None:
+            raise ValueError(f"radar {self.id} is not periodic, `offset` is needed to resume it")
+        #endif
+        pri.seek(index)
+        # toa[0] holds the running offset, accumulating it in front of the
+        # pri block keeps the same rounding as `start += pri`
+        toa = np.empty(block_size + 1, dtype=np.float64)
+        toa[-1] = self._start if offset is None else offset
+        while True:
+            toa[0] = toa[-1]
+            toa[1:] = pri.take(block_size)
+            np.cumsum(toa, out=toa)
+            if end_toa is not None and toa[-1] >= end_toa:
+                n = int(np.searchsorted(toa[1:], end_toa, "left"))
+                if n:
+                    yield self._batch(toa[1:n+1].copy(), index, parameters, masks), float(toa[n])
+                #endif
+                return
+            #endif
+            yield self._batch(toa[1:].copy(), index, parameters, masks), float(toa[-1])
+            index += block_size
+        #endwhile
+    #enddef
+
+    def count(self, end_toa: float, seed: Seed = None, block_size: int = 65536) -> int:
+        """exact number of pulses arriving before `end_toa`, lost pulses
+        excluded, without generating them. needs a periodic radar.
+        """
+
+        end = self.seek(end_toa)
+        masks = self._parameters(seed)[2]
+        if not masks:
+            return end
+        #endif
+        return sum(
+            int(np.count_nonzero(self._kept(
+                self._toa(index, min(block_size, end - index)),
+                index,
+                masks
+            )))
+            for index in range(0, end, block_size)
+        )
+    #enddef
+
+    def locate(
+        self,
+        toas: Sequence[float],
+        seed: Seed = None,
+        block_size: int = 65536,
+    ) -> list[tuple[int, float]]:
+        """states to resume `iter_blocks` at each of the ascending `toas`.
+
+        a state is the index of the first pulse arriving at or after the
+        toa and the toa of the pulse before it. periodic radars compute
+        it in closed form, others run a prepass over the pri alone, which
+        is much cheaper than generating the pulses.
+        """
+
+        if self.periodic:
+            indices = [self.seek(toa) for toa in toas]
+            return [
+                (index, float(self._toa(index - 1, 1)[0]) if index else self._start)
+                for index in indices
+            ]
+        #endif
+        pri, _, _ = self._parameters(seed)
+        states = []
+        index = 0
+        toa = np.empty(block_size + 1, dtype=np.float64)
+        toa[-1] = self._start
+        while len(states) < len(toas):
+            toa[0] = toa[-1]
+            toa[1:] = pri.take(block_size)
+            np.cumsum(toa, out=toa)
+            while len(states) < len(toas) and toa[-1] >= toas[len(states)]:
+                i = int(np.searchsorted(toa[1:], toas[len(states)], "left"))
+                states.append((index + i, float(toa[i])))
+            #endwhile
+            index += block_size
+        #endwhile
+        return states
+    #enddef
+
+    def seek(self, toa: float) -> int:
+        """index of the first pulse arriving at or after `toa`.
+
+        the count of pulses before `toa`, lost pulses included. needs a
+        periodic radar, costs the same for any `toa`.
+        """
+
+        if not self.periodic:
+            raise ValueError(f"radar {self.id} has no periodic pri to seek")
+        #endif
+        index = self._timeline.inverse(toa - self._start)
+        # the inverse is approximate, settle on the rounded toa
+        while index > 0 and self._toa(index - 1, 1)[0] >= toa:
+            index -= 1
+        #endwhile
+        while self._toa(index, 1)[0] < toa:
+            index += 1
+        #endwhile
+        return index
+    #enddef
+
+    def pulse_at(self, index: int, seed: Seed = None) -> PDW | None:
+        """pulse `index` of a periodic radar, `None` if it is lost.
+
+        the same pulse as the one iterated with the same `seed`.
+        """
+
+        if not self.periodic:
+            raise ValueError(f"radar {self.id} has no periodic pri to index")
+        #endif
+        _, parameters, masks = self._parameters(seed)
+        return next(iter(self._batch(self._toa(index, 1), index, parameters, masks)), None)
+    #enddef
+
+    def window(self, start: float, end: float, seed: Seed = None) -> PDWBatch:
+        """pulses of a periodic radar arriving in `[start, end)`."""
+
+        first = self.seek(start)
+        last = max(self.seek(end), first)
+        _, parameters, masks = self._parameters(seed)
+        return self._batch(self._toa(first, last - first), first, parameters, masks)
+    #enddef
 #endclass
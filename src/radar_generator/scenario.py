@@ -0,0 +1,564 @@
+import hashlib
+import hmac
+import math
+import os
+import pickle
+import re
+import secrets
+from dataclasses import dataclass
+from pathlib import Path
+from typing import Any
+
+import numpy as np
+import tomli
+from loguru import logger
+
+from .parameter import Arithmetic, Hop, Pattern, Sine
+from .radar import Generator, Radar
+from .radar.doa import DOA, DOAMode
+from .radar.kinematics import Geometry, Track
+from .radar.loss import MODELS, GilbertElliott, Independent, LossModel, ScanBlanking, WindowMask
+from .radar.pa import PA, PAMode
+from .radar.pri import PRI, PRIMode
+from .radar.pw import PW, PWMode
+from .radar.rf import RF, RFMode
+from .radar.scan import CircularScan, ConicalScan, RasterScan, Scan, SectorScan
+
+
+def _optional_float(snapshot: dict, key: str) -> float | None:
+    if snapshot.get(key) in (None, ""):
+        return None
+    #endif
+    return float(snapshot[key])
+#enddef
+
+
+def _optional_int(snapshot: dict, key: str) -> int | None:
+    if snapshot.get(key) in (None, ""):
+        return None
+    #endif
+    return int(snapshot[key])
+#enddef
+
+
+def _floats(value: Any) -> tuple[float, ...]:
+    """values separated by whitespace, or already a list."""
+
+    if isinstance(value, str):
+        return tuple(float(v) for v in re.split(r"\s+", value.strip()))
+    #endif
+    if isinstance(value, (int, float)):
+        return (float(value),)
+    #endif
+    return tuple(float(v) for v in value)
+#enddef
+
+
+def parse_range(snapshot: dict) -> Arithmetic:
+    """slip range from `start` towards `end` by `step`, kept lazy."""
+
+    return Arithmetic.range(
+        float(snapshot["start"]),
+        float(snapshot["end"]),
+        _optional_float(snapshot, "step") or 1.0
+    )
+#enddef
+
+
+def parse_pri(snapshot: dict) -> PRI:
+    mode = snapshot["mode"]
+    std = _optional_float(snapshot, "std")
+    if mode == PRIMode.Fixed:
+        return PRI(float(snapshot["value"]), std=std)
+    #endif
+    if mode == PRIMode.Slip:
+        return PRI(parse_range(snapshot), std=std)
+    #endif
+    if mode == PRIMode.Uneven or mode == PRIMode.Group:
+        return PRI(
+            _floats(snapshot["value"]),
+            std=std,
+            group_size=_optional_int(snapshot, "group_size")
+        )
+    #endif
+    if mode == PRIMode.Jitter:
+        return PRI(
+            float(snapshot["value"]),
+            jitter_rate=float(snapshot["jitter_rate"])
+        )
+    #endif
+    raise ValueError(f"unknown pri mode `{mode}`")
+#enddef
+
+
+def parse_track(snapshot: dict) -> Track:
+    """waypoint track if `times` is given, else constant velocity."""
+
+    if "times" in snapshot:
+        points = snapshot["points"]
+        return Track.waypoints(
+            _floats(snapshot["times"]),
+            _floats(points if isinstance(points, str) else np.ravel(points))
+        )
+    #endif
+    position = _floats(snapshot.get("position", (0., 0.)))
+    velocity = _floats(snapshot.get("velocity", (0., 0.)))
+    _check(len(position) == 2 and len(velocity) == 2, "`position` and `velocity` need x and y")
+    return Track.constant(position, velocity, _optional_float(snapshot, "time") or 0.)
+#enddef
+
+
+def parse_geometry(snapshot: dict) -> Geometry | None:
+    mode = snapshot.get("mode", DOAMode.Fixed)
+    if mode == DOAMode.Fixed:
+        return None
+    #endif
+    if mode == DOAMode.Track:
+        # the receiver stays at the origin by default
+        return Geometry(
+            parse_track(snapshot["emitter"]),
+            parse_track(snapshot.get("receiver", {}))
+        )
+    #endif
+    raise ValueError(f"unknown doa mode `{mode}`")
+#enddef
+
+
+def parse_doa(snapshot: dict) -> DOA:
+    return DOA(
+        float(snapshot["value"]),
+        std=_optional_float(snapshot, "std"),
+        geometry=parse_geometry(snapshot)
+    )
+#enddef
+
+
+def parse_rf(snapshot: dict) -> RF:
+    mode = snapshot["mode"]
+    std = _optional_float(snapshot, "std")
+    if mode == RFMode.Fixed:
+        return RF(float(snapshot["value"]), std=std)
+    #endif
+    if mode == RFMode.GroupAgile:
+        return RF(
+            _floats(snapshot["value"]),
+            std=std,
+            group_size=_optional_int(snapshot, "group_size"),
+            random=snapshot.get("random", False)
+        )
+    #endif
+    if mode == RFMode.Sine or mode == RFMode.Sawtooth:
+        # `bandwidth` peak to peak around `value`, over `period` pulses
+        value = float(snapshot["value"])
+        bandwidth = float(snapshot["bandwidth"])
+        period = int(snapshot["period"])
+        _check(period >= 1, "`rf.period` is less than 1")
+        if mode == RFMode.Sine:
+            pattern: Pattern = Sine(value, bandwidth / 2, period)
+        else:
+            pattern = Arithmetic(value - bandwidth / 2, bandwidth / period, period)
+        #endif
+        return RF(pattern, std=std)
+    #endif
+    if mode == RFMode.RandomSlip:
+        value = float(snapshot["value"])
+        _check(value > 0, "`rf.value` is not positive")
+        return RF(value, jitter_rate=float(snapshot["bandwidth"]) / (2 * value))
+    #endif
+    if mode == RFMode.Hopping:
+        # an explicit table, or `length` hops over the channels of a range
+        if snapshot.get("value") not in (None, ""):
+            table: Pattern | tuple[float, ...] = _floats(snapshot["value"])
+        else:
+            length = int(snapshot["length"])
+            _check(length >= 1, "`rf.length` is less than 1")
+            table = Hop(parse_range(snapshot), length, _optional_int(snapshot, "hop_seed") or 0)
+        #endif
+        return RF(
+            table,
+            std=std,
+            group_size=_optional_int(snapshot, "group_size"),
+            random=snapshot.get("random", False)
+        )
+    #endif
+    raise ValueError(f"unknown rf mode `{mode}`")
+#enddef
+
+
+def parse_pw(snapshot: dict) -> PW:
+    mode = snapshot["mode"]
+    std = _optional_float(snapshot, "std")
+    if mode == PWMode.Fixed:
+        return PW(float(snapshot["value"]), std=std)
+    #endif
+    if mode == PWMode.Uneven or mode == PWMode.Group:
+        return PW(
+            _floats(snapshot["value"]),
+            std=std,
+            group_size=_optional_int(snapshot, "group_size")
+        )
+    #endif
+    raise ValueError(f"unknown pw mode `{mode}`")
+#enddef
+
+
+# scan of every pa mode, and its fields besides the common ones
+SCANS: dict[PAMode, tuple[type[Scan], tuple[str, ...]]] = {
+    PAMode.Circular: (CircularScan, ()),
+    PAMode.Sector: (SectorScan, ("width", "center")),
+    PAMode.Raster: (RasterScan, ("width", "lines", "line_step")),
+    PAMode.Conical: (ConicalScan, ("squint", "offset")),
+}
+
+
+def parse_scan(snapshot: dict) -> Scan | None:
+    mode = snapshot.get("mode", PAMode.Fixed)
+    if mode == PAMode.Fixed:
+        return None
+    #endif
+    if mode not in SCANS:
+        raise ValueError(f"unknown pa mode `{mode}`")
+    #endif
+    scan, names = SCANS[PAMode(mode)]
+    kwargs: dict[str, Any] = {"period": float(snapshot["period"])}
+    for name in ("beamwidth", "phase", "sidelobe", *names):
+        value = _optional_float(snapshot, name)
+        if value is not None:
+            kwargs[name] = int(value) if name == "lines" else value
+        #endif
+    #endfor
+    result = scan(**kwargs)
+    _check(result.period > 0, "`pa.period` is not positive")
+    _check(result.beamwidth > 0, "`pa.beamwidth` is not positive")
+    _check(getattr(result, "lines", 1) >= 1, "`pa.lines` is less than 1")
+    return result
+#enddef
+
+
+def parse_pa(snapshot: dict, geometry: Geometry | None = None) -> PA:
+    """@param geometry: tracks of the doa, needed for `reference`"""
+
+    reference = _optional_float(snapshot, "reference")
+    if reference is not None:
+        _check(geometry is not None, "`pa.reference` needs a doa track")
+        _check(reference > 0, "`pa.reference` is not positive")
+    #endif
+    return PA(
+        float(snapshot["value"]),
+        parse_scan(snapshot),
+        geometry if reference is not None else None,
+        reference
+    )
+#enddef
+
+
+def _probability(snapshot: dict, key: str, default: float | None = None) -> float:
+    value = float(snapshot[key]) if default is None else float(snapshot.get(key, default))
+    _check(0 <= value <= 1, f"`{key}` is out of [0, 1]")
+    return value
+#enddef
+
+
+def parse_loss(snapshot: dict) -> LossModel:
+    """loss model of a `[[radar.loss]]` table, chosen by its `model`."""
+
+    model = snapshot["model"]
+    if model == "independent":
+        loss = Independent(_probability(snapshot, "rate"))
+        _check(loss.rate < 1, "`rate` loses every pulse")
+        return loss
+    #endif
+    if model == "burst":
+        loss = GilbertElliott(
+            _probability(snapshot, "p_bad"),
+            _probability(snapshot, "p_good"),
+            _probability(snapshot, "loss_good", 0.),
+            _probability(snapshot, "loss_bad", 1.)
+        )
+        _check(
+            loss.loss_good < 1 or loss.loss_bad < 1,
+            "`loss_good` and `loss_bad` lose every pulse"
+        )
+        _check(
+            loss.loss_bad < 1 or loss.p_good > 0 or loss.p_bad == 0,
+            "`p_good` never leaves the bad state, which loses every pulse"
+        )
+        return loss
+    #endif
+    if model == "scan":
+        loss = ScanBlanking(
+            float(snapshot["period"]),
+            float(snapshot["width"]),
+            float(snapshot.get("phase", 0.))
+        )
+        _check(loss.period > 0, "`period` is not positive")
+        _check(loss.width >= 0, "`width` is negative")
+        _check(loss.width < loss.period, "`width` blanks the whole `period`")
+        return loss
+    #endif
+    if model == "window":
+        loss = WindowMask(tuple(
+            (float(start), float(end))
+            for start, end in snapshot["windows"]
+        ))
+        for start, end in loss.windows:
+            _check(start <= end, "a window ends before it starts")
+            _check(math.isfinite(end), "a window never ends, losing every later pulse")
+        #endfor
+        return loss
+    #endif
+    raise ValueError(f"unknown loss model `{model}`, expected one of {', '.join(MODELS)}")
+#enddef
+
+
+def parse_radar(snapshot: dict, id: int = -1) -> Radar:
+    """build a radar from the snapshot of one radar config panel."""
+
+    return compile_radar(snapshot).build(id)
+#enddef
+
+
+@dataclass(eq=False, frozen=True)
+class RadarSpec:
+    """ validated, immutable config of one radar."""
+
+    start_toa: float
+    loss_rate: float | None
+    pri: PRI
+    doa: DOA
+    rf: RF
+    pw: PW
+    pa: PA
+    losses: tuple[LossModel, ...] = ()
+
+    def build(self, id: int) -> Radar:
+        return Radar(
+            id,
+            self.start_toa,
+            self.pri,
+            self.doa,
+            self.rf,
+            self.pw,
+            self.pa,
+            self.loss_rate,
+            self.losses
+        )
+    #enddef
+#endclass
+
+
+@dataclass(eq=False, frozen=True)
+class Scenario:
+    """ compiled config, radars and the seed to generate them with."""
+
+    radars: tuple[RadarSpec, ...]
+    seed: int | None = None
+
+    def generator(self, seed: int | None = None) -> Generator:
+        """generator with one radar per spec, ids are the indices.
+
+        @param seed: overrides the seed of the scenario
+        """
+
+        g = Generator(self.seed if seed is None else seed)
+        for i, spec in enumerate(self.radars):
+            g.add(spec.build(i))
+        #endfor
+        return g
+    #enddef
+#endclass
+
+
+def _check(ok: bool, message: str) -> None:
+    if not ok:
+        raise ValueError(message)
+    #endif
+#enddef
+
+
+def _bounds(value: float | tuple[float, ...] | Pattern) -> tuple[float, float]:
+    """smallest and largest value, without expanding a pattern."""
+
+    if isinstance(value, Pattern):
+        _check(len(value) > 0, "is empty")
+        return value.bounds()
+    #endif
+    values = value if isinstance(value, tuple) else (value,)
+    _check(len(values) > 0, "is empty")
+    return min(values), max(values)
+#enddef
+
+
+def _validate(name: str, parameter: PRI | DOA | RF | PW | PA) -> tuple[float, float]:
+    try:
+        low, high = _bounds(parameter.value)
+    except ValueError as e:
+        raise ValueError(f"`{name}.value` {e}") from e
+    #endtry
+    _check(math.isfinite(low) and math.isfinite(high), f"`{name}.value` is not finite")
+    std = getattr(parameter, "std", None)
+    _check(std is None or std >= 0, f"`{name}.std` is negative")
+    group_size = getattr(parameter, "group_size", None)
+    _check(group_size is None or group_size >= 1, f"`{name}.group_size` is less than 1")
+    jitter_rate = getattr(parameter, "jitter_rate", None)
+    _check(
+        jitter_rate is None or 0 <= jitter_rate < 1,
+        f"`{name}.jitter_rate` is out of [0, 1)"
+    )
+    return low, high
+#enddef
+
+
+def compile_radar(snapshot: dict) -> RadarSpec:
+    """parse and validate the snapshot of one radar."""
+
+    doa = parse_doa(snapshot["doa"])
+    spec = RadarSpec(
+        _optional_float(snapshot, "start_toa") or 0.,
+        _optional_float(snapshot, "loss_rate"),
+        parse_pri(snapshot["pri"]),
+        doa,
+        parse_rf(snapshot["rf"]),
+        parse_pw(snapshot["pw"]),
+        parse_pa(snapshot["pa"], doa.geometry),
+        tuple(parse_loss(loss) for loss in snapshot.get("loss", ()))
+    )
+    _check(math.isfinite(spec.start_toa), "`start_toa` is not finite")
+    _check(
+        spec.loss_rate is None or 0 <= spec.loss_rate < 1,
+        "`loss_rate` is out of [0, 1)"
+    )
+    for name in ("doa", "rf", "pw", "pa"):
+        _validate(name, getattr(spec, name))
+    #endfor
+    low, _ = _validate("pri", spec.pri)
+    _check(low > 0, "`pri.value` is not positive")
+    return spec
+#enddef
+
+
+def compile_config(config: dict) -> Scenario:
+    """compile a `{"seed": ..., "radar": [...]}` config."""
+
+    radars = config.get("radar")
+    if not isinstance(radars, list):
+        raise ValueError("`radar` list is needed in config")
+    #endif
+    specs = []
+    for i, snapshot in enumerate(radars):
+        try:
+            specs.append(compile_radar(snapshot))
+        except (KeyError, TypeError, ValueError) as e:
+            raise ValueError(f"invalid radar {i}: {type(e).__name__}: {e}") from e
+        #endtry
+    #endfor
+    return Scenario(tuple(specs), config.get("seed"))
+#enddef
+
+
+# bump when the compiled classes change, so stale caches are recompiled
+_CACHE_VERSION = 7
+_CACHE_MAGIC = b"RGCACHE\0"
+
+
+def cache_path(path: Path) -> Path:
+    return path.with_name(f".{path.name}.cache")
+#enddef
+
+
+def _cache_secret() -> bytes:
+    """per-user secret signing the caches, created on first use."""
+
+    directory = Path(os.environ.get("XDG_CACHE_HOME") or Path.home() / ".cache") / "radar_generator"
+    path = directory / "cache.key"
+    try:
+        return path.read_bytes()
+    except FileNotFoundError:
+        pass
+    #endtry
+    directory.mkdir(parents=True, exist_ok=True)
+    secret = secrets.token_bytes(32)
+    try:
+        # only the user may read it, an existing key from a concurrent
+        # first run wins
+        fd = os.open(path, os.O_WRONLY | os.O_CREAT | os.O_EXCL, 0o600)
+    except FileExistsError:
+        return path.read_bytes()
+    #endtry
+    with os.fdopen(fd, "wb") as f:
+        f.write(secret)
+    #endwith
+    return secret
+#enddef
+
+
+def _read_cache(path: Path, key: bytes) -> Scenario | None:
+    """the cached scenario if the cache is of this content and signed
+    with the user secret, checked before anything is unpickled.
+    """
+
+    data = cache_path(path).read_bytes()
+    size = len(_CACHE_MAGIC) + 2 * hashlib.sha256().digest_size
+    header, payload = data[:size], data[size:]
+    magic = header[:len(_CACHE_MAGIC)]
+    cached_key = header[len(_CACHE_MAGIC):len(_CACHE_MAGIC) + len(key)]
+    signature = header[len(_CACHE_MAGIC) + len(key):]
+    if magic != _CACHE_MAGIC or cached_key != key:
+        return None
+    #endif
+    expected = hmac.digest(_cache_secret(), key + payload, "sha256")
+    if not hmac.compare_digest(signature, expected):
+        logger.warning(f"ignoring cache `{cache_path(path)}` with a bad signature")
+        return None
+    #endif
+    return pickle.loads(payload)
+#enddef
+
+
+def _write_cache(path: Path, key: bytes, scenario: Scenario) -> None:
+    payload = pickle.dumps(scenario)
+    signature = hmac.digest(_cache_secret(), key + payload, "sha256")
+    tmp = cache_path(path).with_suffix(".tmp")
+    with open(tmp, "wb") as f:
+        f.write(_CACHE_MAGIC + key + signature + payload)
+    #endwith
+    os.replace(tmp, cache_path(path))
+#enddef
+
+
+def load(path: str | Path, cache: bool = True) -> Scenario:
+    """compile a toml config file.
+
+    the compiled scenario is cached next to the file, keyed by the hash
+    of its content, so loading an unchanged file skips parsing. caches
+    are signed with a per-user secret and only unpickled if the
+    signature matches, so a cache written by someone else is never
+    loaded.
+    """
+
+    path = Path(path)
+    content = path.read_bytes()
+    key = hashlib.sha256(
+        _CACHE_VERSION.to_bytes(4, "little") + content
+    ).digest()
+    if cache:
+        try:
+            scenario = _read_cache(path, key)
+            if scenario is not None:
+                return scenario
+            #endif
+        except Exception as e:
+            logger.debug(f"no usable cache for `{path}`: {e}")
+        #endtry
+    #endif
+
+    scenario = compile_config(tomli.loads(content.decode()))
+    if cache:
+        try:
+            _write_cache(path, key, scenario)
+        except OSError as e:
+            logger.debug(f"cannot write cache for `{path}`: {e}")
+        #endtry
+    #endif
+    return scenario
+#enddef
@@ -0,0 +1,240 @@
+import sys
+from abc import abstractmethod
+from itertools import chain
+from pathlib import Path
+from typing import Any
+
+import numpy as np
+
+from .radar import PDWBatch
+from .utils import import_pyarrow
+
+
+class Sink:
+    """ output of generated PDW chunks."""
+
+    path: Path
+
+    def __init__(self, path: str | Path) -> None:
+        self.path = Path(path)
+    #enddef
+
+    @abstractmethod
+    def write(self, batch: PDWBatch) -> None:
+        """write one chunk of pulses."""
+    #enddef
+
+    def close(self) -> None:
+        pass
+    #enddef
+
+    def __enter__(self) -> "Sink":
+        return self
+    #enddef
+
+    def __exit__(self, *_) -> None:
+        self.close()
+    #enddef
+#endclass
+
+
+class CSVSink(Sink):
+    """ csv with `RadarID,TOA,DOA,RF,PW,PA` header.
+
+    every chunk is formatted with one `%` call and written at once.
+    `precision` maps a float column (`toa`, `doa`, `rf`, `pw`, `pa`) to
+    its number of decimals, columns not in it keep the shortest
+    round-trip repr, the same text as `str(float)`.
+    """
+
+    header: bytes = b"RadarID,TOA,DOA,RF,PW,PA\n"
+    columns: tuple[str, ...] = ("radar_id", "toa", "doa", "rf", "pw", "pa")
+
+    def __init__(self, path: str | Path, precision: dict[str, int] | None = None) -> None:
+        super().__init__(path)
+        self._precision = precision or {}
+        unknown = set(self._precision) - set(self.columns[1:])
+        if unknown:
+            raise ValueError(f"no float column named {', '.join(sorted(unknown))}")
+        #endif
+        # `-` writes to stdout
+        self._file = (
+            sys.stdout.buffer if str(path) == "-"
+            else open(self.path, "wb")
+        )
+        self._file.write(self.header)
+    #enddef
+
+    def write(self, batch: PDWBatch) -> None:
+        if len(batch):
+            self._file.write(format_csv(batch, self._precision, self.columns))
+        #endif
+    #enddef
+
+    def close(self) -> None:
+        if self._file is sys.stdout.buffer:
+            self._file.flush()
+        else:
+            self._file.close()
+        #endif
+    #enddef
+#endclass
+
+
+def format_csv(
+    batch: PDWBatch,
+    precision: dict[str, int],
+    columns: tuple[str, ...] = CSVSink.columns,
+) -> bytes:
+    """format a chunk as csv rows.
+
+    the row template is repeated for every pulse and filled with the
+    interleaved values in one `%` call, fixed decimals with `%.Nf`, the
+    same text and rounding as `f"{value:.Nf}"`, the others with `%r`,
+    the same as `str(float)`.
+    """
+
+    row = ",".join(
+        f"%.{precision[name]}f" if name in precision
+        else "%r" if np.dtype(PDWBatch.dtypes[name]).kind == "f"
+        else "%d"
+        for name in columns
+    ) + "\n"
+    values = tuple(chain.from_iterable(zip(*(getattr(batch, name).tolist() for name in columns))))
+    return ((row * len(batch)) % values).encode()
+#enddef
+
+
+def _to_arrow(arrow: Any, batch: PDWBatch) -> Any:
+    # arrow wraps the contiguous numpy columns without copying
+    return arrow.RecordBatch.from_arrays(
+        [arrow.array(column) for column in batch.to_numpy().values()],
+        names=list(PDWBatch.dtypes)
+    )
+#enddef
+
+
+def _arrow_schema(arrow: Any) -> Any:
+    return arrow.schema([
+        (name, arrow.from_numpy_dtype(np.dtype(dtype)))
+        for name, dtype in PDWBatch.dtypes.items()
+    ])
+#enddef
+
+
+class ParquetSink(Sink):
+    """ parquet file, one row group per chunk."""
+
+    def __init__(self, path: str | Path) -> None:
+        super().__init__(path)
+        self._arrow = import_pyarrow()
+        import pyarrow.parquet as pq
+        self._writer = pq.ParquetWriter(self.path, _arrow_schema(self._arrow))
+    #enddef
+
+    def write(self, batch: PDWBatch) -> None:
+        if len(batch):
+            self._writer.write_batch(_to_arrow(self._arrow, batch))
+        #endif
+    #enddef
+
+    def close(self) -> None:
+        self._writer.close()
+    #enddef
+#endclass
+
+
+class ArrowSink(Sink):
+    """ arrow ipc stream, one record batch per chunk."""
+
+    def __init__(self, path: str | Path) -> None:
+        super().__init__(path)
+        self._arrow = import_pyarrow()
+        import pyarrow.ipc
+        self._writer = pyarrow.ipc.new_stream(str(self.path), _arrow_schema(self._arrow))
+    #enddef
+
+    def write(self, batch: PDWBatch) -> None:
+        if len(batch):
+            self._writer.write_batch(_to_arrow(self._arrow, batch))
+        #endif
+    #enddef
+
+    def close(self) -> None:
+        self._writer.close()
+    #enddef
+#endclass
+
+
+class NpyDirSink(Sink):
+    """ directory with one `.npy` file per column.
+
+    the data is appended chunk by chunk and the header is rewritten with
+    the final length on close, numpy pads the header so its size does not
+    depend on the length.
+    """
+
+    def __init__(self, path: str | Path) -> None:
+        super().__init__(path)
+        self.path.mkdir(parents=True, exist_ok=True)
+        self._size = 0
+        self._files = {
+            name: open(self.path / f"{name}.npy", "wb")
+            for name in PDWBatch.dtypes
+        }
+        self._write_headers()
+    #enddef
+
+    def _write_headers(self) -> None:
+        for name, f in self._files.items():
+            f.seek(0)
+            np.lib.format.write_array_header_1_0(f, {
+                "descr": np.lib.format.dtype_to_descr(np.dtype(PDWBatch.dtypes[name])),
+                "fortran_order": False,
+                "shape": (self._size,),
+            })
+        #endfor
+    #enddef
+
+    def write(self, batch: PDWBatch) -> None:
+        for name, column in batch.to_numpy().items():
+            self._files[name].write(column.data)
+        #endfor
+        self._size += len(batch)
+    #enddef
+
+    def close(self) -> None:
+        self._write_headers()
+        for f in self._files.values():
+            f.close()
+        #endfor
+    #enddef
+#endclass
+
+
+SINKS: dict[str, type[Sink]] = {
+    ".csv": CSVSink,
+    ".parquet": ParquetSink,
+    ".arrow": ArrowSink,
+    ".arrows": ArrowSink,
+    ".npy": NpyDirSink,
+}
+
+
+def open_sink(path: str | Path, **options: Any) -> Sink:
+    """open a sink chosen by the extension of `path`.
+
+    `.csv`, `.parquet`, `.arrow`/`.arrows` (ipc stream), and `.npy` for a
+    directory of per-column `.npy` files, `-` writes csv to stdout.
+    `options` are passed to the sink, e.g. `precision` of `CSVSink`.
+    """
+
+    if str(path) == "-":
+        return CSVSink(path, **options)
+    #endif
+    suffix = Path(path).suffix.lower()
+    if suffix not in SINKS:
+        raise ValueError(f"unsupported output `{path}`, expected one of {', '.join(SINKS)}")
+    #endif
+    return SINKS[suffix](path, **options)
+#enddef
@@ -0,0 +1,332 @@
+import json
+import math
+from pathlib import Path
+from typing import Any
+
+import numpy as np
+
+from .pipeline import Stage
+from .radar import Generator, PDWBatch
+
+
+def pri(batch: PDWBatch) -> np.ndarray:
+    """pri of every pulse to the previous pulse of the same radar, `nan`
+    for the first pulse of each radar.
+    """
+
+    order = np.argsort(batch.radar_id, kind="stable")
+    toa = batch.toa[order]
+    ids = batch.radar_id[order]
+    diff = np.empty(toa.size, dtype=np.float64)
+    diff[1:] = toa[1:] - toa[:-1]
+    diff[:1] = np.nan
+    diff[1:][ids[1:] != ids[:-1]] = np.nan
+    result = np.empty_like(diff)
+    result[order] = diff
+    return result
+#enddef
+
+
+class _Moments:
+    """ count, mean, std, min and max per row, merged chunk by chunk."""
+
+    count: np.ndarray
+    mean: np.ndarray
+    m2: np.ndarray
+    min: np.ndarray
+    max: np.ndarray
+
+    def __init__(self) -> None:
+        self.count = np.zeros(0, dtype=np.int64)
+        self.mean = np.zeros(0)
+        self.m2 = np.zeros(0)
+        self.min = np.zeros(0)
+        self.max = np.zeros(0)
+    #enddef
+
+    def grow(self, size: int) -> None:
+        extra = size - self.count.size
+        if extra > 0:
+            self.count = np.concatenate((self.count, np.zeros(extra, dtype=np.int64)))
+            self.mean = np.concatenate((self.mean, np.zeros(extra)))
+            self.m2 = np.concatenate((self.m2, np.zeros(extra)))
+            self.min = np.concatenate((self.min, np.full(extra, np.inf)))
+            self.max = np.concatenate((self.max, np.full(extra, -np.inf)))
+        #endif
+    #enddef
+
+    def update(self, rows: np.ndarray, x: np.ndarray) -> None:
+        """add values `x` of rows `rows`."""
+
+        size = self.count.size
+        count = np.bincount(rows, minlength=size)
+        seen = count > 0
+        mean = np.bincount(rows, x, minlength=size)
+        mean[seen] /= count[seen]
+        m2 = np.bincount(rows, (x - mean[rows]) ** 2, minlength=size)
+        # chan's parallel update of mean and squared deviations
+        total = self.count + count
+        delta = mean - self.mean
+        weight = np.divide(count, total, out=np.zeros(size), where=total > 0)
+        self.m2 += m2 + delta ** 2 * self.count * weight
+        self.mean += delta * weight
+        self.count = total
+        np.minimum.at(self.min, rows, x)
+        np.maximum.at(self.max, rows, x)
+    #enddef
+
+    def row(self, i: int) -> dict[str, float | None]:
+        if not self.count[i]:
+            return {"mean": None, "std": None, "min": None, "max": None}
+        #endif
+        return {
+            "mean": float(self.mean[i]),
+            "std": math.sqrt(self.m2[i] / self.count[i]),
+            "min": float(self.min[i]),
+            "max": float(self.max[i]),
+        }
+    #enddef
+#endclass
+
+
+class Summary(Stage):
+    """ statistics of a pulse stream, updated with every chunk.
+
+    pulse counts, mean, std, min and max of every parameter and a pri
+    histogram per radar, the pri taken between pulses of the same radar
+    across chunks, and a histogram of the toa density. the density keeps
+    at most `toa_bins` bins, when the stream outgrows them adjacent bins
+    are merged pairwise, doubling their width, so memory does not grow
+    with the run length. as a pipeline stage it passes chunks on
+    unchanged.
+    """
+
+    FIELDS: tuple[str, ...] = ("doa", "rf", "pw", "pa")
+
+    pri_resolution: float
+    toa_resolution: float
+    toa_bins: int
+    _ids: list[int]
+    _rows: dict[int, int]
+    _moments: dict[str, _Moments]
+    _last_toa: np.ndarray
+    # per radar, pri bin to count
+    _pri_bins: list[dict[int, int]]
+    # density bins are `2 ** _toa_scale` bins of `toa_resolution`, the
+    # first one is bin `_toa_first` of that width
+    _toa_scale: int
+    _toa_first: int
+    _toa_counts: np.ndarray
+    _emitted: dict[int, int] | None
+
+    def __init__(
+        self,
+        pri_resolution: float = 1.,
+        toa_resolution: float = 1000.,
+        toa_bins: int = 4096,
+    ) -> None:
+        if pri_resolution <= 0 or toa_resolution <= 0:
+            raise ValueError("histogram resolution is not positive")
+        #endif
+        if toa_bins < 2:
+            raise ValueError("`toa_bins` is less than 2")
+        #endif
+        self.pri_resolution = pri_resolution
+        self.toa_resolution = toa_resolution
+        self.toa_bins = toa_bins
+        self._ids = []
+        self._rows = {}
+        self._moments = {name: _Moments() for name in ("toa", *self.FIELDS, "pri")}
+        self._last_toa = np.zeros(0)
+        self._pri_bins = []
+        self._toa_scale = 0
+        self._toa_first = 0
+        self._toa_counts = np.zeros(0, dtype=np.int64)
+        self._emitted = None
+    #enddef
+
+    def process(self, chunk: PDWBatch) -> PDWBatch:
+        self.update(chunk)
+        return chunk
+    #enddef
+
+    def _rows_of(self, radar_id: np.ndarray) -> np.ndarray:
+        ids, inverse = np.unique(radar_id, return_inverse=True)
+        for i in ids.tolist():
+            if i not in self._rows:
+                self._rows[i] = len(self._ids)
+                self._ids.append(i)
+                self._pri_bins.append({})
+            #endif
+        #endfor
+        size = len(self._ids)
+        for moments in self._moments.values():
+            moments.grow(size)
+        #endfor
+        if self._last_toa.size < size:
+            self._last_toa = np.concatenate(
+                (self._last_toa, np.full(size - self._last_toa.size, np.nan))
+            )
+        #endif
+        return np.array([self._rows[i] for i in ids.tolist()], dtype=np.intp)[inverse]
+    #enddef
+
+    def update(self, chunk: PDWBatch) -> None:
+        """add the pulses of a chunk sorted by toa."""
+
+        if not len(chunk):
+            return
+        #endif
+        rows = self._rows_of(chunk.radar_id)
+        for name in ("toa", *self.FIELDS):
+            self._moments[name].update(rows, getattr(chunk, name))
+        #endfor
+
+        # pri to the previous pulse of the same radar, maybe in an earlier chunk
+        # stable sort of 16 bit keys is a radix sort
+        keys = rows.astype(np.uint16) if len(self._ids) <= 1 << 16 else rows
+        order = np.argsort(keys, kind="stable")
+        toa = chunk.toa[order]
+        sorted_rows = rows[order]
+        first = np.empty(toa.size, dtype=np.bool_)
+        first[0] = True
+        np.not_equal(sorted_rows[1:], sorted_rows[:-1], out=first[1:])
+        previous = np.empty_like(toa)
+        previous[1:] = toa[:-1]
+        previous[first] = self._last_toa[sorted_rows[first]]
+        last = np.append(first[1:], True)
+        self._last_toa[sorted_rows[last]] = toa[last]
+        intervals = toa - previous
+        valid = ~np.isnan(intervals)
+        intervals, pri_rows = intervals[valid], sorted_rows[valid]
+        if intervals.size:
+            self._moments["pri"].update(pri_rows, intervals)
+            bins = np.floor(intervals / self.pri_resolution).astype(np.int64)
+            low = int(bins.min())
+            span = int(bins.max()) - low + 1
+            # one integer key per (row, bin), counted with a single sort
+            keys, counts = np.unique(pri_rows * span + (bins - low), return_counts=True)
+            rows_of_keys, bins_of_keys = np.divmod(keys, span)
+            for row, b, count in zip(rows_of_keys.tolist(), (bins_of_keys + low).tolist(), counts.tolist()):
+                histogram = self._pri_bins[row]
+                histogram[b] = histogram.get(b, 0) + count
+            #endfor
+        #endif
+
+        # toa density, grown on both sides as needed and coarsened to fit
+        bins = np.floor(chunk.toa / self.toa_resolution).astype(np.int64) >> self._toa_scale
+        low, high = int(bins.min()), int(bins.max())
+        if not self._toa_counts.size:
+            self._toa_first = low
+        #endif
+        while (
+            max(high, self._toa_first + self._toa_counts.size - 1)
+            - min(low, self._toa_first) + 1 > self.toa_bins
+        ):
+            self._coarsen()
+            bins >>= 1
+            low, high = low >> 1, high >> 1
+        #endwhile
+        if low < self._toa_first:
+            self._toa_counts = np.concatenate(
+                (np.zeros(self._toa_first - low, dtype=np.int64), self._toa_counts)
+            )
+            self._toa_first = low
+        #endif
+        self._toa_counts = np.concatenate((
+            self._toa_counts,
+            np.zeros(max(high - self._toa_first + 1 - self._toa_counts.size, 0), dtype=np.int64)
+        ))
+        self._toa_counts += np.bincount(bins - self._toa_first, minlength=self._toa_counts.size)
+    #enddef
+
+    def _coarsen(self) -> None:
+        """merge the density bins pairwise, aligned to twice their width."""
+
+        counts = self._toa_counts
+        odd = self._toa_first & 1
+        counts = np.concatenate((np.zeros(odd, dtype=np.int64), counts))
+        counts = np.concatenate((counts, np.zeros(counts.size & 1, dtype=np.int64)))
+        self._toa_counts = counts.reshape(-1, 2).sum(axis=1)
+        self._toa_first >>= 1
+        self._toa_scale += 1
+    #enddef
+
+    def count_lost(self, generator: Generator, end_toa: float | None = None) -> None:
+        """count the pulses every radar emitted before `end_toa`, lost
+        pulses included, to report the lost ones.
+
+        @param end_toa: end of the stream, after the last pulse seen by
+            default, as for a stream cut by a pulse number
+        """
+
+        if end_toa is None:
+            toa = self._moments["toa"]
+            last = float(toa.max.max()) if toa.count.sum() else -np.inf
+            end_toa = float(np.nextafter(last, np.inf))
+        #endif
+        self._emitted = dict(zip(
+            (radar.id for radar in generator.radars),
+            generator.emitted(end_toa)
+        ))
+    #enddef
+
+    def _radar(self, radar_id: int) -> dict[str, Any]:
+        row = self._rows.get(radar_id)
+        count = int(self._moments["toa"].count[row]) if row is not None else 0
+        result: dict[str, Any] = {"pulses": count}
+        if self._emitted is not None and radar_id in self._emitted:
+            result["emitted"] = self._emitted[radar_id]
+            result["lost"] = self._emitted[radar_id] - count
+        #endif
+        if row is None:
+            return result
+        #endif
+        for name in self.FIELDS:
+            result[name] = self._moments[name].row(row)
+        #endfor
+        result["pri"] = {
+            **self._moments["pri"].row(row),
+            "histogram": [
+                [b * self.pri_resolution, count]
+                for b, count in sorted(self._pri_bins[row].items())
+            ],
+        }
+        return result
+    #enddef
+
+    def to_dict(self) -> dict[str, Any]:
+        toa = self._moments["toa"]
+        seen = toa.count > 0
+        ids = list(self._ids)
+        ids += [i for i in self._emitted or () if i not in self._rows]
+        return {
+            "pulses": int(toa.count.sum()),
+            "toa": {
+                "min": float(toa.min[seen].min()) if seen.any() else None,
+                "max": float(toa.max[seen].max()) if seen.any() else None,
+            },
+            "toa_density": {
+                "resolution": self.toa_resolution * 2 ** self._toa_scale,
+                "start": self._toa_first * self.toa_resolution * 2 ** self._toa_scale,
+                "counts": self._toa_counts.tolist(),
+            },
+            "pri_resolution": self.pri_resolution,
+            "radars": {str(i): self._radar(i) for i in sorted(ids)},
+        }
+    #enddef
+
+    def save(self, path: str | Path) -> None:
+        with open(path, "w") as f:
+            json.dump(self.to_dict(), f, indent=2)
+        #endwith
+    #enddef
+#endclass
+
+
+def sidecar_path(output: str | Path) -> Path:
+    """summary next to an output, `out.csv.stats.json` for `out.csv`."""
+
+    output = Path(output)
+    return output.with_name(f"{output.name}.stats.json")
+#enddef
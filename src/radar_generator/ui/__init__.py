@@ -2,8 +2,8 @@ from pathlib import Path
 
 import tomli
 import tomli_w
-import numpy as np
 import pandas as pd
+from loguru import logger
 import pyqtgraph as pg
 from pyqtgraph.graphicsItems.PlotDataItem import ScatterPlotItem
 from pyqtgraph.Qt.QtCore import QObject, QPoint, QThread, Signal, SignalInstance
@@ -28,7 +28,7 @@ from PySide6.QtWidgets import (
     QWidget,
 )
 
-from .. import RadarGenerator
+from .. import RadarGenerator, pipeline, scenario, sink, stats
 from ..radar import Radar
 from . import utils
 from .doa import DOABox
@@ -48,10 +48,13 @@ class RadarConfigPanel(QFrame):
     _rf: RFBox
     _pw: PWBox
     _pa: PABox
+    # loss models of the config, only edited in the toml, kept as loaded
+    _loss: list[dict]
 
     def __init__(self) -> None:
         super().__init__()
         self.setFrameStyle(QFrame.Shape.Box)
+        self._loss = []
 
         vbox = QVBoxLayout()
         self.setLayout(vbox)
@@ -81,6 +84,7 @@ class RadarConfigPanel(QFrame):
     def clear(self) -> None:
         self._start_toa.set("")
         self._loss_rate.set("")
+        self._loss = []
         self._pri.load_snapshot({})
         self._doa.load_snapshot({})
         self._rf.load_snapshot({})
@@ -96,13 +100,15 @@ class RadarConfigPanel(QFrame):
             "doa": self._doa.snapshot(),
             "rf": self._rf.snapshot(),
             "pw": self._pw.snapshot(),
-            "pa": self._pa.snapshot()
+            "pa": self._pa.snapshot(),
+            "loss": self._loss
         }
     #enddef
 
     def load_snapshot(self, snapshot: dict) -> None:
         self._start_toa.set(snapshot.get("start_toa", ""))
         self._loss_rate.set(snapshot.get("loss_rate", ""))
+        self._loss = snapshot.get("loss", [])
         self._pri.load_snapshot(snapshot.get("pri", {}))
         self._doa.load_snapshot(snapshot.get("doa", {}))
         self._rf.load_snapshot(snapshot.get("rf", {}))
@@ -111,24 +117,7 @@ class RadarConfigPanel(QFrame):
     #enddef
 
     def parse_snapshot(self, snapshot: dict) -> Radar:
-        start_toa = 0
-        if snapshot.get("start_toa"):
-            start_toa = float(snapshot["start_toa"])
-        #endif
-        loss_rate = None
-        if snapshot.get("loss_rate"):
-            loss_rate = float(snapshot["loss_rate"])
-        #endif
-        return Radar(
-            -1,
-            start_toa,
-            self._pri.parse_snapshot(snapshot["pri"]),
-            self._doa.parse_snapshot(snapshot["doa"]),
-            self._rf.parse_snapshot(snapshot["rf"]),
-            self._pw.parse_snapshot(snapshot["pw"]),
-            self._pa.parse_snapshot(snapshot["pa"]),
-            loss_rate
-        )
+        return scenario.parse_radar(snapshot)
     #enddef
 #endclass
 
@@ -138,6 +127,7 @@ class GenerateConfigDialog(QDialog):
 
     _pulse_num_input: QLineEdit
     _end_toa_input: QLineEdit
+    _workers_input: QLineEdit
     _status_label: QLabel
     _canceled: bool
 
@@ -182,6 +172,14 @@ class GenerateConfigDialog(QDialog):
         #enddef
         btn.toggled.connect(toggled2)
 
+        hbox = QHBoxLayout()
+        vbox.addLayout(hbox)
+
+        # a process pool is opt-in, one worker streams chunk by chunk
+        hbox.addWidget(QLabel("workers: "))
+        self._workers_input = workers = QLineEdit("1")
+        hbox.addWidget(workers)
+
         self._status_label = status_label = QLabel(alignment=Qt.AlignmentFlag.AlignCenter)
         status_label.setStyleSheet("color: red")
         vbox.addWidget(status_label)
@@ -222,6 +220,10 @@ class GenerateConfigDialog(QDialog):
                 return
             #endif
         #endif
+        if not self._workers_input.text().isdigit() or int(self._workers_input.text()) < 1:
+            self._status_label.setText("invalid workers")
+            return
+        #endif
         self._status_label.setText("")
         self._canceled = False
         self.close()
@@ -238,6 +240,10 @@ class GenerateConfigDialog(QDialog):
             return float(self._end_toa_input.text())
         #endif
     #enddef
+
+    def workers(self) -> int:
+        return int(self._workers_input.text())
+    #enddef
 #endclass
 
 class GenerateWorker(QObject):
@@ -248,6 +254,7 @@ class GenerateWorker(QObject):
     pulse_num: int | None
     end_toa: float | None
     done: SignalInstance
+    workers: int
 
     def __init__(
         self,
@@ -255,7 +262,8 @@ class GenerateWorker(QObject):
         save_path: str,
         pulse_num: int | None,
         end_toa: float | None,
-        done: SignalInstance
+        done: SignalInstance,
+        workers: int = 1
     ) -> None:
         super().__init__()
         self.generator = generator
@@ -263,26 +271,19 @@ class GenerateWorker(QObject):
         self.pulse_num = pulse_num
         self.end_toa = end_toa
         self.done = done
+        self.workers = workers
     #enddef
 
     def do_work(self) -> None:
-        it = iter(self.generator)
-        if self.pulse_num is not None:
-            with open(self.save_path, "w") as f:
-                f.write("RadarID,TOA,DOA,RF,PW,PA\n")
-                for _ in range(self.pulse_num):
-                    pdw = next(it)
-                    f.write(f"{pdw.radar_id},{pdw.toa},{pdw.doa},{pdw.rf},{pdw.pw},{pdw.pa}\n")
-                #endfor
-            #endwith
-        elif self.end_toa is not None:
-            with open(self.save_path, "w") as f:
-                f.write("RadarID,TOA,DOA,RF,PW,PA\n")
-                while (pdw := next(it)).toa < self.end_toa:
-                    f.write(f"{pdw.radar_id},{pdw.toa},{pdw.doa},{pdw.rf},{pdw.pw},{pdw.pa}\n")
-                #endwhile
-            #endwith
-        #endif
+        summary = stats.Summary()
+        timings = pipeline.Pipeline(
+            pipeline.source(self.generator, self.pulse_num, self.end_toa, self.workers),
+            [summary],
+            [sink.open_sink(self.save_path)]
+        ).run()
+        logger.debug("timings\n" + pipeline.format_report(timings))
+        summary.count_lost(self.generator, self.end_toa)
+        summary.save(stats.sidecar_path(self.save_path))
         self.done.emit()
     #enddef
 #endclass
@@ -292,6 +293,7 @@ class RadarGeneratorApp(QMainWindow):
     """ doc."""
 
     _radars: list[dict[str, dict[str, str]]]
+    _seed: int | None = None
     _radar_panel: QListWidget
     _radar_config_panel: RadarConfigPanel
     _plot_widget: pg.GraphicsLayoutWidget
@@ -434,6 +436,7 @@ class RadarGeneratorApp(QMainWindow):
                 QMessageBox(text="empty radar").exec()
                 return
             #endif
+            self._seed = config.get("seed")
             if config["radar"] and not self._radar_config_panel.isEnabled():
                 self._radar_config_panel.setEnabled(True)
             #endif
@@ -465,7 +468,7 @@ class RadarGeneratorApp(QMainWindow):
         #enddef
 
         def get_generator() -> RadarGenerator:
-            g = RadarGenerator()
+            g = RadarGenerator(self._seed)
             try:
                 for i, snapshot in enumerate(self._radars):
                     radar = self._radar_config_panel.parse_snapshot(snapshot)
@@ -490,9 +493,8 @@ class RadarGeneratorApp(QMainWindow):
             except Exception as e:
                 QMessageBox(text=f"{type(e)}: {e}").exec()
             else:
-                it = iter(g)
-                pdws = [next(it) for _ in range(1000)]
-                data = pd.DataFrame(pdws)
+                batch = g.take(1000)
+                data = batch.to_pandas()
                 plot_widget.clear() # pyright: ignore
                 plot = plot_widget.addPlot(row=0, col=0) # pyright: ignore
                 scatterplot(plot, data, "rf", "pw", "radar_id")
@@ -501,21 +503,16 @@ class RadarGeneratorApp(QMainWindow):
                 plot = plot_widget.addPlot(row=1, col=0) # pyright: ignore
                 scatterplot(plot, data, "toa", "rf", "radar_id")
                 plot = plot_widget.addPlot(row=1, col=1) # pyright: ignore
-                plot.setLabel("left", "PRI")
-                plot.setLabel("bottom", "index")
-                scatter = ScatterPlotItem()
-                pri = np.convolve(data["toa"].to_numpy(), [1, -1], "valid")
-                scatter.setData(
-                    np.array(range(pri.size)),
-                    pri
-                )
-                plot.addItem(scatter)
+                # pri between pulses of the same radar, not of the interleaved stream
+                data["pri"] = stats.pri(batch)
+                scatterplot(plot, data.dropna(subset="pri"), "toa", "pri", "radar_id")
             #endtry
         #enddef
         preview_button.clicked.connect(preview)
 
         t: QThread
         save_path: str = ""
+        seed: int
         def generate() -> None:
             if not self._radars:
                 QMessageBox(text="no radar configuration").exec()
@@ -538,7 +535,7 @@ class RadarGeneratorApp(QMainWindow):
 
                 file_dialog = QFileDialog()
                 file_dialog.setAcceptMode(QFileDialog.AcceptMode.AcceptSave)
-                file_dialog.setNameFilter("*.csv")
+                file_dialog.setNameFilters([f"*{suffix}" for suffix in sink.SINKS])
                 file_dialog.setDefaultSuffix("csv")
                 file_dialog.setFileMode(QFileDialog.FileMode.AnyFile)
                 file_dialog.exec()
@@ -548,14 +545,16 @@ class RadarGeneratorApp(QMainWindow):
                 else:
                     return
                 #endif
-                nonlocal t
+                nonlocal t, seed
+                seed = g.seed
                 t = QThread()
                 worker = GenerateWorker(
                     g,
                     save_path,
                     dialog.pulse_num(),
                     dialog.end_toa(),
-                    self._generate_done
+                    self._generate_done,
+                    dialog.workers()
                 )
                 t.started.connect(worker.do_work)
                 worker.moveToThread(t)
@@ -570,7 +569,7 @@ class RadarGeneratorApp(QMainWindow):
             path = Path(save_path)
             config_path = path.parent / f"{path.stem}_config.toml"
             with open(config_path, "wb") as f:
-                tomli_w.dump({"radar": self._radars}, f)
+                tomli_w.dump({"seed": seed, "radar": self._radars}, f)
             #endwith
             QMessageBox(text="generate done").exec()
         #enddef
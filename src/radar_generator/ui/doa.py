@@ -1,29 +1,75 @@
-from enum import IntEnum
+from PySide6.QtWidgets import QVBoxLayout
 
+from .. import scenario
+from . import utils
 from .base import ParameterBox
-from ..radar.doa import DOA
-
-
-class DOAMode(IntEnum):
-    """ doc."""
-
-    Fixed = 0
-#endclass
+from ..radar.doa import DOA, DOAMode
 
 
 class DOABox(ParameterBox):
     """ DOA GroupBox."""
 
+    # `x y` inputs of the constant velocity tracks, waypoints are toml only
+    _track_inputs: dict[tuple[str, str], utils.InputLayout]
+    # tracks of the config, kept as loaded but for the keys of the inputs
+    _tracks: dict[str, dict]
+
     def __init__(self) -> None:
         super().__init__("DOA")
         self._mode_combo.addItems(DOAMode._member_names_)
+        self._track_inputs = {}
+        self._tracks = {}
+
+        switchable_layout = QVBoxLayout()
+        self._layout.addLayout(switchable_layout)
+        def switch_layout(index: int) -> None:
+            utils.clear_layout(switchable_layout)
+            self._track_inputs = {}
+            if index == DOAMode.Track:
+                for track in ("emitter", "receiver"):
+                    for name in ("position", "velocity"):
+                        self._track_inputs[track, name] = input = utils.InputLayout(f"{track} {name}")
+                        input.setEnabled(not self._is_waypoints(track))
+                        switchable_layout.addLayout(input)
+                    #endfor
+                #endfor
+            #endif
+        #enddef
+        self._mode_combo.currentIndexChanged.connect(switch_layout)
+    #enddef
+
+    def _is_waypoints(self, track: str) -> bool:
+        return "times" in self._tracks.get(track, {})
+    #enddef
+
+    def snapshot(self) -> dict:
+        snapshot = super().snapshot()
+        for track, values in self._tracks.items():
+            snapshot[track] = dict(values)
+        #endfor
+        for (track, name), input in self._track_inputs.items():
+            if not self._is_waypoints(track):
+                snapshot.setdefault(track, {})[name] = input.get() or "0 0"
+            #endif
+        #endfor
+        return snapshot
+    #enddef
+
+    def load_snapshot(self, snapshot: dict) -> None:
+        self._tracks = {
+            track: dict(snapshot[track])
+            for track in ("emitter", "receiver")
+            if track in snapshot
+        }
+        super().load_snapshot(snapshot)
+        for (track, name), input in self._track_inputs.items():
+            value = snapshot.get(track, {}).get(name, "")
+            input.set(value if isinstance(value, str) else " ".join(map(str, value)))
+            input.setEnabled(not self._is_waypoints(track))
+        #endfor
     #enddef
 
     def parse_snapshot(self, snapshot: dict) -> DOA:
-        std = None
-        if snapshot.get("std"):
-            std = float(snapshot["std"])
-        #endif
-        return DOA(float(snapshot["value"]), std=std)
+        return scenario.parse_doa(snapshot)
     #enddef
 #endclass
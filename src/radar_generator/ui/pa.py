@@ -1,26 +1,64 @@
-from enum import IntEnum
+from PySide6.QtWidgets import QVBoxLayout
 
+from .. import scenario
+from . import utils
 from .base import ParameterBox
-from ..radar.pa import PA
-
-
-class PAMode(IntEnum):
-    """ doc."""
-
-    Fixed = 0
-#endclass
+from ..radar.pa import PA, PAMode
 
 
 class PABox(ParameterBox):
     """ PA GroupBox."""
 
+    # inputs of the scan fields of the current mode
+    _scan_inputs: dict[str, utils.InputLayout]
+    # range of `value`, with a doa track
+    _reference_input: utils.InputLayout
+
     def __init__(self) -> None:
         super().__init__("PA")
         self._mode_combo.addItems(PAMode._member_names_)
         self._std_input.setEnabled(False)
+        self._scan_inputs = {}
+        self._reference_input = utils.InputLayout("reference range")
+        self._layout.addLayout(self._reference_input)
+
+        switchable_layout = QVBoxLayout()
+        self._layout.addLayout(switchable_layout)
+        def switch_layout(index: int) -> None:
+            utils.clear_layout(switchable_layout)
+            self._scan_inputs = {}
+            if index == PAMode.Fixed:
+                return
+            #endif
+            _, names = scenario.SCANS[PAMode(index)]
+            for name in ("period", "beamwidth", "phase", "sidelobe", *names):
+                self._scan_inputs[name] = input = utils.InputLayout(name.replace("_", " "))
+                switchable_layout.addLayout(input)
+            #endfor
+        #enddef
+        self._mode_combo.currentIndexChanged.connect(switch_layout)
+    #enddef
+
+    def snapshot(self) -> dict:
+        snapshot = super().snapshot()
+        if self._reference_input.get():
+            snapshot["reference"] = self._reference_input.get()
+        #endif
+        for name, input in self._scan_inputs.items():
+            snapshot[name] = input.get()
+        #endfor
+        return snapshot
+    #enddef
+
+    def load_snapshot(self, snapshot: dict) -> None:
+        super().load_snapshot(snapshot)
+        self._reference_input.set(snapshot.get("reference", ""))
+        for name, input in self._scan_inputs.items():
+            input.set(snapshot.get(name, ""))
+        #endfor
     #enddef
 
     def parse_snapshot(self, snapshot: dict) -> PA:
-        return PA(float(snapshot["value"]))
+        return scenario.parse_pa(snapshot)
     #enddef
 #endclass
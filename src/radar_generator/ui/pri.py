@@ -1,26 +1,13 @@
-import re
-from enum import IntEnum
-
 from PySide6.QtWidgets import (
     QVBoxLayout,
 )
 
-from ..radar.pri import PRI
+from .. import scenario
+from ..radar.pri import PRI, PRIMode
 from . import utils
 from .base import ParameterBox
 
 
-class PRIMode(IntEnum):
-    """ pri mode."""
-
-    Fixed = 0
-    Uneven = 1
-    Slip = 2
-    Group = 3
-    Jitter = 4
-#endclass
-
-
 class PRIBox(ParameterBox):
     """ GroupBox for PRI."""
 
@@ -102,37 +89,6 @@ class PRIBox(ParameterBox):
     #enddef
 
     def parse_snapshot(self, snapshot: dict) -> PRI:
-        mode = snapshot["mode"]
-        std = None
-        if snapshot.get("std"):
-            std = float(snapshot["std"])
-        #endif
-        if mode == PRIMode.Fixed:
-            return PRI(float(snapshot["value"]), std=std)
-        #endif
-        if mode == PRIMode.Slip:
-            assert self._range_layout is not None
-            values = self._range_layout.parse_snapshot(snapshot)
-            return PRI(values, std=std)
-        #endif
-        if mode == PRIMode.Uneven or mode == PRIMode.Group:
-            values = [float(v) for v in re.split(r"\s+", snapshot["value"])]
-            group_size = None
-            if snapshot.get("group_size"):
-                group_size = int(snapshot["group_size"])
-            #endif
-            return PRI(
-                values,
-                std=std,
-                group_size=group_size
-            )
-        #endif
-        if mode == PRIMode.Jitter:
-            return PRI(
-                float(snapshot["value"]),
-                jitter_rate=float(snapshot["jitter_rate"])
-            )
-        #endif
-        raise RuntimeError("unreachable")
+        return scenario.parse_pri(snapshot)
     #enddef
 #endclass
@@ -1,20 +1,9 @@
-import re
-from enum import IntEnum
-
 from PySide6.QtWidgets import QVBoxLayout
 
+from .. import scenario
 from . import utils
 from .base import ParameterBox
-from ..radar.pw import PW
-
-
-class PWMode(IntEnum):
-    """ doc."""
-
-    Fixed = 0
-    Uneven = 1
-    Group = 2
-#endclass
+from ..radar.pw import PW, PWMode
 
 
 class PWBox(ParameterBox):
@@ -66,26 +55,6 @@ class PWBox(ParameterBox):
     #enddef
 
     def parse_snapshot(self, snapshot: dict) -> PW:
-        mode = snapshot["mode"]
-        std = None
-        if snapshot.get("std"):
-            std = float(snapshot["std"])
-        #endif
-        if mode == PWMode.Fixed:
-            return PW(float(snapshot["value"]), std=std)
-        #endif
-        if mode == PWMode.Uneven or mode == PWMode.Group:
-            values = [float(v) for v in re.split(r"\s+", snapshot["value"])]
-            group_size = None
-            if snapshot.get("group_size"):
-                group_size = int(snapshot["group_size"])
-            #endif
-            return PW(
-                values,
-                std=std,
-                group_size=group_size
-            )
-        #endif
-        raise RuntimeError("unreachable")
+        return scenario.parse_pw(snapshot)
     #enddef
 #endclass
@@ -1,33 +1,27 @@
-import re
-from enum import IntEnum
-
 from PySide6.QtWidgets import (
     QCheckBox,
     QVBoxLayout,
 )
 
+from .. import scenario
 from . import utils
-from ..radar.rf import RF
+from ..radar.rf import RF, RFMode
 from .base import ParameterBox
 
 
-class RFMode(IntEnum):
-    """ doc."""
-
-    Fixed = 0
-    GroupAgile = 1
-#endclass
-
-
 class RFBox(ParameterBox):
     """ doc."""
 
     _group_size_input: utils.InputLayout | None = None
     _random_checkbox: QCheckBox | None = None
+    # `bandwidth`, `period`, `length` and `hop_seed` of the current mode
+    _inputs: dict[str, utils.InputLayout]
+    _range_layout: utils.RangeLayout | None = None
 
     def __init__(self) -> None:
         super().__init__("RF")
         self._mode_combo.addItems(RFMode._member_names_)
+        self._inputs = {}
 
         switchable_layout = QVBoxLayout()
         self._layout.addLayout(switchable_layout)
@@ -39,9 +33,22 @@ class RFBox(ParameterBox):
             self._std_input.set("")
             self._group_size_input = None
             self._random_checkbox = None
+            self._inputs = {}
+            self._range_layout = None
 
             if index == RFMode.GroupAgile:
                 self._setup_agile_group(switchable_layout)
+            elif index == RFMode.Sine or index == RFMode.Sawtooth:
+                self._setup_inputs(switchable_layout, "bandwidth", "period")
+            elif index == RFMode.RandomSlip:
+                self._std_input.setEnabled(False)
+                self._setup_inputs(switchable_layout, "bandwidth")
+            elif index == RFMode.Hopping:
+                # channels of the generated table, used if value is empty
+                self._range_layout = utils.RangeLayout()
+                switchable_layout.addLayout(self._range_layout)
+                self._setup_inputs(switchable_layout, "length", "hop_seed")
+                self._setup_agile_group(switchable_layout)
             #endif
         #enddef
         self._mode_combo.currentIndexChanged.connect(switch_layout)
@@ -54,8 +61,21 @@ class RFBox(ParameterBox):
         layout.addWidget(checkbox)
     #enddef
 
+    def _setup_inputs(self, layout: QVBoxLayout, *names: str) -> None:
+        for name in names:
+            self._inputs[name] = input = utils.InputLayout(name.replace("_", " "))
+            layout.addLayout(input)
+        #endfor
+    #enddef
+
     def snapshot(self) -> dict:
         snapshot = super().snapshot()
+        for name, input in self._inputs.items():
+            snapshot[name] = input.get()
+        #endfor
+        if self._range_layout is not None:
+            snapshot.update(self._range_layout.snapshot())
+        #endif
         if self._group_size_input is not None:
             snapshot["group_size"] = self._group_size_input.get()
         #endif
@@ -67,6 +87,12 @@ class RFBox(ParameterBox):
 
     def load_snapshot(self, snapshot: dict) -> None:
         super().load_snapshot(snapshot)
+        for name, input in self._inputs.items():
+            input.set(snapshot.get(name, ""))
+        #endfor
+        if self._range_layout is not None:
+            self._range_layout.load_snapshot(snapshot)
+        #endif
         if self._group_size_input is not None:
             self._group_size_input.set(snapshot.get("group_size", ""))
         #endif
@@ -76,24 +102,6 @@ class RFBox(ParameterBox):
     #enddef
 
     def parse_snapshot(self, snapshot: dict) -> RF:
-        mode = snapshot["mode"]
-        std = None
-        if snapshot.get("std"):
-            std = float(snapshot["std"])
-        #endif
-        if mode == RFMode.Fixed:
-            return RF(float(snapshot["value"]), std=std)
-        #endif
-        values = [float(v) for v in re.split(r"\s+", snapshot["value"])]
-        group_size = None
-        if snapshot.get("group_size"):
-            group_size = int(snapshot["group_size"])
-        #endif
-        return RF(
-            values,
-            std=std,
-            group_size=group_size,
-            random=snapshot.get("random", False)
-        )
+        return scenario.parse_rf(snapshot)
     #enddef
 #endclass
@@ -1,5 +1,8 @@
 from PySide6.QtWidgets import QHBoxLayout, QLabel, QLayout, QLineEdit
 
+from .. import scenario
+from ..parameter import Arithmetic
+
 
 class InputLayout(QHBoxLayout):
     """ layout with input."""
@@ -59,22 +62,8 @@ class RangeLayout(QHBoxLayout):
         self._step.set(snapshot.get("step", ""))
     #enddef
 
-    def parse_snapshot(self, snapshot: dict) -> list[float]:
-        start = float(snapshot["start"])
-        end = float(snapshot["end"])
-        step_text = snapshot.get("step", "")
-        step = (
-            1.0 if not step_text
-            else float(step_text)
-        )
-
-        values: list[float] = []
-        value = start
-        while value < end:
-            values.append(value)
-            value += step
-        #endwhile
-        return values
+    def parse_snapshot(self, snapshot: dict) -> Arithmetic:
+        return scenario.parse_range(snapshot)
     #enddef
 #endclass
 
@@ -0,0 +1,13 @@
+from typing import Any
+
+
+def import_pyarrow() -> Any:
+    """`pyarrow`, an optional dependency of parquet and arrow files."""
+
+    try:
+        import pyarrow
+    except ImportError as e:
+        raise ImportError("`pyarrow` is needed for parquet and arrow files") from e
+    #endtry
+    return pyarrow
+#enddef
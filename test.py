@@ -1,4 +1,4 @@
-from itertools import accumulate, cycle
+from itertools import accumulate
 
 import numpy as np
 import pandas as pd
@@ -28,9 +28,8 @@ def fixed_rf() -> None:
 
 def slip_rf_rand() -> None:
     B = 10
-    p = parameter.init(1000)
-    params = np.array([next(p) for _ in range(100)])
-    params = params + B*(np.random.random(params.size)*2 - 1)
+    p = parameter.init_block(1000, jitter_rate=B/1000)
+    params = p.take(100)
     plt.xlabel("index")
     plt.ylabel("RF(MHz)")
     plt.ylim(980, 1020)
@@ -60,10 +59,8 @@ def slip_rf_sin() -> None:
     B = 10
     T = 10
     size = 100
-    p = parameter.init(1000)
-    params = np.array([next(p) for _ in range(size)])
-    bias = cycle(range(T))
-    params = params + B*np.sin(2*np.pi * np.array([next(bias) for _ in range(size)]) / T)
+    p = parameter.init_block(parameter.Sine(1000, B, T))
+    params = p.take(size)
     plt.grid(axis="x")
     plt.xticks([0+i*T for i in range(size//T+1)])
     plt.xlabel("index")
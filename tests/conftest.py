@@ -0,0 +1,25 @@
+import pytest
+
+from radar_generator.radar import PDWBatch
+
+from helpers import END_TOA, PULSE_NUM, make_generator
+
+
+@pytest.fixture(scope="session", params=[False, True], ids=["random", "periodic"])
+def generator(request: pytest.FixtureRequest):
+    return make_generator(12, request.param)
+#enddef
+
+
+@pytest.fixture(scope="session")
+def until(generator) -> PDWBatch:
+    """pulses before `END_TOA` of the block stream, the reference of every path."""
+
+    return PDWBatch.concat(generator.stream(end_toa=END_TOA))
+#enddef
+
+
+@pytest.fixture(scope="session")
+def taken(generator) -> PDWBatch:
+    return generator.take(PULSE_NUM)
+#enddef
@@ -0,0 +1,55 @@
+import numpy as np
+
+from radar_generator import RadarGenerator
+from radar_generator.radar import PDWBatch, Radar
+from radar_generator.radar.doa import DOA
+from radar_generator.radar.kinematics import Geometry, Track
+from radar_generator.radar.loss import GilbertElliott, ScanBlanking
+from radar_generator.radar.pa import PA
+from radar_generator.radar.pri import PRI
+from radar_generator.radar.pw import PW
+from radar_generator.radar.rf import RF
+from radar_generator.radar.scan import CircularScan
+
+END_TOA = 5e4
+PULSE_NUM = 30000
+
+
+def make_radar(i: int, periodic: bool = False, loss_rate: float | None = 0.1) -> Radar:
+    """radar `i` of a mixed scenario, periodic ones have no random pri."""
+
+    if periodic:
+        pri = PRI([10. + i % 7, 13., 11.5], group_size=2)
+    else:
+        pri = PRI(10. + i % 7, std=0.5) if i % 2 else PRI(10. + i % 7, jitter_rate=0.05)
+    #endif
+    geometry = Geometry(Track.constant((1000. * i, 5000.), (3., -1.)), Track.constant((0., 0.)))
+    return Radar(
+        i,
+        i * 0.37,
+        pri,
+        DOA(0., std=1., geometry=geometry) if i % 3 == 0 else DOA(i % 360, std=1.),
+        RF([1000. + i, 1100., 1200.], group_size=3, random=True),
+        PW([1., 2.], std=0.1, group_size=2),
+        PA(0., scan=CircularScan(500. + i)) if i % 4 == 1 else PA(-10.),
+        loss_rate,
+        (GilbertElliott(0.05, 0.3),) if i % 5 == 2 else (ScanBlanking(300., 40.),) if i % 5 == 4 else ()
+    )
+#enddef
+
+
+def make_generator(radar_num: int, periodic: bool = False, seed: int = 7) -> RadarGenerator:
+    g = RadarGenerator(seed)
+    for i in range(radar_num):
+        g.add(make_radar(i, periodic))
+    #endfor
+    return g
+#enddef
+
+
+def assert_batch_equal(a: PDWBatch, b: PDWBatch) -> None:
+    assert len(a) == len(b)
+    for name in PDWBatch.dtypes:
+        np.testing.assert_array_equal(getattr(a, name), getattr(b, name), err_msg=name)
+    #endfor
+#enddef
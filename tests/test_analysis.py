@@ -0,0 +1,110 @@
+from pathlib import Path
+
+import numpy as np
+import pytest
+
+from radar_generator import analysis, sink
+
+from helpers import make_generator
+
+MAX_INTERVAL = 200.
+RESOLUTION = 2.
+LEVELS = 3
+
+
+@pytest.fixture(scope="module")
+def toa() -> np.ndarray:
+    rng = np.random.default_rng(0)
+    toa = np.sort(np.concatenate((rng.uniform(0., 5000., 600), np.arange(100., 5000., 37.))))
+    # coincident pulses and a gap longer than the windows
+    return np.concatenate((toa[:300], toa[300:310], toa[toa > 9000.], toa[toa > 3000.] + 6000.))
+#enddef
+
+
+def reference(toa: np.ndarray) -> analysis.Histograms:
+    """every pair, one at a time."""
+
+    bins = int(np.ceil(MAX_INTERVAL / RESOLUTION))
+    sdif = np.zeros((LEVELS, bins), dtype=np.int64)
+    pairs = np.zeros(bins, dtype=np.int64)
+    pri_transform = np.zeros(bins, dtype=np.complex128)
+    for j in range(toa.size):
+        for i in range(j):
+            d = toa[j] - toa[i]
+            if d >= MAX_INTERVAL:
+                continue
+            #endif
+            b = int(d / RESOLUTION)
+            pairs[b] += 1
+            if j - i <= LEVELS:
+                sdif[j - i - 1, b] += 1
+            #endif
+            if d > 0:
+                pri_transform[b] += np.exp(2j * np.pi * toa[j] / d)
+            #endif
+        #endfor
+    #endfor
+    return analysis.Histograms(RESOLUTION, sdif, pairs, pri_transform, toa.size)
+#enddef
+
+
+def assert_histograms_equal(a: analysis.Histograms, b: analysis.Histograms) -> None:
+    assert a.pulses == b.pulses
+    np.testing.assert_array_equal(a.sdif, b.sdif)
+    np.testing.assert_array_equal(a.pairs, b.pairs)
+    np.testing.assert_allclose(a.pri_transform, b.pri_transform, rtol=1e-9, atol=1e-6)
+#enddef
+
+
+def chunked(toa: np.ndarray, chunk_size: int) -> list[np.ndarray]:
+    return [toa[i:i+chunk_size] for i in range(0, toa.size, chunk_size)]
+#enddef
+
+
+@pytest.mark.parametrize("chunk_size", [1, 7, 100, 10 ** 9])
+def test_analyze_matches_brute_force(toa: np.ndarray, chunk_size: int) -> None:
+    expected = reference(toa)
+    result = analysis.analyze(chunked(toa, chunk_size), MAX_INTERVAL, RESOLUTION, LEVELS)
+    assert_histograms_equal(result, expected)
+    np.testing.assert_array_equal(result.cdif[-1], expected.sdif.sum(axis=0))
+#enddef
+
+
+@pytest.mark.parametrize("window, step", [(1000., None), (1000., 400.), (300., 1100.), (50., 4000.)])
+@pytest.mark.parametrize("chunk_size", [13, 10 ** 9])
+def test_analyze_windows(toa: np.ndarray, window: float, step: float | None, chunk_size: int) -> None:
+    windows = list(analysis.analyze_windows(
+        chunked(toa, chunk_size), window, MAX_INTERVAL, RESOLUTION, LEVELS, step
+    ))
+    start, expected = toa[0], []
+    while start <= toa[-1]:
+        expected.append(start)
+        start += step or window
+    #endwhile
+    assert [start for start, _ in windows] == expected
+    for start, histograms in windows:
+        inside = toa[(toa >= start) & (toa < start + window)]
+        assert_histograms_equal(
+            histograms,
+            analysis.analyze([inside], MAX_INTERVAL, RESOLUTION, LEVELS)
+        )
+    #endfor
+#enddef
+
+
+@pytest.mark.parametrize("suffix", sink.SINKS)
+def test_read_toa_of_every_sink(tmp_path: Path, suffix: str) -> None:
+    if suffix in (".parquet", ".arrow", ".arrows"):
+        pytest.importorskip("pyarrow")
+    #endif
+    batch = make_generator(3).take(5000)
+    path = tmp_path / f"out{suffix}"
+    with sink.open_sink(path) as s:
+        for start in range(0, len(batch), 1500):
+            s.write(batch[start:start+1500])
+        #endfor
+    #endwith
+    chunks = list(analysis.read_toa(path, chunk_size=1000))
+    assert max(chunk.size for chunk in chunks) <= 1000
+    np.testing.assert_array_equal(np.concatenate(chunks), batch.toa)
+#enddef
@@ -0,0 +1,39 @@
+from dataclasses import replace
+
+import numpy as np
+import pytest
+
+from radar_generator import RadarGenerator, scenario
+from radar_generator.radar import PDWBatch
+from radar_generator.radar.loss import Independent, ScanBlanking
+
+from helpers import END_TOA, assert_batch_equal, make_radar
+
+
+@pytest.mark.parametrize("snapshot", [
+    dict(model="independent", rate=1.),
+    dict(model="burst", p_bad=0.1, p_good=0.5, loss_good=1., loss_bad=1.),
+    dict(model="burst", p_bad=0.1, p_good=0.),
+    dict(model="scan", period=100., width=100.),
+    dict(model="window", windows=[[10., float("inf")]]),
+    dict(model="window", windows=[[10., 5.]]),
+])
+def test_losing_every_pulse_is_rejected(snapshot: dict) -> None:
+    with pytest.raises(ValueError):
+        scenario.parse_loss(snapshot)
+    #endwith
+#enddef
+
+
+@pytest.mark.parametrize("loss", [Independent(1.), ScanBlanking(100., 100.)])
+def test_blanked_radar_does_not_stall_the_merge(loss) -> None:
+    g = RadarGenerator(3)
+    g.add(make_radar(1))
+    g.add(replace(make_radar(2), _losses=(loss,)))
+    seed = np.random.SeedSequence(3).spawn(2)[0]
+
+    expected = PDWBatch.concat(make_radar(1).iter_blocks(1000, seed, end_toa=END_TOA))
+    assert_batch_equal(PDWBatch.concat(g.stream(end_toa=END_TOA)), expected)
+    assert_batch_equal(g.stream(64).take(1000), expected[:1000])
+    assert_batch_equal(PDWBatch.from_pdws(g.pulses(END_TOA)), expected)
+#enddef
@@ -0,0 +1,34 @@
+import numpy as np
+
+from radar_generator.radar import PDWBatch
+from radar_generator.radar.merge import default_block_size
+
+from helpers import END_TOA, PULSE_NUM, assert_batch_equal
+
+
+def test_stream_is_sorted(until: PDWBatch) -> None:
+    assert len(until) > PULSE_NUM
+    assert np.all(np.diff(until.toa) >= 0)
+    assert until.toa[-1] < END_TOA
+#enddef
+
+
+def test_block_size_does_not_change_stream(generator, until: PDWBatch) -> None:
+    for block_size in (17, 1000):
+        assert_batch_equal(PDWBatch.concat(generator.stream(block_size, END_TOA)), until)
+    #endfor
+    assert_batch_equal(PDWBatch.concat(generator.stream().iter_until(END_TOA)), until)
+#enddef
+
+
+def test_heap_matches_stream(generator, until: PDWBatch) -> None:
+    assert_batch_equal(PDWBatch.from_pdws(generator.pulses(END_TOA)), until)
+#enddef
+
+
+def test_default_block_size_shrinks_with_radars() -> None:
+    sizes = [default_block_size(n) for n in (1, 10, 100, 3000, 100000)]
+    assert sizes == sorted(sizes, reverse=True)
+    assert sizes[0] == 4096 and sizes[-1] == 16
+    assert 3000 * sizes[3] <= 1 << 18
+#enddef
@@ -0,0 +1,28 @@
+import pytest
+
+from radar_generator.radar import PDWBatch, parallel
+
+from helpers import END_TOA, PULSE_NUM, assert_batch_equal
+
+
+@pytest.mark.parametrize("workers", [1, 2, 3])
+def test_radar_split_matches_stream(generator, until: PDWBatch, taken: PDWBatch, workers: int) -> None:
+    assert_batch_equal(generator.generate(PULSE_NUM, workers=workers), taken)
+    assert_batch_equal(generator.generate(end_toa=END_TOA, workers=workers), until)
+#enddef
+
+
+def test_early_stop(generator, taken: PDWBatch) -> None:
+    # the workers are stopped with the first chunk taken
+    chunks = generator.iter_generate(PULSE_NUM, workers=2)
+    first = next(chunks)
+    chunks.close()
+    assert_batch_equal(first, taken[:len(first)])
+#enddef
+
+
+def test_worker_error_is_raised(generator) -> None:
+    with pytest.raises(TypeError):
+        parallel.generate(generator.radars, ["not a seed"] * len(generator.radars), 100, workers=2)
+    #endwith
+#enddef
@@ -0,0 +1,101 @@
+import math
+from itertools import cycle, islice
+
+import numpy as np
+import pytest
+
+from radar_generator import parameter
+from radar_generator.parameter import Arithmetic, Hop, Sine
+
+MODES = {
+    "fixed": dict(value=10.),
+    "fixed_std": dict(value=10., std=0.1),
+    "uneven": dict(value=[10., 30., 20.]),
+    "uneven_std": dict(value=[10., 30., 20.], std=0.1),
+    "group": dict(value=[10., 30., 20.], group_size=5),
+    "group_std": dict(value=[10., 30., 20.], std=0.1, group_size=5),
+    "random": dict(value=[1000., 2000., 1500., 500.], random=True),
+    "random_std": dict(value=[1000., 2000., 1500., 500.], std=1., random=True),
+    "random_group": dict(value=[1000., 2000., 1500., 500.], group_size=5, random=True),
+    "jitter": dict(value=10., jitter_rate=0.1),
+    "slip": dict(value=Arithmetic(10., 0.5, 20)),
+    "sine": dict(value=Sine(1000., 10., 100)),
+    "hop": dict(value=Hop(Arithmetic(1000., 0.01, 5000), 5000)),
+    "hop_random": dict(value=Hop(Arithmetic(1000., 0.01, 5000), 5000), random=True),
+}
+N = 5000
+
+
+def values(kwargs: dict, seed: int = 3) -> np.ndarray:
+    return parameter.init_block(**kwargs, rng=np.random.default_rng(seed)).take(N)
+#enddef
+
+
+@pytest.mark.parametrize("kwargs", MODES.values(), ids=MODES)
+def test_init_matches_block(kwargs: dict) -> None:
+    scalar = list(islice(parameter.init(**kwargs, rng=np.random.default_rng(3)), N))
+    np.testing.assert_array_equal(scalar, values(kwargs))
+#enddef
+
+
+@pytest.mark.parametrize("kwargs", MODES.values(), ids=MODES)
+def test_take_does_not_depend_on_block_sizes(kwargs: dict) -> None:
+    block = parameter.init_block(**kwargs, rng=np.random.default_rng(3))
+    sizes = [1, 7, 1000, 0, 2500, N - 3508]
+    np.testing.assert_array_equal(np.concatenate([block.take(n) for n in sizes]), values(kwargs))
+    assert block.index == N
+#enddef
+
+
+# one period of the values before noise, expanded by hand as the
+# per-pulse generator cycles them
+CYCLES = {
+    "fixed": [10.],
+    "uneven": [10., 30., 20.],
+    "group": [v for v in [10., 30., 20.] for _ in range(5)],
+    "slip": [10. + 0.5 * k for k in range(20)],
+    "sine": [1000. + 10. * math.sin(2 * math.pi * k / 100) for k in range(100)],
+}
+NOISY = {"fixed_std": "fixed", "uneven_std": "uneven", "group_std": "group"}
+
+
+@pytest.mark.parametrize("mode", CYCLES)
+def test_cycles_match_expansion(mode: str) -> None:
+    expected = list(islice(cycle(CYCLES[mode]), N))
+    np.testing.assert_allclose(values(MODES[mode]), expected, rtol=1e-12)
+#enddef
+
+
+@pytest.mark.parametrize("mode", NOISY)
+def test_noise_around_expansion(mode: str) -> None:
+    noise = values(MODES[mode]) - list(islice(cycle(CYCLES[NOISY[mode]]), N))
+    std = MODES[mode]["std"]
+    assert abs(noise.mean()) < 4 * std / math.sqrt(N)
+    assert abs(noise.std() / std - 1) < 0.05
+#enddef
+
+
+@pytest.mark.parametrize("mode, group_size", [("random", 1), ("random_group", 5)])
+def test_random_groups(mode: str, group_size: int) -> None:
+    choices = MODES[mode]["value"]
+    groups = values(MODES[mode]).reshape(-1, group_size)
+    # one choice per group, every choice drawn about as often
+    assert np.all(groups == groups[:, :1])
+    counts = np.array([np.count_nonzero(groups[:, 0] == v) for v in choices])
+    assert counts.sum() == len(groups)
+    assert np.all(np.abs(counts / len(groups) - 1 / len(choices)) < 0.05)
+#enddef
+
+
+def test_jitter_is_uniform() -> None:
+    v = values(MODES["jitter"])
+    assert v.min() >= 9. and v.max() <= 11.
+    assert abs(v.mean() - 10.) < 0.05 and abs(v.std() - 1 / math.sqrt(3)) < 0.02
+#enddef
+
+
+def test_repeat_converts_values_once() -> None:
+    pattern = parameter.Repeat((10., 30., 20.), 5)
+    assert pattern._inner is pattern._inner
+    np.testing.assert_array_equal(pattern.at(np.arange(15)), CYCLES["group"])
+#enddef
@@ -0,0 +1,28 @@
+import numpy as np
+
+from radar_generator import pipeline
+from radar_generator.radar import PDWBatch
+
+from helpers import END_TOA, PULSE_NUM, assert_batch_equal
+
+
+def test_source_matches_stream(generator, until: PDWBatch, taken: PDWBatch) -> None:
+    for workers in (1, 2):
+        assert_batch_equal(PDWBatch.concat(pipeline.source(generator, PULSE_NUM, workers=workers)), taken)
+        assert_batch_equal(
+            PDWBatch.concat(pipeline.source(generator, end_toa=END_TOA, workers=workers, split="time")),
+            until
+        )
+    #endfor
+#enddef
+
+
+def test_stages_and_timings(until: PDWBatch) -> None:
+    quantize = pipeline.Quantize({"toa": 0.5})
+    loss = pipeline.Loss(0.5, seed=1)
+    timings = pipeline.Pipeline([until[:1000], until[1000:]], [quantize, loss]).run()
+    assert [t.name for t in timings] == ["source", "quantize", "loss"]
+    assert timings[0].pulses_out == timings[1].pulses_in == len(until)
+    assert 0 < timings[2].pulses_out < len(until)
+    np.testing.assert_array_equal(quantize.process(until[:10]).toa, np.round(until.toa[:10] / 0.5) * 0.5)
+#enddef
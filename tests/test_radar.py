@@ -0,0 +1,43 @@
+import numpy as np
+
+from radar_generator.radar import PDWBatch
+
+from helpers import END_TOA, assert_batch_equal, make_generator, make_radar
+
+
+def test_seek_count_window_are_exact() -> None:
+    # without loss every emitted pulse is generated
+    radar = make_radar(3, periodic=True, loss_rate=None)
+    toa = PDWBatch.concat(radar.iter_blocks(1000, 0, end_toa=END_TOA)).toa
+    for t in (-1., 0., radar._start, toa[100], toa[100] + 1e-9, 12345.678, toa[-1], END_TOA):
+        assert radar.seek(t) == np.searchsorted(toa, t, "left")
+    #endfor
+
+    lossy = make_radar(2, periodic=True)
+    g = make_generator(10, periodic=True)
+    whole = g.until(END_TOA)
+    for radar, seed in ((lossy, 0), *zip(g.radars, g._seeds())):
+        pulses = PDWBatch.concat(radar.iter_blocks(1000, seed, end_toa=END_TOA))
+        for start, end in ((0., END_TOA), (radar._start, 1e4), (1234.5, 1234.6), (2e4, 3.3e4)):
+            inside = pulses[(pulses.toa >= start) & (pulses.toa < end)]
+            assert_batch_equal(radar.window(start, end, seed), inside)
+            assert radar.count(end, seed) == np.count_nonzero(pulses.toa < end)
+        #endfor
+    #endfor
+    for start, end in ((0., END_TOA), (1234.5, 2e4)):
+        assert_batch_equal(g.window(start, end), whole[(whole.toa >= start) & (whole.toa < end)])
+    #endfor
+#enddef
+
+
+def test_pulse_at() -> None:
+    radar = make_radar(1, periodic=True)
+    pulses = PDWBatch.concat(radar.iter_blocks(1000, 5, end_toa=END_TOA))
+    emitted = radar.seek(END_TOA)
+    kept = [radar.pulse_at(index, 5) for index in range(0, emitted, 97)]
+    for pdw in filter(None, kept):
+        i = int(np.searchsorted(pulses.toa, pdw.toa))
+        assert next(iter(pulses[i:i+1])) == pdw
+    #endfor
+    assert sum(pdw is not None for pdw in kept) < len(kept)
+#enddef
@@ -0,0 +1,42 @@
+import numpy as np
+import pytest
+
+from radar_generator import parameter
+
+from test_parameter import MODES, N, values
+
+
+@pytest.mark.parametrize("kwargs", MODES.values(), ids=MODES)
+def test_seek(kwargs: dict) -> None:
+    expected = values(kwargs)
+    block = parameter.init_block(**kwargs, rng=np.random.default_rng(3))
+    for index in (4321, 0, 17, 2048, 4999):
+        block.seek(index)
+        np.testing.assert_array_equal(block.take(N - index), expected[index:])
+    #endfor
+#enddef
+
+
+@pytest.mark.parametrize("kwargs", MODES.values(), ids=MODES)
+def test_cumulative(kwargs: dict) -> None:
+    block = parameter.init_block(**kwargs, rng=np.random.default_rng(3))
+    if not block.periodic:
+        pytest.skip("random values have no closed form")
+    #endif
+    n = np.array([0, 1, 2, 5, 999, 3001, N])
+    expected = np.concatenate(([0.], np.cumsum(values(kwargs))))[n]
+    np.testing.assert_allclose(block.cumulative(n), expected, rtol=1e-12)
+#enddef
+
+
+def test_shared_rng_is_not_advanced() -> None:
+    rng = np.random.default_rng(5)
+    state = rng.bit_generator.state
+    kwargs = MODES["random_std"]
+    a = parameter.init_block(**kwargs, rng=rng)
+    b = parameter.init_block(**kwargs, rng=rng)
+    first = a.take(N)
+    assert rng.bit_generator.state == state
+    np.testing.assert_array_equal(b.take(N), first)
+    np.testing.assert_array_equal(first, values(kwargs, 5))
+#enddef
@@ -0,0 +1,64 @@
+import numpy as np
+import pytest
+
+from radar_generator import RadarGenerator
+from radar_generator.radar import PDWBatch, Radar
+from radar_generator.radar.doa import DOA
+from radar_generator.radar.pa import PA
+from radar_generator.radar.pri import PRI
+from radar_generator.radar.pw import PW
+from radar_generator.radar.receiver import POLICIES, Receiver
+from radar_generator.radar.rf import RF
+
+from helpers import assert_batch_equal
+
+
+@pytest.fixture(scope="module")
+def pulses() -> PDWBatch:
+    g = RadarGenerator(3)
+    for i in range(30):
+        g.add(Radar(i, i * 0.3, PRI(50. + i, std=2.), DOA(0.), RF(1000. + i), PW(2. + i % 5, None), PA(float(i % 7))))
+    #endfor
+    return g.until(3e4)
+#enddef
+
+
+def reference(batch: PDWBatch, policy: str, dead_time: float) -> tuple[PDWBatch, np.ndarray]:
+    """one pulse at a time."""
+
+    groups: list[list[int]] = []
+    busy = -np.inf
+    for i, (toa, pw) in enumerate(zip(batch.toa.tolist(), batch.pw.tolist())):
+        if toa >= busy:
+            groups.append([])
+        #endif
+        groups[-1].append(i)
+        busy = max(busy, toa + pw + dead_time)
+    #endfor
+    if policy == "flag":
+        return batch, np.array([len(group) > 1 for group in groups for _ in group])
+    #endif
+    collided = np.array([len(group) > 1 for group in groups])
+    if policy == "drop":
+        return batch[np.array([group[0] for group in groups])], collided
+    #endif
+    merged = batch[np.array([max(group, key=lambda i: batch.pa[i]) for group in groups])]
+    merged.toa = np.array([batch.toa[group[0]] for group in groups])
+    merged.pw = np.array([max(batch.toa[i] + batch.pw[i] for i in group) for group in groups]) - merged.toa
+    return merged, collided
+#enddef
+
+
+@pytest.mark.parametrize("policy", POLICIES)
+@pytest.mark.parametrize("dead_time", [0., 1.5])
+def test_chunk_size_does_not_change_output(pulses: PDWBatch, policy: str, dead_time: float) -> None:
+    expected, expected_collided = reference(pulses, policy, dead_time)
+    assert expected_collided.any()
+    for chunk_size in (1, 7, 1000, len(pulses)):
+        receiver = Receiver(policy, dead_time)
+        chunks = [pulses[i:i+chunk_size] for i in range(0, len(pulses), chunk_size)]
+        reported = list(receiver.iter_flagged(chunks))
+        assert_batch_equal(PDWBatch.concat(batch for batch, _ in reported), expected)
+        np.testing.assert_array_equal(np.concatenate([c for _, c in reported]), expected_collided)
+    #endfor
+#enddef
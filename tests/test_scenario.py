@@ -0,0 +1,52 @@
+import pickle
+from pathlib import Path
+
+import pytest
+
+from radar_generator import scenario
+
+CONFIG = """
+seed = 42
+radar = [
+    { start_toa = "", loss_rate = "0.1", pri = { mode = 2, value = "", std = "", start = "10", end = "20", step = "2" }, doa = { mode = 0, value = "30", std = "1" }, rf = { mode = 1, value = "1000 2000 3000", std = "", group_size = "4", random = true }, pw = { mode = 0, value = "1", std = "0.1" }, pa = { mode = 0, value = "-10", std = "" } },
+    { start_toa = "5", loss_rate = "", pri = { mode = 4, value = "15", std = "", jitter_rate = "0.1" }, doa = { mode = 0, value = "60", std = "" }, rf = { mode = 0, value = "1500", std = "" }, pw = { mode = 2, value = "1 2", std = "", group_size = "3" }, pa = { mode = 0, value = "0", std = "" } },
+]
+"""
+
+
+class _Payload:
+    def __reduce__(self):
+        return (Path.touch, (Path(self.path),))
+    #enddef
+#endclass
+
+
+@pytest.fixture
+def config(tmp_path: Path, monkeypatch: pytest.MonkeyPatch) -> Path:
+    monkeypatch.setenv("XDG_CACHE_HOME", str(tmp_path / "cache"))
+    path = tmp_path / "scenario.toml"
+    path.write_text(CONFIG)
+    return path
+#enddef
+
+
+def test_cache_is_reused(config: Path, monkeypatch: pytest.MonkeyPatch) -> None:
+    first = scenario.load(config)
+    assert scenario.cache_path(config).exists()
+    monkeypatch.setattr(scenario, "compile_config", pytest.fail)
+    cached = scenario.load(config)
+    assert cached.seed == first.seed and len(cached.radars) == len(first.radars) == 2
+#enddef
+
+
+def test_forged_cache_is_not_unpickled(config: Path, tmp_path: Path) -> None:
+    scenario.load(config)
+    data = scenario.cache_path(config).read_bytes()
+    payload = _Payload()
+    payload.path = tmp_path / "unpickled"
+    header = len(scenario._CACHE_MAGIC) + 64
+    # the content key is right, only the signature can not be forged
+    scenario.cache_path(config).write_bytes(data[:header] + pickle.dumps(payload))
+    assert len(scenario.load(config).radars) == 2
+    assert not payload.path.exists()
+#enddef
@@ -0,0 +1,51 @@
+from dataclasses import replace
+
+import pytest
+
+from radar_generator import RadarGenerator
+from radar_generator.radar import PDWBatch
+from radar_generator.radar.pri import PRI
+
+from helpers import END_TOA, PULSE_NUM, assert_batch_equal, make_radar
+
+
+@pytest.fixture
+def blocks(generator):
+    g = RadarGenerator(generator.seed, "blocks")
+    for radar in generator.radars:
+        g.add(radar)
+    #endfor
+    return g
+#enddef
+
+
+def test_blocks_match_merge(blocks, until: PDWBatch, taken: PDWBatch) -> None:
+    for block_size in (None, 17, 1000):
+        assert_batch_equal(PDWBatch.concat(blocks.stream(block_size, END_TOA)), until)
+    #endfor
+    assert_batch_equal(blocks.take(PULSE_NUM), taken)
+    assert_batch_equal(blocks.stream().until(END_TOA), until)
+    assert_batch_equal(PDWBatch.from_pdws(blocks.pulses(END_TOA)), until)
+#enddef
+
+
+def test_ties_keep_radar_order() -> None:
+    # the same periodic radar under three ids, every toa is tied
+    radar = replace(make_radar(0, True, None), _pri=PRI(10.))
+    merge, blocks = RadarGenerator(1), RadarGenerator(1, "blocks")
+    for g in (merge, blocks):
+        for i in (2, 0, 1):
+            g.add(replace(radar, id=i))
+        #endfor
+    #endfor
+    expected = merge.until(1e4)
+    assert list(expected.radar_id[:6]) == [2, 0, 1, 2, 0, 1]
+    assert_batch_equal(PDWBatch.concat(blocks.stream(7, 1e4)), expected)
+#enddef
+
+
+def test_unknown_scheduler() -> None:
+    with pytest.raises(ValueError):
+        RadarGenerator(1, "calendar").stream()
+    #endwith
+#enddef
@@ -0,0 +1,19 @@
+import numpy as np
+import pytest
+
+from radar_generator import sink
+from radar_generator.radar import PDWBatch
+
+VALUES = [0.05, 0.15, 0.25, 2.675, 1.005, -0.05, -0.0, 0., 123456.5, 1e20, 1e-7, np.nan, np.inf, -np.inf]
+
+
+@pytest.mark.parametrize("precision", [0, 1, 2, 6])
+def test_format_csv_matches_fstring(precision: int) -> None:
+    values = np.array(VALUES)
+    batch = PDWBatch(values, values, values, values, values, np.arange(values.size, dtype=np.int32))
+    rows = sink.format_csv(batch, {"toa": precision, "pa": precision}).decode().splitlines()
+    assert [row.split(",") for row in rows] == [
+        [str(i), f"{v:.{precision}f}", str(v), str(v), str(v), f"{v:.{precision}f}"]
+        for i, v in enumerate(values.tolist())
+    ]
+#enddef
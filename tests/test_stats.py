@@ -0,0 +1,99 @@
+import numpy as np
+import pytest
+
+from radar_generator import stats
+from radar_generator.radar import PDWBatch
+
+from helpers import make_generator
+
+END_TOA = 4e4
+
+
+@pytest.fixture(scope="module")
+def generator():
+    return make_generator(8)
+#enddef
+
+
+@pytest.fixture(scope="module")
+def pulses(generator) -> PDWBatch:
+    return generator.until(END_TOA)
+#enddef
+
+
+def summarize(pulses: PDWBatch, chunk_size: int, **kwargs) -> stats.Summary:
+    summary = stats.Summary(**kwargs)
+    for start in range(0, len(pulses), chunk_size):
+        summary.process(pulses[start:start+chunk_size])
+    #endfor
+    return summary
+#enddef
+
+
+def test_pri(pulses: PDWBatch) -> None:
+    pri = stats.pri(pulses)
+    for radar_id in np.unique(pulses.radar_id):
+        mine = pulses.radar_id == radar_id
+        np.testing.assert_array_equal(pri[mine][1:], np.diff(pulses.toa[mine]))
+        assert np.isnan(pri[mine][0])
+    #endfor
+#enddef
+
+
+@pytest.mark.parametrize("chunk_size", [1, 333, 10 ** 9])
+def test_summary_matches_brute_force(generator, pulses: PDWBatch, chunk_size: int) -> None:
+    if chunk_size == 1:
+        pulses = pulses[:3000]
+    #endif
+    summary = summarize(pulses, chunk_size, pri_resolution=0.5, toa_resolution=100.)
+    summary.count_lost(generator, END_TOA)
+    result = summary.to_dict()
+    assert result["pulses"] == len(pulses)
+    assert result["toa"] == {"min": pulses.toa[0], "max": pulses.toa[-1]}
+
+    emitted = generator.emitted(END_TOA)
+    for radar, radar_emitted in zip(generator.radars, emitted):
+        mine = pulses[pulses.radar_id == radar.id]
+        r = result["radars"][str(radar.id)]
+        assert r["pulses"] == len(mine)
+        assert r["emitted"] == radar_emitted and r["lost"] == radar_emitted - len(mine)
+        if chunk_size == 1:
+            # cut short, emitted counts the whole run
+            continue
+        #endif
+        for name in stats.Summary.FIELDS:
+            column = getattr(mine, name)
+            np.testing.assert_allclose(r[name]["mean"], column.mean(), rtol=1e-12, atol=1e-12)
+            np.testing.assert_allclose(r[name]["std"], column.std(), rtol=1e-9, atol=1e-9)
+            assert r[name]["min"] == column.min() and r[name]["max"] == column.max()
+        #endfor
+        pri = np.diff(mine.toa)
+        np.testing.assert_allclose(r["pri"]["mean"], pri.mean(), rtol=1e-12)
+        assert r["pri"]["min"] == pri.min() and r["pri"]["max"] == pri.max()
+        bins, counts = np.unique(np.floor(pri / 0.5), return_counts=True)
+        assert r["pri"]["histogram"] == [[b * 0.5, c] for b, c in zip(bins.tolist(), counts.tolist())]
+    #endfor
+    assert sum(r["lost"] for r in result["radars"].values()) > 0
+
+    density = result["toa_density"]
+    first = int(np.floor(pulses.toa[0] / 100.))
+    counts = np.bincount(np.floor(pulses.toa / 100.).astype(np.int64) - first)
+    assert density["resolution"] == 100. and density["start"] == first * 100.
+    np.testing.assert_array_equal(density["counts"], counts)
+#enddef
+
+
+@pytest.mark.parametrize("chunk_size", [100, 7777, 10 ** 9])
+def test_toa_density_is_bounded(pulses: PDWBatch, chunk_size: int) -> None:
+    density = summarize(pulses, chunk_size, toa_resolution=10., toa_bins=64).to_dict()["toa_density"]
+    counts = np.array(density["counts"])
+    assert counts.size <= 64 and counts.sum() == len(pulses)
+    # the coarsened bins are aligned multiples of the base resolution
+    scale = round(density["resolution"] / 10.)
+    assert scale & (scale - 1) == 0 and density["start"] % density["resolution"] == 0
+    expected = np.bincount(
+        (np.floor(pulses.toa / 10.).astype(np.int64) // scale) - round(density["start"] / density["resolution"]),
+        minlength=counts.size
+    )
+    np.testing.assert_array_equal(counts, expected)
+#enddef
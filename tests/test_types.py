@@ -0,0 +1,9 @@
+from radar_generator.radar import PDW
+
+
+def test_pdw_is_ordered_by_toa() -> None:
+    a, b, c = PDW(1., 0., 0., 0., 0., 1), PDW(1., 5., 0., 0., 0., 2), PDW(2., 0., 0., 0., 0., 0)
+    assert a <= b and b >= a and a < c and c > a and c >= a
+    assert not a < b and not a > b
+    assert sorted([c, a, b], reverse=True) == [c, a, b]
+#enddef
@@ -0,0 +1,13 @@
+from radar_generator.radar import PDWBatch
+
+from helpers import END_TOA, assert_batch_equal
+
+
+def test_until_matches_stream(generator, until: PDWBatch) -> None:
+    assert_batch_equal(generator.until(END_TOA), until)
+    # radars stop at the end toa, no pulse after it is generated
+    for radar, seed in zip(generator.radars, generator._seeds()):
+        blocks = list(radar.iter_blocks(1000, seed, end_toa=END_TOA))
+        assert all(block.toa[-1] < END_TOA for block in blocks if len(block))
+    #endfor
+#enddef
@@ -0,0 +1,25 @@
+import numpy as np
+import pytest
+
+from radar_generator.radar import PDWBatch
+
+from helpers import END_TOA, assert_batch_equal
+
+
+@pytest.mark.parametrize("workers", [1, 2])
+def test_time_split_matches_stream(generator, until: PDWBatch, workers: int) -> None:
+    assert_batch_equal(generator.generate(end_toa=END_TOA, workers=workers, split="time"), until)
+#enddef
+
+
+def test_locate_resumes_blocks(generator) -> None:
+    toas = [0., 1234.5, 2e4, END_TOA]
+    for radar, seed in zip(generator.radars, generator._seeds()):
+        whole = PDWBatch.concat(radar.iter_blocks(1000, seed, end_toa=END_TOA))
+        states = radar.locate(toas, seed)
+        for toa, (index, offset) in zip(toas, states):
+            rest = PDWBatch.concat(radar.iter_blocks(1000, seed, index, offset, END_TOA))
+            assert_batch_equal(rest, whole[np.searchsorted(whole.toa, toa, "left"):])
+        #endfor
+    #endfor
+#enddef